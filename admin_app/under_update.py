@@ -1,16 +1,9 @@
 import streamlit as st
 from streamlit_lottie import st_lottie
-import requests
-
-def load_lottieurl(url):
-    r = requests.get(url)
-    if r.status_code != 200:
-        return None
-    return r.json()
+from utils.lottie_loader import load_lottie
 
 def under_update_view():
-    lottie_url = "https://assets7.lottiefiles.com/packages/lf20_touohxv0.json"
-    animation = load_lottieurl(lottie_url)
+    animation = load_lottie("under_update")
     
     # Remove the logo line if you don't have a logo yet
     # st.image("your_logo.png", width=150)  
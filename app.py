@@ -2,43 +2,54 @@ import streamlit as st
 # Page config at top-level:
 st.set_page_config(page_title="Football Game", page_icon="⚽", layout="wide")
 
-# Import Admin Cup 
-from views.cup_view import cup_view
-from views.login_view import login_view
-from views.players_view import players_view
-from admin_app import under_update
+# Bring the database schema up to date (runs once per process)
+from utils.migrations import ensure_schema
+ensure_schema()
 
-from views.matches_view import matches_view 
-from views.predictions_view import predictions_view
-from views.leaderboard_view import leaderboard_view
-from views.achievement_view import achievement_view
+# Roll audit entries past their retention period up into daily summaries (in the background)
+from controllers.audit_log import ensure_retention
+ensure_retention()
 
-from players_views.leaderboard_players_view import leaderboard_view_player
-from players_views.predictions_players_view import prediction_view_player
-from players_views.cup_players_view import cup_view_player
+# Score finished matches in the background (see controllers/scoring_queue.py)
+from controllers.scoring_queue import start_worker
+start_worker()
 
-# stub for under development
-def under_dev_view():
-    return under_update.under_update_view
+# Team / league catalogue: JSON and name <-> id indexes, loaded once per process
+from controllers.team_catalogue import get_catalogue
+get_catalogue()
+
+# Warm the animation cache in the background so no page waits on lottiefiles.com
+from utils.lottie_loader import prefetch
+prefetch()
+
+from controllers.auth_controller import validate_session_token
+from utils.views import resolve_view
+
+# Views are "module:function" specs imported on first selection, so a
+# session only pays for the pages it opens (admin pages pull in pandas,
+# numpy and streamlit_lottie). Check with: python -m benchmarks.bench_startup
+UNDER_DEV_VIEW = "admin_app.under_update:under_update_view"
 
 TABS = {
     "admin": {
-        "Players": players_view,
-        "Matches": matches_view,
-        "Predictions": predictions_view,
-        "Leaderboard": leaderboard_view,
-        "Achievements": achievement_view,
-        "Cup": under_dev_view(),
-        "Power-Ups": under_dev_view(),
+        "Players": "views.players_view:players_view",
+        "Matches": "views.matches_view:matches_view",
+        "Predictions": "views.predictions_view:predictions_view",
+        "Leaderboard": "views.leaderboard_view:leaderboard_view",
+        "Achievements": "views.achievement_view:achievement_view",
+        "Cup": "views.cup_view:cup_view",
+        "Power-Ups": UNDER_DEV_VIEW,
+        "System": "views.system_view:system_view",
     },
     "user": {
-        "My Predictions": prediction_view_player,
-        "Leaderboard": leaderboard_view_player,
-        "Cup": cup_view_player,
-        "Achievements": achievement_view,
+        "My Predictions": "players_views.predictions_players_view:prediction_view_player",
+        "Leaderboard": "players_views.leaderboard_players_view:leaderboard_view_player",
+        "Cup": "players_views.cup_players_view:cup_view_player",
+        "Achievements": "views.achievement_view:achievement_view",
     }
 }
 
+
 def show_sidebar(user):
     st.sidebar.title("⚽ Football Game")
     st.sidebar.markdown(f"👤 **Logged in as:** `{user['username']}`")
@@ -55,17 +66,23 @@ def show_sidebar(user):
 
     if st.sidebar.button("🚪 Logout"):
         st.session_state.pop("user", None)
+        st.session_state.pop("session_token", None)
         st.rerun()
 
-    view_function = role_tabs[selected]
-    view_function()  # call function here, not during TABS definition
+    view_function = resolve_view(role_tabs[selected])
+    view_function()
 
 
 
 def main():
-    user = st.session_state.get("user")
+    # Signed session token, checked in memory on every rerun (signature, expiry and the cached token version)
+    user = validate_session_token(st.session_state.get("session_token"))
+    if user:
+        st.session_state["user"] = user
+    else:
+        st.session_state.pop("user", None)
     if not user:
-        login_view()
+        resolve_view("views.login_view:login_view")()
     else:
         show_sidebar(user)
 
@@ -0,0 +1,80 @@
+# benchmarks/bench_cup_bracket.py
+"""
+Cup creation -- seeding query, bracket layout and the bulk insert of cups,
+cup_rounds and first-round cup_matches -- and resolution of every tie of the
+cup once its gameweeks are scored, for fields of several sizes (powers of
+two and fields that need byes).
+
+    python -m benchmarks.bench_cup_bracket [--players 600] [--sizes 16,100,300,512]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import utils.db
+from benchmarks.synthetic_db import build_synthetic_db
+
+
+def run(players, sizes):
+    workdir = tempfile.mkdtemp(prefix="football_bench_")
+    path = os.path.join(workdir, "bench.db")
+    try:
+        counts = build_synthetic_db(path, seasons=1, rounds=10, players=players)
+        print(f"synthetic db: {counts}")
+        utils.db.DB_NAME = path
+        from controllers.cup_controller import (
+            create_cup, get_cup_matchups_with_points, get_cup_rounds, resolve_cup_ties
+        )
+        from controllers.scoring_engine import rescore_all
+
+        # The synthetic season is only half played: finish and score every
+        # gameweek so each cup is played out to its final
+        with utils.db.get_connection() as conn:
+            conn.execute(
+                """
+                UPDATE matches SET status = 'finished',
+                       home_score = ABS(RANDOM()) % 5, away_score = ABS(RANDOM()) % 5
+                WHERE status <> 'finished'
+                """
+            )
+            conn.execute("DELETE FROM scoring_jobs")
+        rescore_all()
+
+        for size in sizes:
+            report = create_cup(f"Bench Cup {size}", "Bench League", 1, entrants=size)
+            first_round = get_cup_rounds(report["cup_id"])[0]
+            ties = get_cup_matchups_with_points(first_round[0])
+            assert len(ties) == report["bracket_size"] // 2
+            assert sum(t["player2"] is None for t in ties) == report["byes"]
+
+            with utils.db.get_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                start = time.perf_counter()
+                resolved = resolve_cup_ties(conn, range(1, report["rounds"] + 1))
+                resolve_ms = (time.perf_counter() - start) * 1000
+                final_winner = conn.execute(
+                    """
+                    SELECT cm.winner_id FROM cup_matches cm
+                    JOIN cup_rounds cr ON cr.id = cm.cup_round_id
+                    WHERE cr.cup_id = ? AND cr.order_number = ?
+                    """,
+                    (report["cup_id"], report["rounds"]),
+                ).fetchone()
+            assert final_winner and final_winner[0] is not None, "the cup was not played out"
+            assert resolved["decided"] == report["entrants"] - 1  # one tie per player knocked out
+            print(f"{report['entrants']:5d} entrants -> {report['bracket_size']:4d} bracket, "
+                  f"{report['byes']:3d} byes, {report['rounds']} rounds: created in {report['elapsed_ms']:.2f} ms, "
+                  f"{resolved['decided']} ties decided / {resolved['drawn']} drawn in {resolve_ms:.2f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--players", type=int, default=600)
+    parser.add_argument("--sizes", default="16,100,300,512")
+    args = parser.parse_args()
+    run(args.players, [int(size) for size in args.sizes.split(",")])
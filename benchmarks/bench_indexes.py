@@ -0,0 +1,104 @@
+# benchmarks/bench_indexes.py
+"""
+Query plans and timings of the hot queries before and after the index
+migration, on a synthetic multi-season database.
+
+    python -m benchmarks.bench_indexes [--players 200] [--seasons 3]
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from benchmarks.synthetic_db import build_synthetic_db
+from utils.migrations import apply_migrations
+
+HOT_QUERIES = {
+    "matches of a round (by name)": (
+        """
+        SELECT m.id, ht.name, at.name, m.home_score, m.away_score
+        FROM matches m
+        JOIN rounds r ON m.round_id = r.id
+        JOIN teams ht ON m.home_team_id = ht.id
+        JOIN teams at ON m.away_team_id = at.id
+        WHERE r.name = ?
+        ORDER BY m.match_datetime ASC
+        """,
+        ("Round 20",),
+    ),
+    "upcoming matches": (
+        """
+        SELECT m.id, m.match_datetime FROM matches m
+        WHERE m.status = 'not played'
+        ORDER BY m.match_datetime ASC
+        """,
+        (),
+    ),
+    "predictions grid of a round": (
+        """
+        SELECT p.player_id, p.match_id, p.predicted_home_score, p.predicted_away_score
+        FROM predictions p
+        JOIN matches m ON m.id = p.match_id
+        JOIN rounds r ON m.round_id = r.id
+        WHERE r.name = ?
+        """,
+        ("Round 20",),
+    ),
+    "match count per round": (
+        "SELECT COUNT(*) FROM matches WHERE round_id = ?",
+        (40,),
+    ),
+    "player achievements": (
+        "SELECT achievement_id, year FROM user_achievements WHERE user_id = ?",
+        (5,),
+    ),
+}
+
+
+def _plan(conn, sql, params):
+    rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def _time(conn, sql, params, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute(sql, params).fetchall()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(players, seasons, repeat):
+    workdir = tempfile.mkdtemp(prefix="football_bench_")
+    path = os.path.join(workdir, "bench.db")
+    try:
+        counts = build_synthetic_db(path, seasons=seasons, players=players, migrate=False)
+        print("Synthetic database:", ", ".join(f"{k}={v}" for k, v in counts.items()))
+
+        conn = sqlite3.connect(path)
+        before = {name: (_plan(conn, *q), _time(conn, *q, repeat)) for name, q in HOT_QUERIES.items()}
+        apply_migrations(conn)
+        after = {name: (_plan(conn, *q), _time(conn, *q, repeat)) for name, q in HOT_QUERIES.items()}
+        conn.close()
+
+        for name in HOT_QUERIES:
+            plan_before, ms_before = before[name]
+            plan_after, ms_after = after[name]
+            print(f"\n=== {name} ===")
+            print(f"  before: {ms_before:8.3f} ms   " + " | ".join(plan_before))
+            print(f"  after:  {ms_after:8.3f} ms   " + " | ".join(plan_after))
+            if ms_after:
+                print(f"  speed-up: x{ms_before / ms_after:.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--seasons", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.players, args.seasons, args.repeat)
@@ -0,0 +1,93 @@
+# benchmarks/bench_live_feed.py
+"""
+Live scores: cost of applying a batch of goal events (coalesced per match,
+only those matches rescored, their rounds' standings refreshed) against
+rescoring everything and rebuilding the standings, and the cost of a page poll -- one PRAGMA data_version -- against re-running the
+leaderboard query.
+
+    python -m benchmarks.bench_live_feed [--live 10] [--batches 50] [--events 5]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+import utils.db
+from benchmarks.synthetic_db import build_synthetic_db
+from controllers.scoring_engine import score_rounds
+from controllers.standings_controller import rebuild_standings
+
+LEADERBOARD_SQL = """
+    SELECT pl.name, COALESCE(ps.total_points, 0) AS total_points
+    FROM players pl LEFT JOIN player_standings ps ON ps.player_id = pl.id
+    ORDER BY total_points DESC, pl.name
+"""
+
+
+def run(live, batches, events_per_batch):
+    workdir = tempfile.mkdtemp(prefix="football_bench_")
+    path = os.path.join(workdir, "bench.db")
+    try:
+        counts = build_synthetic_db(path, players=500)
+        print(f"synthetic db: {counts}")
+        utils.db.DB_NAME = path
+        from controllers import live_feed
+
+        conn = sqlite3.connect(path)
+        match_ids = [r[0] for r in conn.execute("SELECT id FROM matches ORDER BY id DESC LIMIT ?", (live,))]
+        conn.execute(
+            f"UPDATE matches SET status = 'live', home_score = 0, away_score = 0 "
+            f"WHERE id IN ({','.join('?' * len(match_ids))})", match_ids,
+        )
+        conn.execute("DELETE FROM scoring_jobs")
+        conn.commit()
+
+        rng = random.Random(3)
+        elapsed = []
+        for _ in range(batches):
+            events = [
+                live_feed.parse_event({"match_id": rng.choice(match_ids), "goal": rng.choice(("home", "away"))})
+                for _ in range(events_per_batch)
+            ]
+            start = time.perf_counter()
+            live_feed.apply_events(events)
+            elapsed.append(time.perf_counter() - start)
+        elapsed.sort()
+        print(f"live batch ({events_per_batch} goals over {live} live matches): "
+              f"median {elapsed[len(elapsed) // 2] * 1000:.2f} ms, max {elapsed[-1] * 1000:.2f} ms")
+
+        runs = 3
+        start = time.perf_counter()
+        for _ in range(runs):
+            conn.execute("UPDATE predictions SET points_awarded = NULL WHERE match_id = ?", (match_ids[0],))
+            score_rounds(conn, None)
+            rebuild_standings(conn)
+            conn.commit()
+        print(f"rescore everything + rebuild standings: {(time.perf_counter() - start) / runs * 1000:.2f} ms")
+
+        polls = 2000
+        start = time.perf_counter()
+        for _ in range(polls):
+            utils.db.data_version()
+        poll_us = (time.perf_counter() - start) / polls * 1e6
+        start = time.perf_counter()
+        for _ in range(polls // 10):
+            conn.execute(LEADERBOARD_SQL).fetchall()
+        query_us = (time.perf_counter() - start) / (polls // 10) * 1e6
+        print(f"page poll: data_version {poll_us:.1f} µs, leaderboard query {query_us:.1f} µs")
+        conn.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--live", type=int, default=10)
+    parser.add_argument("--batches", type=int, default=50)
+    parser.add_argument("--events", type=int, default=5)
+    args = parser.parse_args()
+    run(args.live, args.batches, args.events)
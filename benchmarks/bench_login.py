@@ -0,0 +1,80 @@
+# benchmarks/bench_login.py
+"""
+Login throughput with bcrypt on the KDF thread pool, from several concurrent
+sessions, and the per-rerun cost of validating a session token in memory
+(signature plus the cached token_version) against looking the player up in
+SQLite.
+
+    python -m benchmarks.bench_login [--logins 200] [--sessions 8] [--rounds 12]
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import utils.db
+from benchmarks.synthetic_db import build_synthetic_db
+
+PASSWORD = "correct horse"
+
+
+def run(logins, sessions, rounds):
+    workdir = tempfile.mkdtemp(prefix="football_bench_")
+    path = os.path.join(workdir, "bench.db")
+    try:
+        build_synthetic_db(path, seasons=1, rounds=1, players=max(logins, 50))
+        # Point the app's connection pool at the synthetic database
+        utils.db.DB_NAME = path
+        os.environ["BCRYPT_ROUNDS"] = str(rounds)
+        from controllers import auth_controller as auth
+
+        hashed = auth.hash_password(PASSWORD)
+        conn = sqlite3.connect(path)
+        conn.execute("UPDATE players SET pw = ?", (hashed,))
+        conn.commit()
+        names = [r[0] for r in conn.execute("SELECT name FROM players LIMIT ?", (logins,))]
+
+        start = time.perf_counter()
+        auth.hash_password(PASSWORD)
+        one = time.perf_counter() - start
+        print(f"bcrypt cost {rounds}: {one * 1000:.1f} ms per hash, KDF pool of {auth.AUTH_WORKERS}")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions) as clients:
+            users = list(clients.map(lambda name: auth.login(name, PASSWORD), names))
+        elapsed = time.perf_counter() - start
+        assert all(users), "a login failed"
+        print(f"{len(names)} logins from {sessions} sessions: {elapsed * 1000:.1f} ms "
+              f"({len(names) / elapsed:.1f} logins/s)")
+
+        tokens = [auth.issue_session_token(u) for u in users]
+        reruns = 20000
+        start = time.perf_counter()
+        for i in range(reruns):
+            assert auth.validate_session_token(tokens[i % len(tokens)])
+        token_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(reruns):
+            assert conn.execute(
+                "SELECT id, role FROM players WHERE name = ?", (names[i % len(names)],)
+            ).fetchone()
+        db_s = time.perf_counter() - start
+        print(f"session check per rerun: token {token_s / reruns * 1e6:.1f} µs, "
+              f"database lookup {db_s / reruns * 1e6:.1f} µs")
+        conn.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+    run(args.logins, args.sessions, args.rounds)
@@ -0,0 +1,155 @@
+# benchmarks/bench_match_upsert.py
+"""
+Match-write throughput: the old SELECT-then-INSERT/UPDATE path against the
+single-statement INSERT ... ON CONFLICT DO UPDATE on the (round, team pair)
+unique key, one commit per match (as add_match does) and batched with
+executemany (as the fixture importer does). A last run writes the same
+fixtures from several threads at once and checks no duplicates appear.
+
+    python -m benchmarks.bench_match_upsert [--matches 2000] [--threads 4]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from benchmarks.synthetic_db import build_synthetic_db
+from controllers.fixtures_controller import UPSERT_MATCH_SQL
+
+
+def legacy_write(conn, row):
+    """The SELECT-with-OR then UPDATE-or-INSERT add_match used to run."""
+    round_id, competition_id, home, away, kickoff, status, hs, as_ = row
+    existing = conn.execute(
+        """
+        SELECT id FROM matches
+        WHERE round_id = ?
+          AND ((home_team_id = ? AND away_team_id = ?) OR (home_team_id = ? AND away_team_id = ?))
+        """,
+        (round_id, home, away, away, home),
+    ).fetchone()
+    if existing:
+        conn.execute(
+            "UPDATE matches SET match_datetime = ?, status = ?, home_score = ?, away_score = ? WHERE id = ?",
+            (kickoff, status, hs, as_, existing[0]),
+        )
+    else:
+        conn.execute(
+            """
+            INSERT INTO matches (round_id, competition_id, home_team_id, away_team_id,
+                                 match_datetime, status, home_score, away_score)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            row,
+        )
+
+
+def make_fixtures(conn, count, seed=11):
+    """`count` fresh fixtures spread over new rounds of the first competition."""
+    rng = random.Random(seed)
+    competition_id = conn.execute("SELECT MIN(id) FROM competitions").fetchone()[0]
+    team_ids = [r[0] for r in conn.execute("SELECT id FROM teams")]
+    per_round = len(team_ids) // 2
+    first = conn.execute("SELECT COALESCE(MAX(round_number), 0) + 1 FROM rounds").fetchone()[0]
+    rows = []
+    for r in range(-(-count // per_round)):
+        number = first + r
+        round_id = conn.execute(
+            "INSERT INTO rounds (name, competition_id, round_number) VALUES (?, ?, ?)",
+            (f"Round {number}", competition_id, number),
+        ).lastrowid
+        teams = team_ids[:]
+        rng.shuffle(teams)
+        for i in range(per_round):
+            rows.append((round_id, competition_id, teams[2 * i], teams[2 * i + 1],
+                         "2030-01-01 15:00:00", "not played", None, None))
+    conn.commit()
+    return rows[:count]
+
+
+def _time(label, fn, rows):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed * 1000:9.1f} ms  {len(rows) / elapsed:10.0f} matches/s")
+
+
+def run(matches, threads):
+    workdir = tempfile.mkdtemp(prefix="football_bench_")
+    path = os.path.join(workdir, "bench.db")
+    try:
+        build_synthetic_db(path, seasons=1, players=10)
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+        def per_row(write, rows):
+            def go():
+                for row in rows:
+                    write(conn, row)
+                    conn.commit()
+            return go
+
+        def upsert(c, row):
+            c.execute(UPSERT_MATCH_SQL, row)
+
+        def batched(rows):
+            def go():
+                conn.executemany(UPSERT_MATCH_SQL, rows)
+                conn.commit()
+            return go
+
+        for phase in ("insert", "update"):
+            legacy_rows = make_fixtures(conn, matches, seed=1)
+            upsert_rows = make_fixtures(conn, matches, seed=2)
+            batch_rows = make_fixtures(conn, matches, seed=3)
+            if phase == "update":
+                for rows in (legacy_rows, upsert_rows, batch_rows):
+                    conn.executemany(UPSERT_MATCH_SQL, rows)
+                conn.commit()
+                # Same fixtures with the teams swapped and a final score
+                swap = lambda rows: [(r[0], r[1], r[3], r[2], r[4], "finished", 1, 0) for r in rows]
+                legacy_rows, upsert_rows, batch_rows = swap(legacy_rows), swap(upsert_rows), swap(batch_rows)
+            print(f"-- {phase} {matches} matches")
+            _time("SELECT-then-write, commit each", per_row(legacy_write, legacy_rows), legacy_rows)
+            _time("upsert, commit each", per_row(upsert, upsert_rows), upsert_rows)
+            _time("upsert, executemany", batched(batch_rows), batch_rows)
+
+        # Concurrent writers on the same fixtures must not create duplicates
+        rows = make_fixtures(conn, matches, seed=4)
+        before = conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+        def writer():
+            c = sqlite3.connect(path, timeout=30)
+            for row in rows:
+                c.execute(UPSERT_MATCH_SQL, row)
+                c.commit()
+            c.close()
+
+        workers = [threading.Thread(target=writer) for _ in range(threads)]
+        start = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+        added = conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0] - before
+        print(f"-- {threads} concurrent writers x {matches} matches: {elapsed * 1000:.1f} ms, "
+              f"{added} rows added (expected {len(rows)})")
+        assert added == len(rows), "duplicate fixtures were created"
+        conn.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--matches", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+    run(args.matches, args.threads)
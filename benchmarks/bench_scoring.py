@@ -0,0 +1,87 @@
+# benchmarks/bench_scoring.py
+"""
+Rescore every prediction of a synthetic multi-season database with the old
+per-row Python loop and with the set-based scoring engine, and check that
+both award the same points.
+
+    python -m benchmarks.bench_scoring [--players 200] [--seasons 1]
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from benchmarks.synthetic_db import build_synthetic_db
+from controllers.scoring_engine import get_rule_set, score_rounds
+
+
+def legacy_score_all(conn):
+    """The loop calculate_and_store_points used to run, over the whole database."""
+    rows = conn.execute("""
+        SELECT p.id, p.predicted_home_score, p.predicted_away_score, m.home_score, m.away_score
+        FROM predictions p
+        JOIN matches m ON p.match_id = m.id
+    """).fetchall()
+    updates = []
+    for pred_id, phs, pas, ahs, aas in rows:
+        if ahs is None or aas is None:
+            continue
+        if phs == ahs and pas == aas:
+            points = 3
+        elif (phs > pas and ahs > aas) or (phs < pas and ahs < aas) or (phs == pas and ahs == aas):
+            points = 1
+        else:
+            points = 0
+        updates.append((points, pred_id))
+    conn.executemany("UPDATE predictions SET points_awarded = ? WHERE id = ?", updates)
+    conn.commit()
+    return len(updates)
+
+
+def _snapshot(conn):
+    return conn.execute("SELECT id, points_awarded FROM predictions ORDER BY id").fetchall()
+
+
+def run(players, seasons):
+    workdir = tempfile.mkdtemp(prefix="football_bench_")
+    path = os.path.join(workdir, "bench.db")
+    try:
+        counts = build_synthetic_db(path, seasons=seasons, players=players)
+        print("Synthetic database:", ", ".join(f"{k}={v}" for k, v in counts.items()))
+        conn = sqlite3.connect(path)
+
+        start = time.perf_counter()
+        scored = legacy_score_all(conn)
+        legacy_s = time.perf_counter() - start
+        legacy_points = _snapshot(conn)
+        print(f"legacy loop:      {legacy_s * 1000:9.1f} ms ({scored} predictions)")
+
+        conn.execute("UPDATE predictions SET points_awarded = NULL")
+        conn.commit()
+        start = time.perf_counter()
+        scored = score_rounds(conn, None, get_rule_set("classic"))
+        conn.commit()
+        engine_s = time.perf_counter() - start
+        print(f"scoring engine:   {engine_s * 1000:9.1f} ms ({scored} predictions)")
+
+        start = time.perf_counter()
+        scored = score_rounds(conn, None, get_rule_set("classic"))
+        conn.commit()
+        print(f"engine, no-op:    {(time.perf_counter() - start) * 1000:9.1f} ms ({scored} predictions rewritten)")
+
+        assert _snapshot(conn) == legacy_points, "scoring engine disagrees with the legacy loop"
+        print(f"identical points, speed-up x{legacy_s / engine_s:.1f}")
+        conn.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--seasons", type=int, default=1)
+    args = parser.parse_args()
+    run(args.players, args.seasons)
@@ -0,0 +1,107 @@
+# benchmarks/bench_startup.py
+"""
+Import-time profile of a cold app start and of each page's first visit.
+
+Runs `python -X importtime` on `import app` (pages resolve lazily, see
+app.TABS), then resolves every page in menu order, user pages first. Each
+phase reports its wall time, the modules it imported and the heaviest of
+them by self time. Modules shared between pages are charged to the first one.
+`requests` may show up under startup: the background animation prefetch
+imports it on its own thread, without blocking the first render.
+
+    python -m benchmarks.bench_startup [--repeat 3] [--top 5] [--budget-ms 800]
+
+With --budget-ms the exit status is 1 when the startup phase exceeds the
+budget, so a startup regression fails the check.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+from benchmarks.synthetic_db import build_synthetic_db
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+MARK = "@@phase "
+
+PROBE = f"""
+import sys
+import time
+
+_last = time.perf_counter()
+
+def mark(label):
+    global _last
+    now = time.perf_counter()
+    print({MARK!r} + str(now - _last) + " " + label, file=sys.stderr, flush=True)
+    _last = now
+
+mark("interpreter")
+import app
+mark("startup")
+for role in ("user", "admin"):
+    for label, spec in app.TABS[role].items():
+        app.resolve_view(spec)
+        mark(role + ": " + label)
+"""
+
+
+def profile_once(env):
+    """One cold run -> {phase: (seconds, [(self_us, cumulative_us, module)])} in phase order."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    phases, current = {}, []
+    for line in result.stderr.splitlines():
+        if line.startswith(MARK):
+            seconds, label = line[len(MARK):].split(" ", 1)
+            phases[label] = (float(seconds), current)
+            current = []
+        elif line.startswith("import time:") and "[us]" not in line:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            current.append((max(int(self_us), 0), int(cumulative_us), name.strip()))
+    return phases
+
+
+def run(repeat, top, budget_ms):
+    workdir = tempfile.mkdtemp(prefix="football_bench_")
+    path = os.path.join(workdir, "bench.db")
+    try:
+        build_synthetic_db(path, seasons=1, rounds=5, players=50)
+        env = dict(os.environ, FOOTBALL_DB=path)
+
+        runs = [profile_once(env) for _ in range(repeat)]
+        totals = defaultdict(list)
+        for phases in runs:
+            for phase, (seconds, _) in phases.items():
+                totals[phase].append(seconds * 1000)
+
+        print(f"wall time per phase, best of {repeat} cold runs")
+        for phase, (_, modules) in runs[0].items():
+            print(f"{phase:<32} {min(totals[phase]):8.1f} ms  {len(modules):4d} modules")
+            # By self time: nesting depth is unreliable once the background
+            # threads started at startup import modules concurrently
+            for self_us, _, name in sorted(modules, reverse=True)[:top]:
+                print(f"    {name:<40} {self_us / 1000:8.1f} ms")
+
+        startup_ms = min(totals["startup"])
+        if budget_ms is not None and startup_ms > budget_ms:
+            print(f"startup time {startup_ms:.1f} ms exceeds the {budget_ms:.0f} ms budget")
+            return 1
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+    sys.exit(run(args.repeat, args.top, args.budget_ms))
@@ -0,0 +1,97 @@
+# benchmarks/synthetic_db.py
+"""
+Build a synthetic multi-season database for the benchmarks.
+
+Uses the real base schema from setup_database.py and fills it with
+`seasons x competitions x rounds x matches_per_round` fixtures and one
+prediction per player per match.
+"""
+
+import random
+import sqlite3
+
+from setup_database import SCHEMA_SQL
+from utils.migrations import apply_migrations
+
+
+def build_synthetic_db(
+    path: str,
+    seasons: int = 3,
+    competitions: int = 2,
+    rounds: int = 38,
+    matches_per_round: int = 10,
+    players: int = 200,
+    migrate: bool = True,
+    seed: int = 7,
+) -> dict:
+    """Create the database at `path` and return row counts per table."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA_SQL)
+
+    conn.executemany(
+        "INSERT INTO players (name, pw, role) VALUES (?, ?, ?)",
+        [(f"player_{i}", "x", "user") for i in range(players)],
+    )
+    conn.executemany(
+        "INSERT INTO teams (name) VALUES (?)",
+        [(f"Team {i}",) for i in range(matches_per_round * 2)],
+    )
+    player_ids = [r[0] for r in conn.execute("SELECT id FROM players")]
+    team_ids = [r[0] for r in conn.execute("SELECT id FROM teams")]
+
+    match_id = 0
+    for season in range(seasons):
+        year = 2020 + season
+        for c in range(competitions):
+            comp_id = conn.execute(
+                "INSERT INTO competitions (name) VALUES (?)", (f"League {c} {year}",)
+            ).lastrowid
+            for r in range(1, rounds + 1):
+                round_id = conn.execute(
+                    "INSERT INTO rounds (name, competition_id) VALUES (?, ?)",
+                    (f"Round {r}", comp_id),
+                ).lastrowid
+                finished = season < seasons - 1 or r < rounds // 2
+                teams = team_ids[:]
+                rng.shuffle(teams)
+                match_rows = []
+                for m in range(matches_per_round):
+                    match_id += 1
+                    kickoff = f"{year}-{(r % 12) + 1:02d}-{(m % 27) + 1:02d} 15:00:00"
+                    match_rows.append((
+                        match_id, round_id, comp_id, teams[2 * m], teams[2 * m + 1], kickoff,
+                        "finished" if finished else "not played",
+                        rng.randint(0, 4) if finished else None,
+                        rng.randint(0, 4) if finished else None,
+                    ))
+                conn.executemany(
+                    """
+                    INSERT INTO matches (id, round_id, competition_id, home_team_id, away_team_id,
+                                         match_datetime, status, home_score, away_score)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    match_rows,
+                )
+                conn.executemany(
+                    """
+                    INSERT INTO predictions (player_id, match_id, predicted_home_score, predicted_away_score)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    [
+                        (pid, row[0], rng.randint(0, 3), rng.randint(0, 3))
+                        for row in match_rows
+                        for pid in player_ids
+                    ],
+                )
+    conn.commit()
+
+    if migrate:
+        apply_migrations(conn)
+
+    counts = {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ("players", "rounds", "matches", "predictions")
+    }
+    conn.close()
+    return counts
@@ -1,9 +1,5 @@
 import sqlite3
-
-DB_NAME = "football_game.db"
-
-def get_connection():
-    return sqlite3.connect(DB_NAME)
+from utils.db import get_connection
 
 def list_tables(cursor):
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
@@ -38,65 +34,60 @@ def drop_entire_table(cursor, conn, table):
     print(f"🗑️ Table '{table}' has been dropped from the database.")
 
 def interactive_table_manager():
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    try:
-        # Step 1: Get all table names
-        tables = list_tables(cursor)
-
-        if not tables:
-            print("❌ No tables found in the database.")
-            return
-
-        print("\n📊 Tables and Record Counts:")
-        for table in tables:
-            count = get_table_record_count(cursor, table)
-            print(f"   - {table}: {count} records")
-
-        selected_table = input("\n📥 Enter the name of the table you want to inspect:\n>> ").strip()
-
-        if selected_table not in tables:
-            print(f"❌ Table '{selected_table}' does not exist.")
-            return
-
-        print(f"\n✅ Table '{selected_table}' selected.")
-        print("Choose an action:")
-        print("   1. Show contents")
-        print("   2. Delete all data from this table")
-        print("   3. Delete the entire table")
-
-        choice = input(">> ").strip()
-
-        if choice == '1':
-            show_table_contents(cursor, selected_table)
-        elif choice == '2':
-            confirm = input(f"⚠️ Are you sure you want to delete ALL data from '{selected_table}'? (yes/no): ").strip().lower()
-            if confirm == 'yes':
-                delete_table_data(cursor, conn, selected_table)
-            else:
-                print("❌ Deletion cancelled.")
-        elif choice == '3':
-            confirm = input(f"⚠️ Are you sure you want to DROP the ENTIRE table '{selected_table}'? This cannot be undone. (yes/no): ").strip().lower()
-            if confirm == 'yes':
-                drop_entire_table(cursor, conn, selected_table)
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        try:
+            # Step 1: Get all table names
+            tables = list_tables(cursor)
+
+            if not tables:
+                print("❌ No tables found in the database.")
+                return
+
+            print("\n📊 Tables and Record Counts:")
+            for table in tables:
+                count = get_table_record_count(cursor, table)
+                print(f"   - {table}: {count} records")
+
+            selected_table = input("\n📥 Enter the name of the table you want to inspect:\n>> ").strip()
+
+            if selected_table not in tables:
+                print(f"❌ Table '{selected_table}' does not exist.")
+                return
+
+            print(f"\n✅ Table '{selected_table}' selected.")
+            print("Choose an action:")
+            print("   1. Show contents")
+            print("   2. Delete all data from this table")
+            print("   3. Delete the entire table")
+
+            choice = input(">> ").strip()
+
+            if choice == '1':
+                show_table_contents(cursor, selected_table)
+            elif choice == '2':
+                confirm = input(f"⚠️ Are you sure you want to delete ALL data from '{selected_table}'? (yes/no): ").strip().lower()
+                if confirm == 'yes':
+                    delete_table_data(cursor, conn, selected_table)
+                else:
+                    print("❌ Deletion cancelled.")
+            elif choice == '3':
+                confirm = input(f"⚠️ Are you sure you want to DROP the ENTIRE table '{selected_table}'? This cannot be undone. (yes/no): ").strip().lower()
+                if confirm == 'yes':
+                    drop_entire_table(cursor, conn, selected_table)
+                else:
+                    print("❌ Drop table cancelled.")
             else:
-                print("❌ Drop table cancelled.")
-        else:
-            print("❌ Invalid choice.")
+                print("❌ Invalid choice.")
 
-    except sqlite3.Error as e:
-        print(f"❌ Database error: {e}")
-    finally:
-        conn.close()
+        except sqlite3.Error as e:
+            print(f"❌ Database error: {e}")
 
 
 
-import sqlite3
 from datetime import datetime
 
-DB_NAME = "football_game.db"
-
 def generate_standard_league_name():
     while True:
         season = input("📆 Enter the season (e.g., 2024/2025): ").strip()
@@ -126,58 +117,50 @@ def ensure_achievement_exists(cursor, name="League Winner", description="Won the
 
 
 def record_league_winner():
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-
-    # Show players
-    print("👥 All Players:")
-    cursor.execute("SELECT id, name FROM players")
-    for row in cursor.fetchall():
-        print(f"ID: {row[0]} | Name: {row[1]}")
-
-    while True:
-        try:
-            player_id = int(input("🏆 Enter the ID of the player who won the league: "))
-            cursor.execute("SELECT name FROM players WHERE id = ?", (player_id,))
-            row = cursor.fetchone()
-            if not row:
-                print("❌ Invalid player ID.")
-                continue
-            player_name = row[0]
-            break
-        except ValueError:
-            print("⚠️ Please enter a number.")
-
-    # Generate League Name & Season
-    league_name, year = generate_standard_league_name()
-    print(f"✨ League Title: {league_name}")
-
-    # Ensure "League Winner" achievement exists
-    achievement_id = ensure_achievement_exists(cursor)
-
-    # Check if already awarded
-    cursor.execute("""
-        SELECT id FROM user_achievements
-        WHERE user_id = ? AND achievement_id = ? AND year = ?
-    """, (player_id, achievement_id, year))
-    if cursor.fetchone():
-        print("⚠️ Player already awarded this achievement for the selected year.")
-    else:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        # Show players
+        print("👥 All Players:")
+        cursor.execute("SELECT id, name FROM players")
+        for row in cursor.fetchall():
+            print(f"ID: {row[0]} | Name: {row[1]}")
+
+        while True:
+            try:
+                player_id = int(input("🏆 Enter the ID of the player who won the league: "))
+                cursor.execute("SELECT name FROM players WHERE id = ?", (player_id,))
+                row = cursor.fetchone()
+                if not row:
+                    print("❌ Invalid player ID.")
+                    continue
+                player_name = row[0]
+                break
+            except ValueError:
+                print("⚠️ Please enter a number.")
+
+        # Generate League Name & Season
+        league_name, year = generate_standard_league_name()
+        print(f"✨ League Title: {league_name}")
+
+        # Ensure "League Winner" achievement exists
+        achievement_id = ensure_achievement_exists(cursor)
+
+        # Check if already awarded
         cursor.execute("""
-            INSERT INTO user_achievements (user_id, achievement_id, year)
-            VALUES (?, ?, ?)
+            SELECT id FROM user_achievements
+            WHERE user_id = ? AND achievement_id = ? AND year = ?
         """, (player_id, achievement_id, year))
-        print(f"✅ Recorded: {player_name} is the {league_name} Winner!")
-
-    conn.commit()
-    conn.close()
-
-import sqlite3
+        if cursor.fetchone():
+            print("⚠️ Player already awarded this achievement for the selected year.")
+        else:
+            cursor.execute("""
+                INSERT INTO user_achievements (user_id, achievement_id, year)
+                VALUES (?, ?, ?)
+            """, (player_id, achievement_id, year))
+            print(f"✅ Recorded: {player_name} is the {league_name} Winner!")
 
 def show_player_achievements():
-    conn = sqlite3.connect("football_game.db")
-    cursor = conn.cursor()
-
     query = """
     SELECT 
         p.name,
@@ -190,8 +173,8 @@ def show_player_achievements():
     ORDER BY p.name;
     """
 
-    cursor.execute(query)
-    results = cursor.fetchall()
+    with get_connection() as conn:
+        results = conn.execute(query).fetchall()
 
     achievements_dict = {}
 
@@ -209,8 +192,6 @@ def show_player_achievements():
         print(f"   🏅 Cups Won   : {ach.get('Cup Winner', 0)}")
         print("-" * 40)
 
-    conn.close()
-
 # if __name__ == "__main__":
 #     show_player_achievements()
 
@@ -1,13 +1,12 @@
 from utils.db import get_connection
+from utils.query_cache import cached
 
+@cached("players", "user_achievements", "achievements")
 def get_player_title_summary():
     """
     Returns a list of players with the count of cups and leagues they've won.
     Achievement names are 'League Winner' and 'Cup Winner' (per your DB).
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
     query = """
     SELECT 
         p.name,
@@ -20,9 +19,8 @@ def get_player_title_summary():
     ORDER BY p.name;
     """
 
-    cursor.execute(query)
-    results = cursor.fetchall()
-    conn.close()
+    with get_connection() as conn:
+        results = conn.execute(query).fetchall()
 
     achievements_dict = {}
 
@@ -44,13 +42,11 @@ def get_player_title_summary():
     return summary_list
 
 
+@cached("players", "user_achievements", "achievements")
 def get_league_winners():
     """
     Return detailed league winners per year with achievement name 'League Winner'.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
     query = """
     SELECT
         ua.year,
@@ -64,9 +60,8 @@ def get_league_winners():
     ORDER BY ua.year DESC;
     """
 
-    cursor.execute(query)
-    rows = cursor.fetchall()
-    conn.close()
+    with get_connection() as conn:
+        rows = conn.execute(query).fetchall()
 
     return [
         {
@@ -0,0 +1,373 @@
+# controllers/audit_log.py
+"""
+Audit trail of admin writes.
+
+Every admin write path records who did what to which player / match, with
+the changed fields before and after the write as JSON in `details`:
+
+    {"before": {"home_score": 1, "status": "live"}, "after": {"home_score": 2, "status": "finished"}}
+
+Entries are written in the mutation's own transaction whenever the caller
+has one (`conn=`), so an audited write costs one more row in the same commit
+and never an extra fsync, and an audit row exists exactly when its change
+was committed. Entries recorded without a connection go to an in-memory
+buffer that is flushed in one executemany when it holds AUDIT_BATCH_SIZE
+entries or its oldest entry is AUDIT_FLUSH_SECONDS old, before the log is
+read, and at process exit. Entries keep the time they were recorded, not
+the time they were flushed.
+
+Writes without an admin (live feed, scoring worker, sign-up) are not
+audited: entries with no admin_id are dropped.
+
+The log is browsed a page at a time (`get_audit_page`): keyset pagination
+on (timestamp, id) with optional filters by admin, action and target, each
+served by an index (migration 8), so a page costs the same however long the
+log gets. `roll_up_audit_log` keeps the table itself small: entries older
+than AUDIT_RETENTION_DAYS are counted into `audit_log_daily` (one row per
+day, admin and action), optionally copied to an archive database file, and
+deleted. The app runs it in the background once per process; it can also
+run on its own:
+
+    python -m controllers.audit_log [--days 90] [--archive audit_archive.db]
+"""
+
+import atexit
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.db import get_connection
+
+AUDIT_BATCH_SIZE = 50
+AUDIT_FLUSH_SECONDS = 10.0
+PAGE_SIZE = 50
+
+# Retention: entries older than this many days are rolled up (and archived
+# to AUDIT_ARCHIVE_DB when it is set)
+AUDIT_RETENTION_DAYS = int(os.getenv("AUDIT_RETENTION_DAYS", "90"))
+AUDIT_ARCHIVE_DB = os.getenv("AUDIT_ARCHIVE_DB")
+ROLL_UP_DAYS_PER_BATCH = 7   # days of entries moved per transaction
+
+_INSERT_SQL = """
+    INSERT INTO audit_log (admin_id, action, target_player_id, target_match_id, details, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_buffer: List[tuple] = []
+_buffer_since = None
+_buffer_lock = threading.Lock()
+
+
+def _now() -> str:
+    # Same format and clock (UTC) as CURRENT_TIMESTAMP
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _details(before: Optional[dict], after: Optional[dict]) -> Optional[str]:
+    """JSON of the fields that changed (all of them for a create or delete)."""
+    if before is not None and after is not None:
+        changed = [key for key in after if before.get(key) != after[key]]
+        before = {key: before.get(key) for key in changed}
+        after = {key: after[key] for key in changed}
+    details = {}
+    if before:
+        details["before"] = before
+    if after:
+        details["after"] = after
+    if not details:
+        return None
+    return json.dumps(details, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def audit_entry(admin_id: int, action: str, player_id: int = None, match_id: int = None,
+                before: dict = None, after: dict = None) -> tuple:
+    """One audit row, ready for `log_entries`."""
+    return (admin_id, action, player_id, match_id, _details(before, after), _now())
+
+
+def log_entries(entries: Iterable[tuple], conn: sqlite3.Connection = None) -> int:
+    """
+    Record audit rows built by `audit_entry`: in the caller's transaction
+    when `conn` is given, buffered otherwise. Returns the number recorded.
+    """
+    global _buffer_since
+    entries = [entry for entry in entries if entry[0] is not None]
+    if not entries:
+        return 0
+    if conn is not None:
+        conn.executemany(_INSERT_SQL, entries)
+        return len(entries)
+
+    with _buffer_lock:
+        if not _buffer:
+            _buffer_since = time.monotonic()
+        _buffer.extend(entries)
+        due = len(_buffer) >= AUDIT_BATCH_SIZE or time.monotonic() - _buffer_since >= AUDIT_FLUSH_SECONDS
+    if due:
+        flush_audit_log()
+    return len(entries)
+
+
+def log_action(admin_id: int, action: str, *, player_id: int = None, match_id: int = None,
+               before: dict = None, after: dict = None, conn: sqlite3.Connection = None) -> None:
+    """Record one admin action (see `log_entries`)."""
+    log_entries([audit_entry(admin_id, action, player_id, match_id, before, after)], conn)
+
+
+def flush_audit_log() -> int:
+    """Write the buffered entries in one transaction. Returns the number written."""
+    global _buffer
+    with _buffer_lock:
+        entries, _buffer = _buffer, []
+    if not entries:
+        return 0
+    try:
+        with get_connection() as conn:
+            conn.executemany(_INSERT_SQL, entries)
+    except sqlite3.Error:
+        # Keep them for the next flush
+        with _buffer_lock:
+            _buffer[:0] = entries
+        raise
+    return len(entries)
+
+
+def pending_entries() -> int:
+    """Number of buffered entries not yet written."""
+    with _buffer_lock:
+        return len(_buffer)
+
+
+# ---------------------------------------------------------------------------- #
+# Browsing
+# ---------------------------------------------------------------------------- #
+
+def get_audit_page(limit: int = PAGE_SIZE, before: Optional[tuple] = None, admin_id: int = None,
+                   action: str = None, player_id: int = None,
+                   match_id: int = None) -> Tuple[List[tuple], Optional[tuple]]:
+    """
+    One page of the log, newest first, and the cursor of the next (older)
+    page -- None on the last one. Pass that cursor as `before` to read on.
+    Rows: (timestamp, admin name, action, target_player_id,
+    target_match_id, details).
+    """
+    flush_audit_log()
+    clauses, params = [], []
+    for column, value in (("a.admin_id", admin_id), ("a.action", action),
+                          ("a.target_player_id", player_id), ("a.target_match_id", match_id)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if before is not None:
+        clauses.append("(a.timestamp, a.id) < (?, ?)")
+        params.extend(before)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    with get_connection() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT a.timestamp, a.id, p.name, a.action, a.target_player_id, a.target_match_id, a.details
+            FROM audit_log a
+            LEFT JOIN players p ON p.id = a.admin_id
+            {where}
+            ORDER BY a.timestamp DESC, a.id DESC
+            LIMIT ?
+            """,
+            (*params, limit + 1),
+        ).fetchall()
+    cursor = rows[limit - 1][:2] if len(rows) > limit else None
+    return [(row[0],) + row[2:] for row in rows[:limit]], cursor
+
+
+def get_audit_actions() -> List[str]:
+    """Every action in the log or its daily rollups, A-Z (for filters)."""
+    with get_connection() as conn:
+        return [row[0] for row in conn.execute(
+            "SELECT DISTINCT action FROM audit_log WHERE action IS NOT NULL "
+            "UNION SELECT action FROM audit_log_daily ORDER BY 1"
+        )]
+
+
+def get_audit_summaries(limit: int = PAGE_SIZE, admin_id: int = None,
+                        action: str = None) -> List[tuple]:
+    """Daily rollups, newest first: (day, admin name, action, entries, first_at, last_at)."""
+    clauses, params = [], []
+    if admin_id is not None:
+        clauses.append("d.admin_id = ?")
+        params.append(admin_id)
+    if action is not None:
+        clauses.append("d.action = ?")
+        params.append(action)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with get_connection() as conn:
+        return conn.execute(
+            f"""
+            SELECT d.day, p.name, d.action, d.entries, d.first_at, d.last_at
+            FROM audit_log_daily d
+            LEFT JOIN players p ON p.id = d.admin_id
+            {where}
+            ORDER BY d.day DESC, d.action
+            LIMIT ?
+            """,
+            (*params, limit),
+        ).fetchall()
+
+
+# ---------------------------------------------------------------------------- #
+# Retention
+# ---------------------------------------------------------------------------- #
+
+_ROLL_UP_SQL = """
+    INSERT INTO audit_log_daily (day, admin_id, action, entries, first_at, last_at)
+    SELECT DATE(timestamp), COALESCE(admin_id, 0), COALESCE(action, ''), COUNT(*),
+           MIN(timestamp), MAX(timestamp)
+    FROM audit_log
+    WHERE timestamp < ?
+    GROUP BY 1, 2, 3
+    ON CONFLICT (day, admin_id, action) DO UPDATE SET
+        entries = entries + excluded.entries,
+        first_at = MIN(first_at, excluded.first_at),
+        last_at = MAX(last_at, excluded.last_at)
+"""
+
+_ARCHIVE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS audit_archive.audit_log (
+        id INTEGER PRIMARY KEY,
+        admin_id INTEGER,
+        action TEXT,
+        target_player_id INTEGER,
+        target_match_id INTEGER,
+        details TEXT,
+        timestamp DATETIME
+    )
+"""
+
+
+def _roll_up_before(conn: sqlite3.Connection, bound: str, archive: bool) -> Tuple[int, int]:
+    archived = 0
+    if archive:
+        archived = conn.execute(
+            """
+            INSERT OR IGNORE INTO audit_archive.audit_log
+            SELECT id, admin_id, action, target_player_id, target_match_id, details, timestamp
+            FROM main.audit_log WHERE timestamp < ?
+            """,
+            (bound,),
+        ).rowcount
+    conn.execute(_ROLL_UP_SQL, (bound,))
+    rolled_up = conn.execute("DELETE FROM audit_log WHERE timestamp < ?", (bound,)).rowcount
+    return rolled_up, archived
+
+
+def roll_up_audit_log(retention_days: int = AUDIT_RETENTION_DAYS,
+                      archive_path: Optional[str] = AUDIT_ARCHIVE_DB) -> Dict:
+    """
+    Move entries older than `retention_days` out of `audit_log`: count them
+    into `audit_log_daily`, copy them to `archive_path` (an SQLite file,
+    created on first use) when given, and delete them. One transaction per
+    ROLL_UP_DAYS_PER_BATCH days of entries, so a large backlog never holds
+    the write lock for long.
+    Returns a report: cutoff, rolled_up, archived, elapsed_ms.
+    """
+    started = time.perf_counter()
+    flush_audit_log()
+    rolled_up = archived = 0
+    with get_connection() as conn:
+        cutoff = conn.execute(
+            "SELECT DATETIME('now', ?)", (f"-{int(retention_days)} days",)
+        ).fetchone()[0]
+        if archive_path:
+            # ATTACH is not allowed inside a transaction
+            conn.execute("ATTACH DATABASE ? AS audit_archive", (archive_path,))
+        try:
+            if archive_path:
+                conn.execute("PRAGMA audit_archive.journal_mode = WAL")
+                conn.execute("PRAGMA audit_archive.synchronous = NORMAL")
+                conn.execute(_ARCHIVE_SCHEMA)
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS audit_archive.idx_audit_log_timestamp "
+                    "ON audit_log (timestamp, id)"
+                )
+                conn.commit()
+            while True:
+                conn.execute("BEGIN IMMEDIATE")
+                # End of the batch starting with the oldest day left (the cutoff at the latest)
+                bound = conn.execute(
+                    "SELECT MIN(DATETIME(DATE(MIN(timestamp)), ?), ?) FROM audit_log",
+                    (f"+{ROLL_UP_DAYS_PER_BATCH} days", cutoff),
+                ).fetchone()[0]
+                if bound is None or not conn.execute(
+                    "SELECT 1 FROM audit_log WHERE timestamp < ? LIMIT 1", (bound,)
+                ).fetchone():
+                    conn.rollback()
+                    break
+                day_rolled_up, day_archived = _roll_up_before(conn, bound, bool(archive_path))
+                conn.commit()
+                rolled_up += day_rolled_up
+                archived += day_archived
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            if archive_path:
+                conn.execute("DETACH DATABASE audit_archive")
+    return {
+        "cutoff": cutoff,
+        "rolled_up": rolled_up,
+        "archived": archived,
+        "elapsed_ms": (time.perf_counter() - started) * 1000,
+    }
+
+
+_retention_thread = None
+_retention_lock = threading.Lock()
+
+
+def _retain() -> None:
+    try:
+        roll_up_audit_log()
+    except sqlite3.Error:
+        pass  # e.g. database locked: the next process start tries again
+
+
+def ensure_retention() -> threading.Thread:
+    """Run `roll_up_audit_log` on a daemon thread, once per process (called at app startup)."""
+    global _retention_thread
+    with _retention_lock:
+        if _retention_thread is None:
+            _retention_thread = threading.Thread(target=_retain, name="audit-retention", daemon=True)
+            _retention_thread.start()
+        return _retention_thread
+
+
+def _flush_at_exit() -> None:
+    try:
+        flush_audit_log()
+    except sqlite3.Error:
+        pass
+
+
+atexit.register(_flush_at_exit)
+
+
+if __name__ == "__main__":
+    import argparse
+    from utils.migrations import ensure_schema
+
+    parser = argparse.ArgumentParser(description="Roll old audit log entries up into daily summaries.")
+    parser.add_argument("--days", type=int, default=AUDIT_RETENTION_DAYS,
+                        help=f"keep this many days of entries (default {AUDIT_RETENTION_DAYS})")
+    parser.add_argument("--archive", default=AUDIT_ARCHIVE_DB,
+                        help="also copy the entries to this SQLite file")
+    args = parser.parse_args()
+
+    ensure_schema()
+    report = roll_up_audit_log(args.days, args.archive)
+    print(
+        f"✅ {report['rolled_up']} entries before {report['cutoff']} rolled up"
+        + (f", {report['archived']} archived to {args.archive}" if args.archive else "")
+        + f" in {report['elapsed_ms']:.1f} ms"
+    )
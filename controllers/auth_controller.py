@@ -1,44 +1,162 @@
 import hashlib
+import hmac
 import os
+import secrets
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import bcrypt
+import jwt
 from utils.db import get_connection
+from utils.query_cache import cached, invalidates
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 ADMIN_SECRET = os.getenv("ADMIN_SECRET")
 
+# Password KDF: bcrypt cost factor (each +1 doubles the work)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL; the pool bounds how many hashes run at once so a
+# login spike queues instead of starving every other session of CPU.
+AUTH_WORKERS = int(os.getenv("AUTH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Session tokens: HS256-signed and checked on every rerun against the
+# player's token_version (migration 10), so a deleted, demoted or otherwise
+# edited player loses the session right away.
+# Without SESSION_SECRET a per-process key is used (sessions end on restart).
+SESSION_SECRET = os.getenv("SESSION_SECRET") or secrets.token_hex(32)
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_HOURS", "12")) * 3600
+SESSION_ALGORITHM = "HS256"
+
+_kdf_pool = ThreadPoolExecutor(max_workers=AUTH_WORKERS, thread_name_prefix="auth-kdf")
+
+
+def _is_legacy_hash(hashed):
+    """Unsalted SHA-256 hex digests from before bcrypt."""
+    return len(hashed) == 64 and all(c in "0123456789abcdef" for c in hashed)
+
+
+def _needs_rehash(hashed):
+    if _is_legacy_hash(hashed):
+        return True
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
 def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+
+def hash_password_async(password) -> Future:
+    """Hash on the KDF pool (bounded like logins); resolves to the hash."""
+    return _kdf_pool.submit(hash_password, password)
+
 
 def verify_password(password, hashed):
-    return hash_password(password) == hashed
+    if not hashed:
+        return False
+    if _is_legacy_hash(hashed):
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(legacy, hashed)
+    try:
+        return bcrypt.checkpw(password.encode(), hashed.encode())
+    except ValueError:
+        return False
+
+
+_dummy_hash = None
+
+
+def _authenticate(username, password):
+    global _dummy_hash
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT id, pw, role, token_version FROM players WHERE name = ?", (username,)
+        ).fetchone()
+    if not row:
+        # Same cost as a real check, so response time doesn't reveal unknown names
+        _dummy_hash = _dummy_hash or hash_password(secrets.token_hex(8))
+        verify_password(password, _dummy_hash)
+        return None
+    if not verify_password(password, row[1]):
+        return None
+    if _needs_rehash(row[1]):
+        # Upgrade legacy / outdated hashes on the first successful login
+        with get_connection() as conn:
+            conn.execute("UPDATE players SET pw = ? WHERE id = ?", (hash_password(password), row[0]))
+    return {"id": row[0], "username": username, "role": row[2], "token_version": row[3]}
+
+
+def login_async(username, password) -> Future:
+    """Run the password check on the KDF pool; resolves to the user dict or None."""
+    return _kdf_pool.submit(_authenticate, username, password)
+
 
 def login(username, password):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, pw, role FROM players WHERE name = ?", (username,))
-    row = cursor.fetchone()
-    if row and verify_password(password, row[1]):
-        return {"id": row[0], "username": username, "role": row[2]}
-    return None
+    return login_async(username, password).result()
 
-def signup(username, password, admin_code=None):
-    conn = get_connection()
-    cursor = conn.cursor()
 
-    # Check if username already exists
-    cursor.execute("SELECT id FROM players WHERE name = ?", (username,))
-    if cursor.fetchone():
-        return False, "Username already exists"
+# ----------------------------- #
+# Session tokens
+# ----------------------------- #
+def issue_session_token(user):
+    now = int(time.time())
+    claims = {
+        "sub": str(user["id"]),
+        "name": user["username"],
+        "role": user["role"],
+        "ver": user.get("token_version", 0),
+        "iat": now,
+        "exp": now + SESSION_TTL_SECONDS,
+    }
+    return jwt.encode(claims, SESSION_SECRET, algorithm=SESSION_ALGORITHM)
 
-    hashed_pw = hash_password(password)
+
+@cached("players", copy_result=False)
+def _session_player(player_id):
+    """(name, role, token_version) of a player, None once deleted. Served from the query cache."""
+    with get_connection() as conn:
+        return conn.execute(
+            "SELECT name, role, token_version FROM players WHERE id = ?", (player_id,)
+        ).fetchone()
+
+
+def validate_session_token(token):
+    """
+    Return the user dict of a valid, unexpired token whose player still
+    exists with the same token_version (None otherwise). Checked in memory:
+    the player comes from the query cache, which the player write paths
+    invalidate.
+    """
+    if not token:
+        return None
+    try:
+        claims = jwt.decode(token, SESSION_SECRET, algorithms=[SESSION_ALGORITHM])
+    except jwt.InvalidTokenError:
+        return None
+    row = _session_player(int(claims["sub"]))
+    # The name guards against a deleted player's id being reused by a new one
+    if row is None or row[2] != claims.get("ver") or row[0] != claims["name"]:
+        return None
+    return {"id": int(claims["sub"]), "username": row[0], "role": row[1], "token_version": row[2]}
+
+
+@invalidates("players")
+def signup(username, password, admin_code=None):
+    hashed_pw = hash_password_async(password).result()
 
     # Determine role
     role = "admin" if admin_code == ADMIN_SECRET else "user"
 
     try:
-        cursor.execute("INSERT INTO players (name, pw, role) VALUES (?, ?, ?)", (username, hashed_pw, role))
-        conn.commit()
+        with get_connection() as conn:
+            # Check if username already exists
+            if conn.execute("SELECT id FROM players WHERE name = ?", (username,)).fetchone():
+                return False, "Username already exists"
+            conn.execute("INSERT INTO players (name, pw, role) VALUES (?, ?, ?)", (username, hashed_pw, role))
         return True, f"Account created successfully as {role}."
     except Exception as e:
         return False, f"Error: {str(e)}"
@@ -1,75 +1,377 @@
 # controllers/cup_controller.py
+"""
+Knockout cups between players.
+
+`create_cup` seeds the field from the standings before the cup's first
+gameweek (one aggregate query), lays out a bracket of the next power of two
+-- the top seeds get the byes -- and writes the cup, all of its cup_rounds
+and the first-round cup_matches in one transaction. Cup round k is played in
+gameweek start + k - 1; a tie's `slot` (migration 6) places it in the
+bracket, its winner moving on to slot // 2 of the next round.
+
+Ties are decided by `resolve_cup_ties`, which every scoring write path calls
+inside its transaction once the gameweek's matches are all finished: one
+aggregate query ranks both players of every tie of the gameweek, the
+winners are written with one executemany and the next round's ties are drawn
+with one INSERT ... SELECT.
+"""
 
 import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional
+
 from utils.db import get_connection
+from utils.query_cache import cached, invalidates
+from controllers.rounds_controller import CURRENT_SEASON_SQL, ensure_round
+from controllers.team_catalogue import get_catalogue, name_key
+from controllers.audit_log import log_action
+
+MIN_ENTRANTS = 2
+
+# Cup rounds named after the number of players still in (larger fields: "Round of N")
+_ROUND_NAMES = {2: "Final", 4: "Semi Final", 8: "Quarter Final"}
+
+# Seeding: points from the rounds of the current season played before the cup
+# starts, then exact hits, then name; players with no points are seeded last.
+_SEEDING_QUERY = f"""
+    SELECT pl.id
+    FROM players pl
+    LEFT JOIN (
+        SELECT prs.player_id, SUM(prs.points) AS points, SUM(prs.exact_hits) AS exact_hits
+        FROM player_round_standings prs
+        JOIN rounds r ON r.id = prs.round_id
+        WHERE r.season_id = {CURRENT_SEASON_SQL} AND r.round_number < ?
+        GROUP BY prs.player_id
+    ) form ON form.player_id = pl.id
+    WHERE pl.role = 'user'
+    ORDER BY COALESCE(form.points, 0) DESC, COALESCE(form.exact_hits, 0) DESC, pl.name
+"""
+
+
+def bracket_size(entrants: int) -> int:
+    """Smallest power of two holding `entrants` players."""
+    size = 1
+    while size < entrants:
+        size *= 2
+    return size
+
+
+def cup_round_name(players_left: int) -> str:
+    return _ROUND_NAMES.get(players_left, f"Round of {players_left}")
+
+
+def bracket_order(size: int) -> List[int]:
+    """
+    Seeds (1-based) in bracket order: consecutive pairs meet in the first
+    round, and seeds 1 and 2 can only meet in the final.
+    """
+    order = [1]
+    while len(order) < size:
+        order = [seed for top in order for seed in (top, 2 * len(order) + 1 - top)]
+    return order
+
+
+def seed_players(conn: sqlite3.Connection, start_round_number: int,
+                 entrants: Optional[int] = None) -> List[int]:
+    """Player ids by seed (best first), at most `entrants` of them."""
+    ids = [row[0] for row in conn.execute(_SEEDING_QUERY, (start_round_number,))]
+    return ids[:entrants] if entrants else ids
+
+
+def plan_bracket(seeded: List[int]) -> List[tuple]:
+    """First-round ties (slot, player1, player2, winner); a bye has no player2 and is won already."""
+    order = bracket_order(bracket_size(len(seeded)))
+    ties = []
+    for slot in range(len(order) // 2):
+        high, low = sorted((order[2 * slot], order[2 * slot + 1]))
+        player1 = seeded[high - 1]
+        player2 = seeded[low - 1] if low <= len(seeded) else None
+        ties.append((slot, player1, player2, None if player2 else player1))
+    return ties
+
+
+@invalidates("cups", "cup_rounds", "cup_matches", "rounds")
+def create_cup(name: str, competition_name: str, start_round_number: int,
+               entrants: Optional[int] = None, admin_id: Optional[int] = None) -> Dict:
+    """
+    Seed and create a cup. `entrants` limits the field to the top seeds
+    (None: every player); the creation is audited when `admin_id` is given.
+    Returns a report: cup_id, entrants, bracket_size, byes, rounds,
+    elapsed_ms. Raises ValueError for an invalid field.
+    """
+    started = time.perf_counter()
+    if not name.strip():
+        raise ValueError("The cup needs a name.")
+    competition_id = get_catalogue().resolve_competitions([competition_name])[name_key(competition_name)]
+
+    with get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        if conn.execute("SELECT 1 FROM cups WHERE name = ?", (name.strip(),)).fetchone():
+            raise ValueError(f"A cup named '{name.strip()}' already exists.")
+        seeded = seed_players(conn, start_round_number, entrants)
+        if len(seeded) < MIN_ENTRANTS:
+            raise ValueError(f"A cup needs at least {MIN_ENTRANTS} players.")
+
+        size = bracket_size(len(seeded))
+        round_count = size.bit_length() - 1
+        start_round_id = ensure_round(conn, competition_id, start_round_number)
+        cup_id = conn.execute(
+            "INSERT INTO cups (name, competition_id, start_round_id) VALUES (?, ?, ?)",
+            (name.strip(), competition_id, start_round_id),
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO cup_rounds (cup_id, name, order_number) VALUES (?, ?, ?)",
+            [(cup_id, cup_round_name(size >> (order - 1)), order) for order in range(1, round_count + 1)],
+        )
+        first_round_id = conn.execute(
+            "SELECT id FROM cup_rounds WHERE cup_id = ? AND order_number = 1", (cup_id,)
+        ).fetchone()[0]
+        ties = plan_bracket(seeded)
+        conn.executemany(
+            """
+            INSERT INTO cup_matches (cup_round_id, player1_id, player2_id, winner_id, round_number, slot)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [(first_round_id, p1, p2, winner, start_round_number, slot) for slot, p1, p2, winner in ties],
+        )
+        # Seeds with a bye on both sides of a pair meet in round two right away
+        draw_next_round(conn, [first_round_id])
+        log_action(admin_id, "create_cup", after={
+            "cup_id": cup_id, "name": name.strip(), "competition": competition_name,
+            "start_round": start_round_number, "entrants": len(seeded), "bracket_size": size,
+        }, conn=conn)
+
+    return {
+        "cup_id": cup_id,
+        "entrants": len(seeded),
+        "bracket_size": size,
+        "byes": size - len(seeded),
+        "rounds": round_count,
+        "elapsed_ms": (time.perf_counter() - started) * 1000,
+    }
 
 
-def get_current_cup_round_id():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM rounds WHERE is_current = 1")
-    result = cursor.fetchone()
-    conn.close()
-    return result[0] if result else None
+@cached("cups")
+def get_cups() -> List[tuple]:
+    """(id, name) of every cup, newest first."""
+    with get_connection() as conn:
+        return conn.execute("SELECT id, name FROM cups ORDER BY id DESC").fetchall()
+
+
+@cached("cup_rounds", "cup_matches")
+def get_cup_rounds(cup_id: int) -> List[tuple]:
+    """(id, name, order_number, gameweek, ties) of a cup's rounds, first round first."""
+    with get_connection() as conn:
+        return conn.execute(
+            """
+            SELECT cr.id, cr.name, cr.order_number, MIN(cm.round_number), COUNT(cm.id)
+            FROM cup_rounds cr
+            LEFT JOIN cup_matches cm ON cm.cup_round_id = cr.id
+            WHERE cr.cup_id = ?
+            GROUP BY cr.id
+            ORDER BY cr.order_number
+            """,
+            (cup_id,),
+        ).fetchall()
+
+
+def get_current_cup_round_id(cup_id: int) -> Optional[int]:
+    """The first round of the cup with an undecided tie (the last paired round otherwise)."""
+    with get_connection() as conn:
+        row = conn.execute(
+            """
+            SELECT cr.id
+            FROM cup_rounds cr
+            JOIN cup_matches cm ON cm.cup_round_id = cr.id
+            WHERE cr.cup_id = ?
+            GROUP BY cr.id
+            ORDER BY MAX(cm.winner_id IS NULL) DESC,
+                     CASE WHEN MAX(cm.winner_id IS NULL) THEN cr.order_number ELSE -cr.order_number END
+            LIMIT 1
+            """,
+            (cup_id,),
+        ).fetchone()
+    return row[0] if row else None
 
 
 def get_round_name(round_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM rounds WHERE id = ?", (round_id,))
-    result = cursor.fetchone()
-    conn.close()
+    with get_connection() as conn:
+        result = conn.execute("SELECT name FROM rounds WHERE id = ?", (round_id,)).fetchone()
     return result[0] if result else f"Round {round_id}"
 
 
-def get_player_points(player_id, cup_round_id=None):
-    conn = get_connection()
-    cursor = conn.cursor()
+# Winner of every tie of the given gameweeks whose matches are all finished,
+# in cups of the current season. A tie is re-evaluated (e.g. after a
+# rescore) only while the next-round tie it feeds is undecided, so the
+# bracket beyond it never changes under a decided tie. Tie-breakers: gameweek
+# points, then exact hits, then outcome hits, then player1 -- the side of the
+# bracket holding the better seed.
+_TIE_WINNERS_QUERY = f"""
+    WITH gameweeks AS (
+        SELECT r.round_number
+        FROM rounds r
+        JOIN matches m ON m.round_id = r.id
+        WHERE r.season_id = {CURRENT_SEASON_SQL} AND r.round_number IN ({{marks}})
+        GROUP BY r.round_number
+        HAVING SUM(m.status IS NOT 'finished' OR m.home_score IS NULL OR m.away_score IS NULL) = 0
+    ),
+    ties AS (
+        SELECT cm.id, cm.player1_id, cm.player2_id, cm.winner_id, cm.round_number
+        FROM cup_matches cm
+        JOIN cup_rounds cr ON cr.id = cm.cup_round_id
+        JOIN cups c ON c.id = cr.cup_id
+        JOIN rounds sr ON sr.id = c.start_round_id
+        LEFT JOIN cup_rounds nr ON nr.cup_id = cr.cup_id AND nr.order_number = cr.order_number + 1
+        LEFT JOIN cup_matches nx ON nx.cup_round_id = nr.id AND nx.slot = cm.slot / 2
+        WHERE sr.season_id = {CURRENT_SEASON_SQL}
+          AND cm.round_number IN (SELECT round_number FROM gameweeks)
+          AND cm.player2_id IS NOT NULL
+          AND nx.winner_id IS NULL
+    ),
+    form AS (
+        SELECT prs.player_id, r.round_number,
+               SUM(prs.points) AS points, SUM(prs.exact_hits) AS exact_hits,
+               SUM(prs.outcome_hits) AS outcome_hits
+        FROM player_round_standings prs
+        JOIN rounds r ON r.id = prs.round_id
+        WHERE r.season_id = {CURRENT_SEASON_SQL}
+          AND r.round_number IN (SELECT round_number FROM gameweeks)
+          AND prs.player_id IN (SELECT player1_id FROM ties UNION SELECT player2_id FROM ties)
+        GROUP BY prs.player_id, r.round_number
+    )
+    SELECT t.id, t.winner_id,
+           CASE WHEN (COALESCE(f1.points, 0), COALESCE(f1.exact_hits, 0), COALESCE(f1.outcome_hits, 0))
+                  >= (COALESCE(f2.points, 0), COALESCE(f2.exact_hits, 0), COALESCE(f2.outcome_hits, 0))
+                THEN t.player1_id ELSE t.player2_id END
+    FROM ties t
+    LEFT JOIN form f1 ON f1.player_id = t.player1_id AND f1.round_number = t.round_number
+    LEFT JOIN form f2 ON f2.player_id = t.player2_id AND f2.round_number = t.round_number
+"""
 
-    query = """
-        SELECT COALESCE(SUM(p.points_awarded), 0)
-        FROM predictions p
-        JOIN matches m ON p.match_id = m.id
-        WHERE p.player_id = ?
-    """
+# Next-round tie of every pair of decided ties (winner of the even slot is
+# player1); a tie already drawn is redrawn only while it is undecided.
+_DRAW_NEXT_ROUND_SQL = """
+    INSERT INTO cup_matches (cup_round_id, player1_id, player2_id, round_number, slot)
+    SELECT nr.id,
+           MAX(CASE WHEN cm.slot % 2 = 0 THEN cm.winner_id END),
+           MAX(CASE WHEN cm.slot % 2 = 1 THEN cm.winner_id END),
+           MAX(cm.round_number) + 1,
+           cm.slot / 2
+    FROM cup_matches cm
+    JOIN cup_rounds cr ON cr.id = cm.cup_round_id
+    JOIN cup_rounds nr ON nr.cup_id = cr.cup_id AND nr.order_number = cr.order_number + 1
+    WHERE cm.cup_round_id IN ({marks})
+    GROUP BY nr.id, cm.slot / 2
+    HAVING COUNT(*) = 2 AND COUNT(cm.winner_id) = 2
+    ON CONFLICT (cup_round_id, slot) DO UPDATE SET
+        player1_id = excluded.player1_id,
+        player2_id = excluded.player2_id
+    WHERE cup_matches.winner_id IS NULL
+      AND (cup_matches.player1_id, cup_matches.player2_id)
+          IS NOT (excluded.player1_id, excluded.player2_id)
+"""
 
-    params = [player_id]
 
-    if cup_round_id:
-        query += " AND m.cup_round_id = ?"
-        params.append(cup_round_id)
+def draw_next_round(conn: sqlite3.Connection, cup_round_ids: Iterable[int]) -> int:
+    """Draw the next-round ties fed by decided ties of `cup_round_ids`. Returns the ties written."""
+    cup_round_ids = list(cup_round_ids)
+    if not cup_round_ids:
+        return 0
+    marks = ",".join("?" * len(cup_round_ids))
+    return conn.execute(_DRAW_NEXT_ROUND_SQL.format(marks=marks), cup_round_ids).rowcount
 
-    cursor.execute(query, tuple(params))
-    result = cursor.fetchone()
-    conn.close()
-    return result[0] if result else 0
+
+def resolve_cup_ties(conn: sqlite3.Connection, round_numbers: Optional[Iterable[int]] = None) -> Dict:
+    """
+    Decide the cup ties of the given gameweeks (None: every gameweek with a
+    tie) inside the caller's transaction, then draw the ties they feed.
+    Gameweeks with a match not finished yet are left alone; ties drawn into
+    a gameweek that is already complete are decided straight away. Returns
+    {"decided": ties whose winner changed, "drawn": next-round ties written}.
+    """
+    if round_numbers is None:
+        round_numbers = [row[0] for row in conn.execute("SELECT DISTINCT round_number FROM cup_matches")]
+    round_numbers = sorted(set(round_numbers))
+    if not round_numbers:
+        return {"decided": 0, "drawn": 0}
+
+    report = {"decided": 0, "drawn": 0}
+    while round_numbers:
+        marks = ",".join("?" * len(round_numbers))
+        rows = conn.execute(_TIE_WINNERS_QUERY.format(marks=marks), round_numbers).fetchall()
+        changed = [(winner, tie_id) for tie_id, current, winner in rows if winner != current]
+        conn.executemany("UPDATE cup_matches SET winner_id = ? WHERE id = ?", changed)
+
+        # Rounds of the ties just decided; byes need no gameweek, so their
+        # rounds are always rechecked
+        tie_ids = [tie_id for tie_id, _, _ in rows]
+        cup_round_ids = [row[0] for row in conn.execute(
+            f"""
+            SELECT DISTINCT cup_round_id FROM cup_matches
+            WHERE id IN ({','.join('?' * len(tie_ids)) or 'NULL'})
+               OR (round_number IN ({marks}) AND player2_id IS NULL)
+            """,
+            [*tie_ids, *round_numbers],
+        )]
+        drawn = draw_next_round(conn, cup_round_ids)
+        report["decided"] += len(changed)
+        report["drawn"] += drawn
+        # Ties just drawn may fall in a gameweek that is already complete
+        round_numbers = sorted({number + 1 for number in round_numbers}) if drawn else []
+    return report
 
 
+@cached("cup_matches", "players", "predictions", "matches", "rounds", "seasons")
 def get_cup_matchups_with_points(cup_round_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT cm.id, 
-               p1.id, p1.name,
-               p2.id, p2.name,
-               cm.winner_id
-        FROM cup_matchups cm
-        LEFT JOIN players p1 ON cm.player1_id = p1.id
-        LEFT JOIN players p2 ON cm.player2_id = p2.id
-        WHERE cm.cup_round_id = ?
-          AND (cm.player1_id IS NOT NULL OR cm.player2_id IS NOT NULL)
-        ORDER BY cm.id
-    """, (cup_round_id,))
+    """
+    Return every tie of a cup round with both players' gameweek points.
+
+    Points for all players in the bracket are aggregated in the same
+    statement as the ties themselves, so the whole round renders with a
+    single query regardless of bracket size.
+    """
+    query = f"""
+        WITH ties AS (
+            SELECT id, player1_id, player2_id, winner_id, round_number, slot
+            FROM cup_matches
+            WHERE cup_round_id = ?
+              AND (player1_id IS NOT NULL OR player2_id IS NOT NULL)
+        ),
+        gameweek_points AS (
+            SELECT p.player_id, gw.round_number, SUM(COALESCE(p.points_awarded, 0)) AS points
+            FROM (SELECT DISTINCT round_number FROM ties) gw
+            JOIN rounds r ON r.round_number = gw.round_number AND r.season_id = {CURRENT_SEASON_SQL}
+            JOIN matches m ON m.round_id = r.id
+            JOIN predictions p ON p.match_id = m.id
+            WHERE p.player_id IN (
+                SELECT player1_id FROM ties UNION SELECT player2_id FROM ties
+            )
+            GROUP BY p.player_id, gw.round_number
+        )
+        SELECT t.id,
+               p1.id, p1.name, COALESCE(g1.points, 0),
+               p2.id, p2.name, COALESCE(g2.points, 0),
+               t.winner_id
+        FROM ties t
+        LEFT JOIN players p1 ON t.player1_id = p1.id
+        LEFT JOIN players p2 ON t.player2_id = p2.id
+        LEFT JOIN gameweek_points g1
+               ON g1.player_id = t.player1_id AND g1.round_number = t.round_number
+        LEFT JOIN gameweek_points g2
+               ON g2.player_id = t.player2_id AND g2.round_number = t.round_number
+        ORDER BY t.slot, t.id
+    """
+
+    with get_connection() as conn:
+        rows = conn.execute(query, (cup_round_id,)).fetchall()
 
     matchups = []
-    for row in cursor.fetchall():
-        _, p1_id, p1_name, p2_id, p2_name, winner_id = row
+    for row in rows:
+        _, p1_id, p1_name, p1_points, p2_id, p2_name, p2_points, winner_id = row
 
-        player1 = {'id': p1_id, 'name': p1_name, 'points': get_player_points(p1_id, cup_round_id)} if p1_id else None
-        player2 = {'id': p2_id, 'name': p2_name, 'points': get_player_points(p2_id, cup_round_id)} if p2_id else None
+        player1 = {'id': p1_id, 'name': p1_name, 'points': p1_points} if p1_id else None
+        player2 = {'id': p2_id, 'name': p2_name, 'points': p2_points} if p2_id else None
 
         matchups.append({'player1': player1, 'player2': player2, 'winner_id': winner_id})
 
-    conn.close()
     return matchups
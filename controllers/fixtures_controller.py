@@ -0,0 +1,281 @@
+# controllers/fixtures_controller.py
+"""
+Bulk fixture import from CSV or JSON.
+
+Rows are streamed from the file and validated. Competitions and teams are
+resolved through the in-memory team catalogue (unknown names are created
+there in bulk), rounds through a name -> id map built once per import. All matches are then written
+with one executemany of UPSERT_MATCH_SQL in a single transaction: fixtures
+already present in the round (either team order) are updated, the rest
+inserted — the same statement `matches_controller.add_match` runs for one
+match.
+
+Columns (CSV header or JSON keys):
+    competition, round, home_team, away_team, match_datetime
+    status, home_score, away_score                      (optional)
+
+JSON files may hold a list of objects or one object per line.
+
+    python -m controllers.fixtures_controller fixtures.csv
+"""
+
+import csv
+import datetime
+import json
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from utils.db import get_connection
+from utils.query_cache import invalidates
+from controllers.rounds_controller import CURRENT_SEASON_SQL, round_name
+from controllers.scoring_queue import notify_worker
+from controllers.team_catalogue import get_catalogue, name_key
+from controllers.audit_log import log_action
+
+REQUIRED_FIELDS = ("competition", "round", "home_team", "away_team", "match_datetime")
+STATUSES = ("not played", "live", "finished")
+MAX_REPORTED_ERRORS = 50
+
+# Unique key of a fixture: its round and unordered team pair (migration 5)
+FIXTURE_CONFLICT_TARGET = (
+    "round_id, MIN(home_team_id, away_team_id), MAX(home_team_id, away_team_id)"
+)
+
+# Insert a fixture, or update kickoff, status and score of the existing one
+# (whichever side is at home) -- a single statement, safe under concurrency.
+UPSERT_MATCH_SQL = f"""
+    INSERT INTO matches (
+        round_id, competition_id, home_team_id, away_team_id,
+        match_datetime, status, home_score, away_score
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT ({FIXTURE_CONFLICT_TARGET}) DO UPDATE SET
+        match_datetime = excluded.match_datetime,
+        status = excluded.status,
+        home_score = excluded.home_score,
+        away_score = excluded.away_score
+"""
+
+
+# ---------------------------------------------------------------------------- #
+# Reading and validation
+# ---------------------------------------------------------------------------- #
+
+def read_rows(stream: TextIO, fmt: str) -> Iterator[dict]:
+    """
+    Yield raw rows from a CSV or JSON text stream: dicts, except in JSON-lines
+    mode where each line is yielded as text (see `_decode`), so one bad line
+    is reported like any other invalid row.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    elif fmt == "json":
+        first = stream.read(1)
+        while first and first.isspace():
+            first = stream.read(1)
+        if first == "[":
+            yield from json.loads(first + stream.read())
+        elif first:
+            for line in _prepend(first, stream):
+                if line.strip():
+                    yield line
+    else:
+        raise ValueError(f"Unsupported fixture format '{fmt}'. Use 'csv' or 'json'.")
+
+
+def _prepend(first: str, stream: TextIO) -> Iterator[str]:
+    lines = iter(stream)
+    yield first + next(lines, "")
+    yield from lines
+
+
+def _decode(raw):
+    """A raw row as a dict: JSON lines are parsed here. Raises ValueError."""
+    if not isinstance(raw, str):
+        return raw
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        raise ValueError("invalid JSON") from None
+
+
+def _optional_score(value) -> Optional[int]:
+    if value is None or str(value).strip() == "":
+        return None
+    return int(value)
+
+
+def parse_row(row: dict) -> dict:
+    """Validate one raw row. Raises ValueError with a readable message."""
+    missing = [f for f in REQUIRED_FIELDS if not str(row.get(f) or "").strip()]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+
+    home, away = str(row["home_team"]).strip(), str(row["away_team"]).strip()
+    if name_key(home) == name_key(away):
+        raise ValueError("home and away teams are the same")
+
+    status = str(row.get("status") or "not played").strip().lower()
+    if status not in STATUSES:
+        raise ValueError(f"invalid status '{status}'")
+
+    try:
+        kickoff = datetime.datetime.fromisoformat(str(row["match_datetime"]).strip())
+        round_number = int(str(row["round"]).strip().removeprefix("Round").strip())
+        home_score = _optional_score(row.get("home_score"))
+        away_score = _optional_score(row.get("away_score"))
+    except ValueError as e:
+        raise ValueError(f"invalid value ({e})")
+
+    return {
+        "competition": str(row["competition"]).strip(),
+        "round_number": round_number,
+        "home_team": home,
+        "away_team": away,
+        "match_datetime": kickoff.strftime("%Y-%m-%d %H:%M:%S"),
+        "status": status,
+        "home_score": home_score,
+        "away_score": away_score,
+    }
+
+
+# ---------------------------------------------------------------------------- #
+# Round map
+# ---------------------------------------------------------------------------- #
+
+def _round_map(conn) -> Dict[Tuple[int, int], int]:
+    return {
+        (competition_id, number): id_
+        for id_, competition_id, number in conn.execute(
+            f"""
+            SELECT id, competition_id, round_number FROM rounds
+            WHERE season_id = {CURRENT_SEASON_SQL} AND round_number IS NOT NULL
+            """
+        )
+    }
+
+
+def _ensure_rounds(conn, keys: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], int]:
+    ids = _round_map(conn)
+    missing = sorted(set(keys) - set(ids))
+    if missing:
+        conn.executemany(
+            f"""
+            INSERT OR IGNORE INTO rounds (name, competition_id, round_number, season_id)
+            VALUES (?, ?, ?, {CURRENT_SEASON_SQL})
+            """,
+            [(round_name(number), competition_id, number) for competition_id, number in missing],
+        )
+        ids = _round_map(conn)
+    return ids
+
+
+# ---------------------------------------------------------------------------- #
+# Import
+# ---------------------------------------------------------------------------- #
+
+@invalidates("matches", "rounds")
+def import_fixtures(stream: TextIO, fmt: str, admin_id: Optional[int] = None) -> dict:
+    """
+    Import every valid row of `stream`. Invalid rows are skipped and
+    reported; a later row for the same fixture overrides an earlier one.
+    With `admin_id`, the import is audited (one entry with its counts).
+
+    Returns a report dict: rows, inserted, updated, skipped, errors,
+    elapsed_s and rows_per_s.
+    """
+    started = time.perf_counter()
+    fixtures: Dict[tuple, dict] = {}
+    errors: List[str] = []
+    rows = 0
+    for line_no, raw in enumerate(read_rows(stream, fmt), start=2 if fmt == "csv" else 1):
+        rows += 1
+        try:
+            fixture = parse_row(_decode(raw))
+        except (ValueError, TypeError, AttributeError) as e:
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(f"Row {line_no}: {e}")
+            continue
+        pair = frozenset((name_key(fixture["home_team"]), name_key(fixture["away_team"])))
+        fixtures[(name_key(fixture["competition"]), fixture["round_number"], pair)] = fixture
+
+    inserted = updated = 0
+    if fixtures:
+        values = list(fixtures.values())
+        catalogue = get_catalogue()
+        competitions = catalogue.resolve_competitions({f["competition"] for f in values})
+        teams = {}
+        for competition in {f["competition"] for f in values}:
+            names = {n for f in values if f["competition"] == competition for n in (f["home_team"], f["away_team"])}
+            teams.update(catalogue.resolve_teams(names, league=competition))
+
+        with get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rounds = _ensure_rounds(
+                conn, {(competitions[name_key(f["competition"])], f["round_number"]) for f in values}
+            )
+
+            round_ids = sorted({rounds[(competitions[name_key(f["competition"])], f["round_number"])]
+                                for f in values})
+            count_sql = f"SELECT COUNT(*) FROM matches WHERE round_id IN ({','.join('?' * len(round_ids))})"
+            before = conn.execute(count_sql, round_ids).fetchone()[0]
+
+            conn.executemany(
+                UPSERT_MATCH_SQL,
+                [
+                    (
+                        rounds[(competitions[name_key(f["competition"])], f["round_number"])],
+                        competitions[name_key(f["competition"])],
+                        teams[name_key(f["home_team"])],
+                        teams[name_key(f["away_team"])],
+                        f["match_datetime"],
+                        f["status"],
+                        f["home_score"],
+                        f["away_score"],
+                    )
+                    for f in values
+                ],
+            )
+            inserted = conn.execute(count_sql, round_ids).fetchone()[0] - before
+            updated = len(values) - inserted
+            log_action(admin_id, "import_fixtures", after={
+                "format": fmt, "rows": rows, "inserted": inserted, "updated": updated,
+                "skipped": rows - len(fixtures),
+            }, conn=conn)
+        notify_worker()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": rows,
+        "inserted": inserted,
+        "updated": updated,
+        "skipped": rows - len(fixtures),
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "rows_per_s": rows / elapsed if elapsed else 0.0,
+    }
+
+
+def import_fixtures_file(path: str) -> dict:
+    """Import a .csv or .json fixture file."""
+    fmt = os.path.splitext(path)[1].lower().lstrip(".")
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return import_fixtures(f, fmt)
+
+
+if __name__ == "__main__":
+    import sys
+    from utils.migrations import ensure_schema
+
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python -m controllers.fixtures_controller <fixtures.csv|fixtures.json>")
+
+    ensure_schema()
+    report = import_fixtures_file(sys.argv[1])
+    for error in report["errors"]:
+        print(f"⚠️ {error}")
+    print(
+        f"✅ {report['rows']} rows: {report['inserted']} inserted, {report['updated']} updated, "
+        f"{report['skipped']} skipped in {report['elapsed_s']:.3f}s "
+        f"({report['rows_per_s']:.0f} rows/s)"
+    )
@@ -1,120 +1,104 @@
-import sqlite3
+import pandas as pd
 
-DB_NAME = "football_game.db"
-
-def get_connection():
-    return sqlite3.connect(DB_NAME)
+from utils.db import get_connection
+from utils.query_cache import cached
+from controllers import rounds_controller
+from controllers.rounds_controller import CURRENT_SEASON_SQL
 
+@cached("players")
 def get_all_players():
     with get_connection() as conn:
         return conn.execute("SELECT id, name FROM players WHERE role = 'user'").fetchall()
 
 def get_all_rounds():
     with get_connection() as conn:
-        query = """
-        SELECT rounds.id, rounds.name
-        FROM rounds
-        GROUP BY rounds.name
-        ORDER BY rounds.name
+        query = f"""
+        SELECT MIN(r.id), MIN(r.name)
+        FROM rounds r
+        WHERE r.season_id = {CURRENT_SEASON_SQL} AND r.round_number IS NOT NULL
+        GROUP BY r.round_number
+        ORDER BY r.round_number
         """
         return conn.execute(query).fetchall()
 
 def get_round_ids_by_name(round_name):
     with get_connection() as conn:
-        c = conn.cursor()
-        c.execute("SELECT id FROM rounds WHERE name = ?", (round_name,))
-        return [r[0] for r in c.fetchall()]
-
-def get_matches_by_round(round_id):
-    with get_connection() as conn:
-        c = conn.cursor()
-
-        # Get round name by ID
-        c.execute("SELECT name FROM rounds WHERE id = ?", (round_id,))
-        row = c.fetchone()
-        if not row:
-            return []
-        round_name = row[0]
-
-        # Get all round IDs with this name (ignore competition)
-        round_ids = get_round_ids_by_name(round_name)
-        placeholders = ",".join("?" * len(round_ids))
-
-        query = f"""
-        SELECT m.id, ht.name, at.name
-        FROM matches m
-        JOIN teams ht ON m.home_team_id = ht.id
-        JOIN teams at ON m.away_team_id = at.id
-        WHERE m.round_id IN ({placeholders})
-        ORDER BY m.match_datetime ASC
-        """
-        c.execute(query, round_ids)
-        return c.fetchall()
-
-def get_predictions_and_points(round_id):
+        return rounds_controller.get_round_ids_by_name(conn, round_name)
+
+# One row per (match, player) of a round; every player appears even without a prediction.
+_ROUND_MATRIX_QUERY = f"""
+SELECT m.id AS match_id,
+       '⚔️ ' || ht.name || ' vs ' || at.name AS "Match",
+       '✅ ' || COALESCE(m.home_score || '-' || m.away_score, '-') AS "Actual Result",
+       pl.name AS player,
+       COALESCE(p.predicted_home_score || '-' || p.predicted_away_score, '-')
+           || ' (' || COALESCE(p.points_awarded, CASE WHEN p.id IS NULL THEN 0 END, '-') || ')' AS cell
+FROM rounds r
+JOIN matches m ON m.round_id = r.id
+JOIN teams ht ON m.home_team_id = ht.id
+JOIN teams at ON m.away_team_id = at.id
+CROSS JOIN players pl
+LEFT JOIN predictions p ON p.match_id = m.id AND p.player_id = pl.id
+WHERE {rounds_controller.ROUND_FILTER} AND pl.role = 'user'
+ORDER BY m.match_datetime, m.id, pl.id
+"""
+
+@cached("matches", "rounds", "seasons", "teams", "players", "predictions")
+def get_round_matrix(round_number):
+    """
+    Predictions of every player for every match of a round, as a DataFrame:
+    one row per match ("Match", one "<prediction> (<points>)" column per
+    player, "Actual Result"), built from a single query and a pivot.
+    """
     with get_connection() as conn:
-        c = conn.cursor()
+        long_df = pd.read_sql(_ROUND_MATRIX_QUERY, conn, params=(round_number,))
 
-        # Get round name by ID
-        c.execute("SELECT name FROM rounds WHERE id = ?", (round_id,))
-        row = c.fetchone()
-        if not row:
-            return {}
-        round_name = row[0]
+    if long_df.empty:
+        return pd.DataFrame(columns=["Match", "Actual Result"])
 
-        # Get all round IDs with this name
-        round_ids = get_round_ids_by_name(round_name)
-        placeholders = ",".join("?" * len(round_ids))
-
-        query = f"""
-        SELECT p.player_id, p.match_id,
-               p.predicted_home_score || '-' || p.predicted_away_score AS prediction,
-               p.points_awarded
-        FROM predictions p
-        JOIN matches m ON p.match_id = m.id
-        WHERE m.round_id IN ({placeholders})
-        """
-        c.execute(query, round_ids)
-        rows = c.fetchall()
-        return {(row[0], row[1]): (row[2], row[3]) for row in rows}
-
-def get_actual_results(round_id):
-    with get_connection() as conn:
-        c = conn.cursor()
-
-        # Get round name by ID
-        c.execute("SELECT name FROM rounds WHERE id = ?", (round_id,))
-        row = c.fetchone()
-        if not row:
-            return {}
-        round_name = row[0]
-
-        # Get all round IDs with this name
-        round_ids = get_round_ids_by_name(round_name)
-        placeholders = ",".join("?" * len(round_ids))
-
-        query = f"""
-        SELECT m.id,
-               CASE WHEN m.home_score IS NOT NULL AND m.away_score IS NOT NULL
-                    THEN m.home_score || '-' || m.away_score
-                    ELSE '-'
-               END as actual_result
-        FROM matches m
-        WHERE m.round_id IN ({placeholders})
-        """
-        c.execute(query, round_ids)
-        rows = c.fetchall()
-        return {row[0]: row[1] for row in rows}
+    player_order = long_df["player"].unique()
+    matches = long_df.drop_duplicates("match_id").set_index("match_id")
+    # pivot() sorts both axes: restore kickoff order and player order
+    cells = long_df.pivot(index="match_id", columns="player", values="cell")
+    cells = cells.reindex(index=matches.index, columns=player_order)
+    matrix = pd.concat([matches[["Match"]], cells, matches[["Actual Result"]]], axis=1)
+    matrix.columns.name = None
+    return matrix.reset_index(drop=True)
 
 def get_overall_points():
     with get_connection() as conn:
-        c = conn.cursor()
         query = """
-        SELECT pl.name, SUM(p.points_awarded) AS total_points
-        FROM predictions p
-        JOIN players pl ON p.player_id = pl.id
-        GROUP BY pl.id
-        ORDER BY total_points DESC
+        SELECT pl.name, ps.total_points
+        FROM player_standings ps
+        JOIN players pl ON ps.player_id = pl.id
+        ORDER BY ps.total_points DESC, pl.name ASC
         """
-        c.execute(query)
-        return c.fetchall()
+        return conn.execute(query).fetchall()
+
+# Medal per dense rank (tied players share a medal); the last place gets the owl
+MEDALS = {1: "👑🥇", 2: "🥈", 3: "🥉"}
+LAST_PLACE = "🦉"
+
+@cached("players", "player_standings")
+def get_overall_leaderboard():
+    """
+    Overall standings as a DataFrame (already in points order) with
+    "Rank" (1, 1, 3, ...), "Dense Rank" (1, 1, 2, ...), "Tier"
+    ('gold', 'silver', 'bronze', 'last' or '') and the medal prefixed to
+    "Player", all computed column-wise.
+    """
+    df = pd.DataFrame(get_overall_points(), columns=["Player", "Total Points"])
+    points = pd.to_numeric(df["Total Points"], errors="coerce").fillna(0).astype(int)
+    df["Total Points"] = points
+    df["Rank"] = points.rank(method="min", ascending=False).astype(int)
+    df["Dense Rank"] = points.rank(method="dense", ascending=False).astype(int)
+
+    is_last = (df["Dense Rank"] == df["Dense Rank"].max()) & (df["Dense Rank"] > len(MEDALS))
+    df["Tier"] = (
+        df["Dense Rank"].map({1: "gold", 2: "silver", 3: "bronze"})
+        .mask(is_last, "last")
+        .fillna("")
+    )
+    medal = df["Dense Rank"].map(MEDALS).mask(is_last, LAST_PLACE)
+    df["Player"] = (medal + " " + df["Player"]).fillna(df["Player"])
+    return df[["Rank", "Dense Rank", "Player", "Total Points", "Tier"]]
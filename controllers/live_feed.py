@@ -0,0 +1,367 @@
+# controllers/live_feed.py
+"""
+Live-score ingestion.
+
+Tails a local feed of JSON lines -- appended to a file, or sent to a
+localhost TCP port -- and applies the score changes to `matches`. Events
+arriving within BATCH_WINDOW seconds are coalesced per match and written in
+one transaction, which also rescores just the predictions of those matches
+and refreshes their rounds' standings (the scoring jobs the match triggers
+queue are processed on the spot, see scoring_queue.score_now). Points of a
+match that is still 'live' are provisional: they follow every goal and
+settle when the match is finished.
+
+One event per line; the match is given by id or by its two teams (a live or
+not-yet-played fixture of the current season, anything else is unknown):
+
+    {"match_id": 12, "goal": "home"}                       one goal (+1)
+    {"match_id": 12, "home_delta": -1}                     disallowed goal
+    {"home_team": "Arsenal", "away_team": "Chelsea", "home_score": 2, "away_score": 1}
+    {"match_id": 12, "status": "finished"}
+
+A scoring event on a 'not played' match moves it to 'live'.
+
+    python -m controllers.live_feed --file feed.jsonl [--from-start]
+    python -m controllers.live_feed --port 8765
+    echo '{"match_id": 12, "goal": "away"}' >> feed.jsonl      # stand-in feed
+
+Pages showing live tables call `poll_changes()`: one `PRAGMA data_version`
+tells whether anything was committed since the last poll (by this service or
+any other process), and only then are the cached reads invalidated.
+"""
+
+import json
+import os
+import queue
+import socketserver
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from utils.db import data_version, get_connection
+from utils.query_cache import bump, cached
+from controllers.rounds_controller import CURRENT_SEASON_SQL
+from controllers.scoring_queue import SCORED_TABLES, score_now
+from controllers.team_catalogue import get_catalogue
+
+BATCH_WINDOW = 0.5        # seconds events are gathered before a write
+POLL_INTERVAL = 0.25      # seconds between reads of an idle feed file
+LIVE_POLL_SECONDS = 5     # refresh interval of open leaderboard pages while matches are live
+APPLY_ATTEMPTS = 3        # writes of a batch before its events are dropped (e.g. database locked)
+LIVE_STATUSES = ("live", "finished")
+
+# Tables a live update changes (cached reads to refresh on pages)
+LIVE_TABLES = ("matches",) + SCORED_TABLES
+
+# One coalesced update per match. A score is set when :home / :away is given,
+# then moved by the deltas; untouched scores stay as they are.
+_APPLY_SQL = """
+    UPDATE matches SET
+        home_score = CASE WHEN :touch THEN MAX(COALESCE(:home, home_score, 0) + :home_delta, 0)
+                          ELSE home_score END,
+        away_score = CASE WHEN :touch THEN MAX(COALESCE(:away, away_score, 0) + :away_delta, 0)
+                          ELSE away_score END,
+        status = COALESCE(:status, CASE WHEN :touch AND status = 'not played' THEN 'live'
+                                        ELSE status END)
+    WHERE id = :id
+"""
+
+# Finished fixtures (and other seasons) are never picked by team names
+_FIXTURE_BY_TEAMS_SQL = f"""
+    SELECT m.id, m.home_team_id FROM matches m
+    JOIN rounds r ON r.id = m.round_id
+    WHERE MIN(m.home_team_id, m.away_team_id) = MIN(:a, :b)
+      AND MAX(m.home_team_id, m.away_team_id) = MAX(:a, :b)
+      AND m.status IN ('live', 'not played')
+      AND r.season_id = {CURRENT_SEASON_SQL}
+    ORDER BY m.status = 'not played',
+             ABS(JULIANDAY(m.match_datetime) - JULIANDAY('now'))
+    LIMIT 1
+"""
+
+
+# ---------------------------------------------------------------------------- #
+# Events
+# ---------------------------------------------------------------------------- #
+
+def parse_event(raw) -> dict:
+    """Validate one event (a JSON line or a dict). Raises ValueError."""
+    event = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+    if not isinstance(event, dict):
+        raise ValueError("event is not a JSON object")
+
+    status = event.get("status")
+    if status is not None and status not in LIVE_STATUSES:
+        raise ValueError(f"invalid status '{status}'")
+    goal = event.get("goal")
+    if goal not in (None, "home", "away"):
+        raise ValueError(f"invalid goal side '{goal}'")
+    if ("home_score" in event) != ("away_score" in event):
+        raise ValueError("home_score and away_score go together")
+
+    parsed = {
+        "match_id": int(event["match_id"]) if event.get("match_id") is not None else None,
+        "home_team": event.get("home_team"),
+        "away_team": event.get("away_team"),
+        "home_score": int(event["home_score"]) if "home_score" in event else None,
+        "away_score": int(event["away_score"]) if "away_score" in event else None,
+        "home_delta": int(event.get("home_delta", 0)) + (goal == "home"),
+        "away_delta": int(event.get("away_delta", 0)) + (goal == "away"),
+        "status": status,
+    }
+    if parsed["match_id"] is None and not (parsed["home_team"] and parsed["away_team"]):
+        raise ValueError("event needs match_id or home_team and away_team")
+    return parsed
+
+
+def _coalesce(updates: Dict[int, dict], match_id: int, event: dict) -> None:
+    """Fold `event` into the pending update of its match (later events win)."""
+    update = updates.setdefault(match_id, {
+        "id": match_id, "touch": 0, "home": None, "away": None,
+        "home_delta": 0, "away_delta": 0, "status": None,
+    })
+    if event["home_score"] is not None:
+        update.update(touch=1, home=event["home_score"], away=event["away_score"],
+                      home_delta=0, away_delta=0)
+    if event["home_delta"] or event["away_delta"]:
+        update["touch"] = 1
+        update["home_delta"] += event["home_delta"]
+        update["away_delta"] += event["away_delta"]
+    if event["status"]:
+        update["status"] = event["status"]
+
+
+def _resolve_match(conn: sqlite3.Connection, event: dict) -> Optional[int]:
+    """Match id of an event. An event naming the teams the other way round is flipped in place."""
+    if event["match_id"] is not None:
+        return event["match_id"]
+    catalogue = get_catalogue()
+    home, away = catalogue.team_id(event["home_team"]), catalogue.team_id(event["away_team"])
+    if home is None or away is None:
+        return None
+    row = conn.execute(_FIXTURE_BY_TEAMS_SQL, {"a": home, "b": away}).fetchone()
+    if row is None:
+        return None
+    if row[1] != home:
+        for home_field, away_field in (("home_score", "away_score"), ("home_delta", "away_delta")):
+            event[home_field], event[away_field] = event[away_field], event[home_field]
+    return row[0]
+
+
+def apply_events(events: Iterable[dict]) -> dict:
+    """
+    Apply parsed events in one transaction and rescore the matches they
+    touch. Returns a report: events, matches, rescored, unknown, elapsed_ms.
+    """
+    started = time.perf_counter()
+    events = list(events)
+    updates: Dict[int, dict] = {}
+    unknown = 0
+    with get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for event in events:
+            match_id = _resolve_match(conn, event)
+            if match_id is None:
+                unknown += 1
+                continue
+            _coalesce(updates, match_id, event)
+        if updates:
+            ids = sorted(updates)
+            known = {row[0] for row in conn.execute(
+                f"SELECT id FROM matches WHERE id IN ({','.join('?' * len(ids))})", ids
+            )}
+            unknown += len(updates.keys() - known)
+            updates = {match_id: updates[match_id] for match_id in ids if match_id in known}
+        rescored = 0
+        if updates:
+            conn.executemany(_APPLY_SQL, list(updates.values()))
+            rescored = score_now(conn, sorted(updates))
+    if updates:
+        bump(*LIVE_TABLES)
+    return {
+        "events": len(events),
+        "matches": len(updates),
+        "rescored": rescored,
+        "unknown": unknown,
+        "elapsed_ms": (time.perf_counter() - started) * 1000,
+    }
+
+
+# ---------------------------------------------------------------------------- #
+# Feed sources and service
+# ---------------------------------------------------------------------------- #
+
+class _LineHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            self.server.lines.put(line.decode("utf-8", "replace"))
+
+
+class LiveFeed:
+    """Gathers raw lines from its sources and applies them in batches (`run`)."""
+
+    def __init__(self, batch_window: float = BATCH_WINDOW):
+        self.batch_window = batch_window
+        self.lines = queue.Queue()
+        self._stop_event = threading.Event()
+        self._server = None
+
+    def follow_file(self, path: str, from_start: bool = False) -> threading.Thread:
+        """Tail `path` on a daemon thread (like `tail -F`: survives truncation)."""
+        def tail():
+            while not os.path.exists(path) and not self._stop_event.is_set():
+                time.sleep(POLL_INTERVAL)
+            with open(path, "r", encoding="utf-8") as f:
+                if not from_start:
+                    f.seek(0, os.SEEK_END)
+                partial = ""
+                while not self._stop_event.is_set():
+                    line = f.readline()
+                    if not line:
+                        if os.path.getsize(path) < f.tell():
+                            f.seek(0)  # truncated: start over
+                        time.sleep(POLL_INTERVAL)
+                        continue
+                    partial += line
+                    if partial.endswith("\n"):
+                        self.lines.put(partial)
+                        partial = ""
+
+        thread = threading.Thread(target=tail, name="live-feed-file", daemon=True)
+        thread.start()
+        return thread
+
+    def listen(self, port: int) -> threading.Thread:
+        """Accept JSON lines on 127.0.0.1:`port` on a daemon thread."""
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", port), _LineHandler)
+        self._server.daemon_threads = True
+        self._server.lines = self.lines
+        thread = threading.Thread(target=self._server.serve_forever, name="live-feed-socket", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._server is not None:
+            self._server.shutdown()
+
+    def _next_batch(self) -> List[str]:
+        try:
+            batch = [self.lines.get(timeout=POLL_INTERVAL)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_window
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                batch.append(self.lines.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self, on_batch=None) -> None:
+        """
+        Apply batches until `stop()`; `on_batch(report, errors)` is called after
+        each. A batch whose write fails (e.g. database locked) is retried with
+        the next one, up to APPLY_ATTEMPTS times.
+        """
+        retry, attempts = [], 0
+        while not self._stop_event.is_set():
+            batch = retry + [line for line in self._next_batch() if line.strip()]
+            if not batch:
+                continue
+            # Lines are kept rather than events: resolving an event flips it in place
+            lines, events, errors = [], [], []
+            for line in batch:
+                try:
+                    events.append(parse_event(line))
+                    lines.append(line)
+                except (ValueError, TypeError, KeyError) as e:
+                    errors.append(f"{line.strip()[:80]}: {e}")
+            report = None
+            if events:
+                try:
+                    report = apply_events(events)
+                    retry, attempts = [], 0
+                except sqlite3.Error as e:
+                    attempts += 1
+                    if attempts < APPLY_ATTEMPTS:
+                        retry = lines
+                        errors.append(f"batch of {len(events)} event(s) not applied, retrying: {e}")
+                    else:
+                        retry, attempts = [], 0
+                        errors.append(f"batch of {len(events)} event(s) dropped: {e}")
+            if on_batch:
+                on_batch(report, errors)
+            if retry:
+                self._stop_event.wait(POLL_INTERVAL)
+
+
+# ---------------------------------------------------------------------------- #
+# Pages
+# ---------------------------------------------------------------------------- #
+
+_seen_version = None
+_seen_lock = threading.Lock()
+
+
+def poll_changes() -> bool:
+    """
+    Invalidate cached live-table reads if the database changed since the
+    last poll (any session, any process). One PRAGMA, no table reads.
+    """
+    global _seen_version
+    version = data_version()
+    with _seen_lock:
+        changed = _seen_version is not None and version != _seen_version
+        _seen_version = version
+    if changed:
+        bump(*LIVE_TABLES)
+    return changed
+
+
+@cached("matches")
+def count_live_matches() -> int:
+    with get_connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM matches WHERE status = 'live'").fetchone()[0]
+
+
+def live_refresh_interval() -> Optional[int]:
+    """Seconds between page refreshes: LIVE_POLL_SECONDS while a match is live, else None."""
+    poll_changes()
+    return LIVE_POLL_SECONDS if count_live_matches() else None
+
+
+if __name__ == "__main__":
+    import argparse
+    from utils.migrations import ensure_schema
+
+    parser = argparse.ArgumentParser(description="Apply live scores from a local JSON-lines feed.")
+    parser.add_argument("--file", help="JSON-lines file to tail")
+    parser.add_argument("--from-start", action="store_true", help="read the file from its beginning")
+    parser.add_argument("--port", type=int, help="accept JSON lines on this localhost TCP port")
+    args = parser.parse_args()
+    if not args.file and not args.port:
+        parser.error("give --file and/or --port")
+
+    def report_batch(report, errors):
+        for error in errors:
+            print(f"⚠️ {error}")
+        if report:
+            print(
+                f"⚽ {report['events']} event(s) -> {report['matches']} match(es), "
+                f"{report['rescored']} rescored, {report['unknown']} unknown "
+                f"in {report['elapsed_ms']:.1f} ms"
+            )
+
+    ensure_schema()
+    feed = LiveFeed()
+    if args.file:
+        feed.follow_file(args.file, from_start=args.from_start)
+    if args.port:
+        feed.listen(args.port)
+    print("⏳ Live feed running (Ctrl+C to stop)...")
+    try:
+        feed.run(report_batch)
+    except KeyboardInterrupt:
+        feed.stop()
@@ -3,49 +3,43 @@ import sqlite3
 from typing import List, Tuple, Optional
 import streamlit as st
 from utils.db import get_connection
-
-
-def _get_or_create(cursor: sqlite3.Cursor, table: str, name: str) -> int:
+from utils.query_cache import cached, invalidates
+from controllers.standings_controller import refresh_round_standings
+from controllers.scoring_queue import notify_worker
+from controllers.fixtures_controller import UPSERT_MATCH_SQL
+from controllers.team_catalogue import get_catalogue, name_key
+from controllers.audit_log import log_action
+from controllers.rounds_controller import (
+    CURRENT_SEASON_SQL,
+    ROUND_FILTER,
+    ensure_round,
+    get_latest_round_number,
+    get_round_names,
+    round_name,
+    round_number_of,
+)
+
+
+def _get_or_create_round(cursor: sqlite3.Cursor, round_number: int, competition_id: int) -> int:
     """
-    Retrieve the ID of a record by name from a given table.
-    If it doesn't exist, insert it and return the new ID.
+    Get or create a round record by round number and competition ID.
+    New rounds belong to the current season.
     """
-    cursor.execute(f"SELECT id FROM {table} WHERE name = ?", (name,))
-    row = cursor.fetchone()
-    if row:
-        return row[0]
-    cursor.execute(f"INSERT INTO {table} (name) VALUES (?)", (name,))
-    return cursor.lastrowid
-
-
-def _get_or_create_team(cursor: sqlite3.Cursor, team_name: str) -> int:
-    """Get or create a team record by name."""
-    return _get_or_create(cursor, "teams", team_name)
-
-
-def _get_or_create_competition(cursor: sqlite3.Cursor, competition_name: str) -> int:
-    """Get or create a competition record by name."""
-    return _get_or_create(cursor, "competitions", competition_name)
+    return ensure_round(cursor.connection, competition_id, round_number)
 
 
-def _get_or_create_round(cursor: sqlite3.Cursor, round_name: str, competition_id: int) -> int:
-    """
-    Get or create a round record by name and competition ID.
-    """
-    cursor.execute(
-        "SELECT id FROM rounds WHERE name = ? AND competition_id = ?", 
-        (round_name, competition_id)
-    )
-    row = cursor.fetchone()
-    if row:
-        return row[0]
-    cursor.execute(
-        "INSERT INTO rounds (name, competition_id) VALUES (?, ?)", 
-        (round_name, competition_id)
-    )
-    return cursor.lastrowid
+def _match_snapshot(conn: sqlite3.Connection, match_id: int) -> Optional[dict]:
+    """Audited fields of a match (None when it does not exist)."""
+    row = conn.execute(
+        "SELECT match_datetime, status, home_score, away_score FROM matches WHERE id = ?",
+        (match_id,),
+    ).fetchone()
+    if row is None:
+        return None
+    return dict(zip(("match_datetime", "status", "home_score", "away_score"), row))
 
 
+@invalidates("matches", "rounds")
 def add_match(
     competition_name: str,
     home_team_name: str,
@@ -55,82 +49,72 @@ def add_match(
     home_score: Optional[int],
     away_score: Optional[int],
     round_num: int,
+    admin_id: Optional[int] = None,
 ) -> None:
     """
     Add or update a match in the database. If the match already exists in the round, update its details.
+    The change is audited when `admin_id` is given.
     Raises:
         ValueError: If home and away teams are the same.
     """
-    if home_team_name == away_team_name:
+    if name_key(home_team_name) == name_key(away_team_name):
         raise ValueError("Home and Away teams cannot be the same.")
 
-    conn = get_connection()
     try:
-        cursor = conn.cursor()
-
-        competition_id = _get_or_create_competition(cursor, competition_name)
-        home_team_id = _get_or_create_team(cursor, home_team_name)
-        away_team_id = _get_or_create_team(cursor, away_team_name)
-        round_name = f"Round {round_num}"
-        round_id = _get_or_create_round(cursor, round_name, competition_id)
-
-        # Check if match already exists (home vs away or reverse)
-        cursor.execute(
-            """
-            SELECT id FROM matches
-            WHERE round_id = ?
-              AND (
-                (home_team_id = ? AND away_team_id = ?)
-                OR
-                (home_team_id = ? AND away_team_id = ?)
-              )
-            """,
-            (round_id, home_team_id, away_team_id, away_team_id, home_team_id),
-        )
-        existing_match = cursor.fetchone()
-
-        if existing_match:
-            # Update existing match
-            cursor.execute(
+        # Ids come from the in-memory catalogue (unknown names are created write-through)
+        catalogue = get_catalogue()
+        competition_id = catalogue.resolve_competitions([competition_name])[name_key(competition_name)]
+        team_ids = catalogue.resolve_teams([home_team_name, away_team_name], league=competition_name)
+        home_team_id = team_ids[name_key(home_team_name)]
+        away_team_id = team_ids[name_key(away_team_name)]
+
+        with get_connection() as conn:
+            # Write lock first: the snapshot and the upsert see the same fixture
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.cursor()
+            round_id = _get_or_create_round(cursor, int(round_num), competition_id)
+            existing = cursor.execute(
                 """
-                UPDATE matches
-                SET match_datetime = ?, status = ?, home_score = ?, away_score = ?
-                WHERE id = ?
-                """,
-                (
-                    match_date.strftime("%Y-%m-%d %H:%M:%S"),
-                    status,
-                    home_score,
-                    away_score,
-                    existing_match[0],
-                ),
-            )
-        else:
-            # Insert new match
-            cursor.execute(
-                """
-                INSERT INTO matches (
-                    round_id, competition_id, home_team_id, away_team_id,
-                    match_datetime, status, home_score, away_score
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                SELECT id FROM matches
+                WHERE round_id = ?
+                  AND MIN(home_team_id, away_team_id) = MIN(?, ?)
+                  AND MAX(home_team_id, away_team_id) = MAX(?, ?)
                 """,
+                (round_id, home_team_id, away_team_id, home_team_id, away_team_id),
+            ).fetchone()
+            before = _match_snapshot(conn, existing[0]) if existing else None
+
+            # Insert, or update the fixture already in this round (either team order)
+            after = {
+                "match_datetime": match_date.strftime("%Y-%m-%d %H:%M:%S"),
+                "status": status,
+                "home_score": home_score,
+                "away_score": away_score,
+            }
+            match_id = cursor.execute(
+                UPSERT_MATCH_SQL + " RETURNING id",
                 (
                     round_id,
                     competition_id,
                     home_team_id,
                     away_team_id,
-                    match_date.strftime("%Y-%m-%d %H:%M:%S"),
+                    after["match_datetime"],
                     status,
                     home_score,
                     away_score,
                 ),
-            )
-        conn.commit()
+            ).fetchone()[0]
+            if existing:
+                log_action(admin_id, "update_match", match_id=match_id, before=before, after=after, conn=conn)
+            else:
+                after.update(competition=competition_name, round_number=int(round_num),
+                             home_team=home_team_name, away_team=away_team_name)
+                log_action(admin_id, "add_match", match_id=match_id, after=after, conn=conn)
+            conn.commit()
 
     except sqlite3.Error as e:
         raise RuntimeError(f"Database error occurred: {e}")
-    finally:
-        conn.close()
+    notify_worker()
 
 
 def get_rounds(competition_name: str) -> List[int]:
@@ -138,8 +122,7 @@ def get_rounds(competition_name: str) -> List[int]:
     Retrieve all round numbers for a specified competition.
     Returns an empty list if competition not found.
     """
-    conn = get_connection()
-    try:
+    with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT id FROM competitions WHERE name = ?", (competition_name,))
         comp = cursor.fetchone()
@@ -147,15 +130,16 @@ def get_rounds(competition_name: str) -> List[int]:
             return []
 
         comp_id = comp[0]
-        cursor.execute("SELECT name FROM rounds WHERE competition_id = ? ORDER BY id", (comp_id,))
-        rounds = [
-            int(name.split()[1])
-            for (name,) in cursor.fetchall()
-            if name.startswith("Round ")
-        ]
-        return rounds
-    finally:
-        conn.close()
+        cursor.execute(
+            f"""
+            SELECT round_number FROM rounds
+            WHERE competition_id = ? AND season_id = {CURRENT_SEASON_SQL}
+              AND round_number IS NOT NULL
+            ORDER BY round_number
+            """,
+            (comp_id,),
+        )
+        return [row[0] for row in cursor.fetchall()]
 
 
 def get_matches_by_round(competition_name: str, round_number: int) -> List[Tuple]:
@@ -163,8 +147,7 @@ def get_matches_by_round(competition_name: str, round_number: int) -> List[Tuple
     Fetch match details for a specific round in a competition.
     Returns empty list if competition or round not found.
     """
-    conn = get_connection()
-    try:
+    with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT id FROM competitions WHERE name = ?", (competition_name,))
         comp = cursor.fetchone()
@@ -172,9 +155,9 @@ def get_matches_by_round(competition_name: str, round_number: int) -> List[Tuple
             return []
 
         comp_id = comp[0]
-        round_name = f"Round {round_number}"
         cursor.execute(
-            "SELECT id FROM rounds WHERE name = ? AND competition_id = ?", (round_name, comp_id)
+            f"SELECT r.id FROM rounds r WHERE {ROUND_FILTER} AND r.competition_id = ?",
+            (round_number, comp_id),
         )
         round_row = cursor.fetchone()
         if not round_row:
@@ -194,88 +177,104 @@ def get_matches_by_round(competition_name: str, round_number: int) -> List[Tuple
             (round_id,),
         )
         return cursor.fetchall()
-    finally:
-        conn.close()
 
 
+@invalidates("matches", "predictions", "player_round_standings", "player_standings")
 def update_match(
     match_id: int,
     status: str,
     home_score: int,
     away_score: int,
     match_datetime: Optional[datetime.datetime] = None,
+    admin_id: Optional[int] = None,
 ) -> None:
     """
     Update match details such as status, score, and optionally datetime.
+    Scoring is queued by the database (see controllers/scoring_queue.py)
+    when the score changes or the match finishes. The change is audited
+    when `admin_id` is given.
     """
-    conn = get_connection()
     try:
-        cursor = conn.cursor()
-        if match_datetime:
-            cursor.execute(
-                """
-                UPDATE matches
-                SET status = ?, home_score = ?, away_score = ?, match_datetime = ?
-                WHERE id = ?
-                """,
-                (status, home_score, away_score, match_datetime, match_id),
-            )
-        else:
-            cursor.execute(
-                """
-                UPDATE matches
-                SET status = ?, home_score = ?, away_score = ?
-                WHERE id = ?
-                """,
-                (status, home_score, away_score, match_id),
-            )
-        conn.commit()
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            before = _match_snapshot(conn, match_id)
+            if match_datetime:
+                cursor.execute(
+                    """
+                    UPDATE matches
+                    SET status = ?, home_score = ?, away_score = ?, match_datetime = ?
+                    WHERE id = ?
+                    """,
+                    (status, home_score, away_score, match_datetime, match_id),
+                )
+            else:
+                cursor.execute(
+                    """
+                    UPDATE matches
+                    SET status = ?, home_score = ?, away_score = ?
+                    WHERE id = ?
+                    """,
+                    (status, home_score, away_score, match_id),
+                )
+            after = {"status": status, "home_score": home_score, "away_score": away_score}
+            if match_datetime:
+                after["match_datetime"] = str(match_datetime)
+            log_action(admin_id, "update_match", match_id=match_id, before=before, after=after, conn=conn)
+            conn.commit()
     except sqlite3.Error as e:
         raise RuntimeError(f"Database error occurred: {e}")
-    finally:
-        conn.close()
+    notify_worker()
 
 
-def delete_match(match_id: int) -> None:
+@invalidates("rounds", "matches", "predictions", "player_round_standings", "player_standings")
+def delete_match(match_id: int, admin_id: Optional[int] = None) -> bool:
     """
     Delete a match and all related data (e.g. predictions) by match ID.
     If the match's round becomes empty, delete the round too.
+    Returns True when the round was deleted. The deletion is audited when
+    `admin_id` is given.
     """
-    conn = get_connection()
     try:
-        cursor = conn.cursor()
+        with get_connection() as conn:
+            cursor = conn.cursor()
 
-        # Step 1: Get the round_id of the match to be deleted
-        cursor.execute("SELECT round_id FROM matches WHERE id = ?", (match_id,))
-        result = cursor.fetchone()
+            # Step 1: Get the round_id of the match to be deleted
+            cursor.execute("SELECT round_id FROM matches WHERE id = ?", (match_id,))
+            result = cursor.fetchone()
 
-        if result is None:
-            raise ValueError(f"No match found with ID {match_id}")
-        round_id = result[0]
+            if result is None:
+                raise ValueError(f"No match found with ID {match_id}")
+            round_id = result[0]
+            before = _match_snapshot(conn, match_id)
 
-        # Step 2: Delete related predictions
-        cursor.execute("DELETE FROM predictions WHERE match_id = ?", (match_id,))
+            # Step 2: Delete related predictions
+            before["predictions"] = cursor.execute(
+                "DELETE FROM predictions WHERE match_id = ?", (match_id,)
+            ).rowcount
 
-        # Add other related deletions here if necessary
-        # Example: cursor.execute("DELETE FROM scores WHERE match_id = ?", (match_id,))
+            # Add other related deletions here if necessary
+            # Example: cursor.execute("DELETE FROM scores WHERE match_id = ?", (match_id,))
 
-        # Step 3: Delete the match
-        cursor.execute("DELETE FROM matches WHERE id = ?", (match_id,))
+            # Step 3: Delete the match
+            cursor.execute("DELETE FROM matches WHERE id = ?", (match_id,))
 
-        # Step 4: Check if the round has any matches left
-        cursor.execute("SELECT COUNT(*) FROM matches WHERE round_id = ?", (round_id,))
-        match_count = cursor.fetchone()[0]
+            # Step 4: Check if the round has any matches left
+            cursor.execute("SELECT COUNT(*) FROM matches WHERE round_id = ?", (round_id,))
+            match_count = cursor.fetchone()[0]
 
-        # Step 5: If no matches left in the round, delete the round
-        if match_count == 0:
-            cursor.execute("DELETE FROM rounds WHERE id = ?", (round_id,))
+            # Step 5: If no matches left in the round, delete the round
+            if match_count == 0:
+                cursor.execute("DELETE FROM rounds WHERE id = ?", (round_id,))
 
-        conn.commit()
+            # Step 6: Drop the deleted predictions from the standings
+            refresh_round_standings(conn, [round_id])
+            log_action(admin_id, "delete_match", match_id=match_id, before=before, conn=conn)
+
+            conn.commit()
+            return match_count == 0
 
     except sqlite3.Error as e:
         raise RuntimeError(f"Database error occurred: {e}")
-    finally:
-        conn.close()
 
 
 
@@ -284,8 +283,7 @@ def get_matches_by_round_id(round_id: int) -> List[Tuple]:
     """
     Retrieve matches for a given round ID, including competition and team names.
     """
-    conn = get_connection()
-    try:
+    with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -301,17 +299,17 @@ def get_matches_by_round_id(round_id: int) -> List[Tuple]:
             (round_id,),
         )
         return cursor.fetchall()
-    finally:
-        conn.close()
 
 
 def get_all_rounds():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, name FROM rounds ORDER BY name")
-    rounds = cursor.fetchall()
-    conn.close()
-    return rounds
+    with get_connection() as conn:
+        return conn.execute(
+            f"""
+            SELECT id, name FROM rounds
+            WHERE season_id = {CURRENT_SEASON_SQL}
+            ORDER BY round_number, competition_id
+            """
+        ).fetchall()
 
 
 
@@ -320,39 +318,34 @@ def get_latest_round_num() -> int:
     Get the highest round number across all competitions.
     Returns 1 if no rounds are present.
     """
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT MAX(CAST(SUBSTR(name, 7) AS INTEGER)) FROM rounds
-            WHERE name LIKE 'Round %'
-            """
-        )
-        max_round = cursor.fetchone()[0]
-        return int(max_round) if max_round else 1
-    finally:
-        conn.close()
+    return get_latest_round_number()
 
 
 def get_all_competitions() -> List[str]:
-    conn = get_connection()
-    try:
+    with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT name FROM competitions ORDER BY name")
         return [row[0] for row in cursor.fetchall()]
-    finally:
-        conn.close()
 
 
-def handle_add_match(teams_by_league: dict) -> None:
+def handle_add_match() -> None:
     st.subheader("Add or Update Match")
 
-    league = st.selectbox("Select League", list(teams_by_league.keys()))
-    teams = teams_by_league[league]["teams"]
-
-    home_team = st.selectbox("Home Team", teams)
-    away_team = st.selectbox("Away Team", teams)
+    catalogue = get_catalogue()
+    league = st.selectbox("Select League", catalogue.leagues())
+
+    # Each side has its own filter, so narrowing one never forces the other
+    pickers = {}
+    for side, col in zip(("Home", "Away"), st.columns(2)):
+        with col:
+            query = st.text_input(f"🔎 Filter {side.lower()} teams", placeholder="Type part of a team name",
+                                  key=f"add_match_{side.lower()}_filter")
+            teams = catalogue.search_teams(query, league=league, limit=50) if query else catalogue.league_teams(league)
+            if not teams:
+                st.info("No team of this league matches the filter.")
+                return
+            pickers[side] = st.selectbox(f"{side} Team", teams, key=f"add_match_{side.lower()}_team")
+    home_team, away_team = pickers["Home"], pickers["Away"]
 
     if home_team == away_team:
         st.warning("Home and Away teams cannot be the same.")
@@ -398,6 +391,7 @@ def handle_add_match(teams_by_league: dict) -> None:
                 home_score=home_score,
                 away_score=away_score,
                 round_num=round_num,
+                admin_id=st.session_state["user"]["id"],
             )
             st.success("Match added or updated successfully!")
         except Exception as e:
@@ -413,15 +407,15 @@ def get_match_count_by_round_id(cursor: sqlite3.Cursor, round_id: int) -> int:
 
 from typing import List, Tuple
 
+@cached("matches", "rounds", "seasons", "teams")
 def get_matches_by_round_name(round_name: str) -> List[Tuple]:
     """
     Retrieve all matches from all competitions for a given round name.
     """
-    conn = get_connection()
-    try:
+    with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(
-            """
+            f"""
             SELECT m.id, c.name AS competition, ht.name AS home_team, at.name AS away_team,
                    m.match_datetime, m.status, m.home_score, m.away_score
             FROM matches m
@@ -429,28 +423,42 @@ def get_matches_by_round_name(round_name: str) -> List[Tuple]:
             JOIN teams ht ON m.home_team_id = ht.id
             JOIN teams at ON m.away_team_id = at.id
             JOIN rounds r ON m.round_id = r.id
-            WHERE r.name = ?
+            WHERE {ROUND_FILTER}
             ORDER BY m.match_datetime
             """,
-            (round_name,),
+            (round_number_of(round_name),),
         )
         return cursor.fetchall()
-    finally:
-        conn.close()
 
 
+@cached("rounds", "seasons")
 def get_all_round_names() -> List[str]:
     """
-    Retrieve all unique round names across competitions.
+    Retrieve all unique round names across competitions, in round order.
     """
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT DISTINCT name FROM rounds ORDER BY name")
-        round_names = [row[0] for row in cursor.fetchall()]
-        return round_names
-    finally:
-        conn.close()
+    return get_round_names()
+
+
+def get_round_summaries() -> List[Tuple[str, int, int, int]]:
+    """
+    Return (round_name, match_count, finished_count, live_count) for every
+    round name across competitions, in a single grouped query.
+    """
+    with get_connection() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT r.round_number,
+                   COUNT(m.id),
+                   COALESCE(SUM(m.status = 'finished'), 0),
+                   COALESCE(SUM(m.status = 'live'), 0)
+            FROM rounds r
+            LEFT JOIN matches m ON m.round_id = r.id
+            WHERE r.season_id = {CURRENT_SEASON_SQL} AND r.round_number IS NOT NULL
+            GROUP BY r.round_number
+            ORDER BY r.round_number
+            """
+        ).fetchall()
+    return [(round_name(number), count, finished, live) for number, count, finished, live in rows]
 
 
 
@@ -465,179 +473,141 @@ def handle_view_matches() -> None:
     """
     st.subheader("⚽ View and Manage Matches")
 
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
+    round_summaries = get_round_summaries()
+    if not round_summaries:
+        st.info("No rounds available.")
+        return
 
-        round_names = get_all_round_names()
-        if not round_names:
-            st.info("No rounds available.")
-            return
+    round_display = []
+    for name, count, finished, live in round_summaries:
+        label = f"{name} ({count} match{'es' if count != 1 else ''}"
+        if live:
+            label += f", {live} live"
+        if finished:
+            label += f", {finished} finished"
+        round_display.append(label + ")")
+
+    selected_round_display = st.selectbox("Select Round", round_display)
+    selected_index = round_display.index(selected_round_display)
+    selected_round_name = round_summaries[selected_index][0]
+
+    matches = get_matches_by_round_name(selected_round_name)
+    if not matches:
+        st.info("No matches found for this round.")
+        return
 
-        round_display = []
-        for round_name in round_names:
-            cursor.execute(
-                """
-                SELECT COUNT(*)
-                FROM matches m
-                JOIN rounds r ON m.round_id = r.id
-                WHERE r.name = ?
-                """,
-                (round_name,),
-            )
-            count = cursor.fetchone()[0]
-            round_display.append(f"{round_name} ({count} match{'es' if count != 1 else ''})")
-
-        selected_round_display = st.selectbox("Select Round", round_display)
-        selected_index = round_display.index(selected_round_display)
-        selected_round_name = round_names[selected_index]
-
-        matches = get_matches_by_round_name(selected_round_name)
-        if not matches:
-            st.info("No matches found for this round.")
-            return
-
-        status_colors = {
-            "not played": "#adb5bd",
-            "live": "#198754",
-            "finished": "#0d6efd",
-        }
-        status_emojis = {
-            "not played": "🕒",
-            "live": "🔴",
-            "finished": "✅",
-        }
-
-        font_style = "font-size:12px; padding:4px 6px;"
-
-        # Table header
-        header_cols = st.columns([2, 3, 2, 1, 1, 1, 1])
-        headers = ["Competition", "Match", "Date & Time", "Status", "Home Score", "Away Score", "Actions"]
-        header_bg_color = "#343a40"
-        header_text_color = "white"
-        for col, header in zip(header_cols, headers):
-            col.markdown(
-                f"<div style='background-color:{header_bg_color};color:{header_text_color};"
-                f"font-weight:bold;{font_style}border-radius:4px;text-align:center'>{header}</div>",
-                unsafe_allow_html=True,
-            )
+    status_colors = {
+        "not played": "#adb5bd",
+        "live": "#198754",
+        "finished": "#0d6efd",
+    }
+    status_emojis = {
+        "not played": "🕒",
+        "live": "🔴",
+        "finished": "✅",
+    }
+
+    font_style = "font-size:12px; padding:4px 6px;"
+
+    # Table header
+    header_cols = st.columns([2, 3, 2, 1, 1, 1, 1])
+    headers = ["Competition", "Match", "Date & Time", "Status", "Home Score", "Away Score", "Actions"]
+    header_bg_color = "#343a40"
+    header_text_color = "white"
+    for col, header in zip(header_cols, headers):
+        col.markdown(
+            f"<div style='background-color:{header_bg_color};color:{header_text_color};"
+            f"font-weight:bold;{font_style}border-radius:4px;text-align:center'>{header}</div>",
+            unsafe_allow_html=True,
+        )
 
-        for match in matches:
-            (
-                match_id,
-                competition_name,
-                home_team_name,
-                away_team_name,
-                match_datetime,
-                status,
-                home_score,
-                away_score,
-            ) = match
-
-            cols = st.columns([2, 3, 2, 1, 1, 1, 1])
-
-            cols[0].markdown(
-                f"<div style='background:#6f42c1;color:white;{font_style}border-radius:4px;text-align:center;'>{competition_name}</div>",
-                unsafe_allow_html=True,
-            )
+    for match in matches:
+        (
+            match_id,
+            competition_name,
+            home_team_name,
+            away_team_name,
+            match_datetime,
+            status,
+            home_score,
+            away_score,
+        ) = match
+
+        cols = st.columns([2, 3, 2, 1, 1, 1, 1])
+
+        cols[0].markdown(
+            f"<div style='background:#6f42c1;color:white;{font_style}border-radius:4px;text-align:center;'>{competition_name}</div>",
+            unsafe_allow_html=True,
+        )
 
-            cols[1].markdown(
-                f"<div style='background:#0dcaf0;color:#000;{font_style}border-radius:4px;text-align:center;'>"
-                f"{home_team_name} vs {away_team_name}</div>",
-                unsafe_allow_html=True,
-            )
+        cols[1].markdown(
+            f"<div style='background:#0dcaf0;color:#000;{font_style}border-radius:4px;text-align:center;'>"
+            f"{home_team_name} vs {away_team_name}</div>",
+            unsafe_allow_html=True,
+        )
 
-            cols[2].markdown(
-                f"<div style='background:#fd7e14;color:white;{font_style}border-radius:4px;text-align:center;'>{match_datetime}</div>",
-                unsafe_allow_html=True,
-            )
+        cols[2].markdown(
+            f"<div style='background:#fd7e14;color:white;{font_style}border-radius:4px;text-align:center;'>{match_datetime}</div>",
+            unsafe_allow_html=True,
+        )
 
-            status_color = status_colors.get(status, "#6c757d")
-            status_text = status_emojis.get(status, "") + " " + status.capitalize()
-            cols[3].markdown(
-                f"<div style='background:{status_color};color:white;{font_style}font-weight:bold;border-radius:4px;text-align:center;'>"
-                f"{status_text}</div>",
-                unsafe_allow_html=True,
-            )
+        status_color = status_colors.get(status, "#6c757d")
+        status_text = status_emojis.get(status, "") + " " + status.capitalize()
+        cols[3].markdown(
+            f"<div style='background:{status_color};color:white;{font_style}font-weight:bold;border-radius:4px;text-align:center;'>"
+            f"{status_text}</div>",
+            unsafe_allow_html=True,
+        )
 
-            new_home_score = cols[4].number_input(
-                label="",
-                min_value=0,
-                max_value=100,
-                value=home_score if home_score is not None else 0,
-                key=f"home_score_{match_id}",
-                label_visibility="collapsed",
-            )
+        new_home_score = cols[4].number_input(
+            label="",
+            min_value=0,
+            max_value=100,
+            value=home_score if home_score is not None else 0,
+            key=f"home_score_{match_id}",
+            label_visibility="collapsed",
+        )
+
+        new_away_score = cols[5].number_input(
+            label="",
+            min_value=0,
+            max_value=100,
+            value=away_score if away_score is not None else 0,
+            key=f"away_score_{match_id}",
+            label_visibility="collapsed",
+        )
 
-            new_away_score = cols[5].number_input(
-                label="",
-                min_value=0,
-                max_value=100,
-                value=away_score if away_score is not None else 0,
-                key=f"away_score_{match_id}",
+        with cols[6]:
+            new_status = st.selectbox(
+                "",
+                options=["not played", "live", "finished"],
+                index=["not played", "live", "finished"].index(status),
+                key=f"status_{match_id}",
                 label_visibility="collapsed",
             )
 
-            with cols[6]:
-                new_status = st.selectbox(
-                    "",
-                    options=["not played", "live", "finished"],
-                    index=["not played", "live", "finished"].index(status),
-                    key=f"status_{match_id}",
-                    label_visibility="collapsed",
-                )
-
-                # Small icon buttons for Update (pencil) and Delete (trash)
-                update_clicked = st.button("✏️", key=f"update_{match_id}", help="Update Match")
-                delete_clicked = st.button("🗑️", key=f"delete_{match_id}", help="Delete Match")
-
-                if update_clicked:
-                    with st.spinner("Updating match..."):
-                        try:
-                            update_match(match_id, new_status, new_home_score, new_away_score)
-                            st.success("Match updated successfully.")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Error updating match: {e}")
-
-                if delete_clicked:
-                    with st.spinner("Deleting match..."):
-                        try:
-                            # Delete the match first
-                            delete_match(match_id)
-
-                            # Check if this round still has matches
-                            cursor.execute(
-                                """
-                                SELECT r.id FROM rounds r WHERE r.name = ?
-                                """,
-                                (selected_round_name,),
-                            )
-                            round_row = cursor.fetchone()
-                            if round_row:
-                                round_id = round_row[0]
-                                cursor.execute(
-                                    """
-                                    SELECT COUNT(*) FROM matches WHERE round_id = ?
-                                    """,
-                                    (round_id,),
-                                )
-                                count_matches = cursor.fetchone()[0]
-                                if count_matches == 0:
-                                    # Delete the round as no matches left
-                                    cursor.execute(
-                                        "DELETE FROM rounds WHERE id = ?", (round_id,)
-                                    )
-                                    conn.commit()
-                                    st.info(f"Round '{selected_round_name}' deleted because it has no more matches.")
-
-                            st.success("Match deleted successfully.")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Error deleting match: {e}")
-
-    finally:
-        conn.close()
-
-
-
+            # Small icon buttons for Update (pencil) and Delete (trash)
+            update_clicked = st.button("✏️", key=f"update_{match_id}", help="Update Match")
+            delete_clicked = st.button("🗑️", key=f"delete_{match_id}", help="Delete Match")
+
+            if update_clicked:
+                with st.spinner("Updating match..."):
+                    try:
+                        update_match(match_id, new_status, new_home_score, new_away_score,
+                                     admin_id=st.session_state["user"]["id"])
+                        st.success("Match updated successfully.")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error updating match: {e}")
+
+            if delete_clicked:
+                with st.spinner("Deleting match..."):
+                    try:
+                        # Deleting the last match of a round removes the round too
+                        if delete_match(match_id, admin_id=st.session_state["user"]["id"]):
+                            st.info(f"Round '{selected_round_name}' deleted because it has no more matches.")
+
+                        st.success("Match deleted successfully.")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error deleting match: {e}")
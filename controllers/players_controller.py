@@ -1,57 +1,57 @@
+
 from utils.db import get_connection
-from controllers.auth_controller import hash_password
+from utils.query_cache import invalidates
+from controllers.auth_controller import hash_password_async
+from controllers.audit_log import PAGE_SIZE, get_audit_page, log_action
 
 def log_admin_action(admin_id, action, target_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO audit_log (admin_id, action, target_player_id) VALUES (?, ?, ?)",
-        (admin_id, action, target_id)
-    )
-    conn.commit()
+    # Buffered: written with the next batch (see controllers/audit_log.py)
+    log_action(admin_id, action, player_id=target_id)
+
+def _player_snapshot(conn, player_id):
+    row = conn.execute("SELECT name, role FROM players WHERE id = ?", (player_id,)).fetchone()
+    return {"name": row[0], "role": row[1]} if row else None
+
+def get_admins():
+    with get_connection() as conn:
+        return conn.execute("SELECT id, name FROM players WHERE role = 'admin' ORDER BY name").fetchall()
 
 def get_all_players(search=""):
-    conn = get_connection()
-    cursor = conn.cursor()
-    if search:
-        cursor.execute("SELECT id, name, pw, role FROM players WHERE name LIKE ?", (f"%{search}%",))
-    else:
-        cursor.execute("SELECT id, name, pw, role FROM players")
-    return cursor.fetchall()
+    with get_connection() as conn:
+        if search:
+            return conn.execute("SELECT id, name, pw, role FROM players WHERE name LIKE ?", (f"%{search}%",)).fetchall()
+        return conn.execute("SELECT id, name, pw, role FROM players").fetchall()
 
+@invalidates("players")
 def add_player(name, password, role, admin_id=None):
-    conn = get_connection()
-    cursor = conn.cursor()
-    hashed_pw = hash_password(password)
-    cursor.execute("INSERT INTO players (name, pw, role) VALUES (?, ?, ?)", (name, hashed_pw, role))
-    conn.commit()
-    if admin_id:
-        log_admin_action(admin_id, "add_player", cursor.lastrowid)
+    hashed_pw = hash_password_async(password).result()
+    with get_connection() as conn:
+        cursor = conn.execute("INSERT INTO players (name, pw, role) VALUES (?, ?, ?)", (name, hashed_pw, role))
+        player_id = cursor.lastrowid
+        log_action(admin_id, "add_player", player_id=player_id,
+                   after={"name": name, "role": role}, conn=conn)
 
+@invalidates("players")
 def update_player(player_id, name, password, role, admin_id=None):
-    conn = get_connection()
-    cursor = conn.cursor()
-    hashed_pw = hash_password(password)
-    cursor.execute("UPDATE players SET name = ?, pw = ?, role = ? WHERE id = ?", (name, hashed_pw, role, player_id))
-    conn.commit()
-    if admin_id:
-        log_admin_action(admin_id, "update_player", player_id)
+    hashed_pw = hash_password_async(password).result()
+    with get_connection() as conn:
+        before = _player_snapshot(conn, player_id)
+        # New token version: sessions issued before the change are no longer valid
+        conn.execute(
+            "UPDATE players SET name = ?, pw = ?, role = ?, token_version = token_version + 1 WHERE id = ?",
+            (name, hashed_pw, role, player_id),
+        )
+        log_action(admin_id, "update_player", player_id=player_id,
+                   before=before, after={"name": name, "role": role}, conn=conn)
 
+@invalidates("players", "predictions", "player_standings")
 def delete_player(player_id, admin_id=None):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM players WHERE id = ?", (player_id,))
-    conn.commit()
-    if admin_id:
-        log_admin_action(admin_id, "delete_player", player_id)
-
-def get_audit_logs():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT a.timestamp, p.name, a.action, a.target_player_id
-        FROM audit_log a
-        LEFT JOIN players p ON a.admin_id = p.id
-        ORDER BY a.timestamp DESC
-    """)
-    return cursor.fetchall()
+    with get_connection() as conn:
+        before = _player_snapshot(conn, player_id)
+        conn.execute("DELETE FROM players WHERE id = ?", (player_id,))
+        log_action(admin_id, "delete_player", player_id=player_id, before=before, conn=conn)
+
+def get_audit_logs(limit=PAGE_SIZE, before=None, admin_id=None, action=None, player_id=None, match_id=None):
+    """One page of the audit log and the cursor of the next one (see audit_log.get_audit_page)."""
+    return get_audit_page(limit, before, admin_id=admin_id, action=action,
+                          player_id=player_id, match_id=match_id)
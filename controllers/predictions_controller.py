@@ -1,22 +1,26 @@
-import sqlite3
+import time
 
-DB_NAME = "football_game.db"
-
-def get_connection():
-    return sqlite3.connect(DB_NAME)
+from utils.db import get_connection
+from utils.query_cache import cached, invalidates
+from controllers.standings_controller import refresh_round_standings, refresh_standings_for_round_name
+from controllers.scoring_engine import score_matches, score_round_name
+from controllers.cup_controller import resolve_cup_ties
+from controllers.rounds_controller import ROUND_FILTER, get_round_names, round_number_of
+from controllers.audit_log import audit_entry, log_action, log_entries
 
+@cached("players")
 def get_all_players():
     with get_connection() as conn:
         return conn.execute("SELECT id, name FROM players WHERE role = 'user'").fetchall()
 
+@cached("rounds", "seasons")
 def get_all_round_names():
-    with get_connection() as conn:
-        query = "SELECT DISTINCT name FROM rounds ORDER BY name"
-        return [row[0] for row in conn.execute(query).fetchall()]
+    return get_round_names()
 
+@cached("matches", "rounds", "seasons", "teams")
 def get_matches_by_round_name(round_name):
     with get_connection() as conn:
-        query = """
+        query = f"""
         SELECT 
             matches.id,
             ht.name AS home_team,
@@ -24,74 +28,142 @@ def get_matches_by_round_name(round_name):
             matches.home_score,
             matches.away_score
         FROM matches
-        JOIN rounds ON matches.round_id = rounds.id
+        JOIN rounds r ON matches.round_id = r.id
         JOIN teams ht ON matches.home_team_id = ht.id
         JOIN teams at ON matches.away_team_id = at.id
-        WHERE rounds.name = ?
+        WHERE {ROUND_FILTER}
         ORDER BY matches.match_datetime ASC
         """
-        return conn.execute(query, (round_name,)).fetchall()
+        return conn.execute(query, (round_number_of(round_name),)).fetchall()
+
+def _predictions_by_round_name(conn, round_name):
+    query = f"""
+    SELECT p.player_id, p.match_id, p.predicted_home_score, p.predicted_away_score
+    FROM predictions p
+    JOIN matches m ON m.id = p.match_id
+    JOIN rounds r ON m.round_id = r.id
+    WHERE {ROUND_FILTER}
+    """
+    rows = conn.execute(query, (round_number_of(round_name),)).fetchall()
+    return {(row[0], row[1]): (row[2], row[3]) for row in rows}
 
 def get_predictions_by_round_name(round_name):
     with get_connection() as conn:
-        query = """
-        SELECT p.player_id, p.match_id, p.predicted_home_score, p.predicted_away_score
-        FROM predictions p
-        JOIN matches m ON m.id = p.match_id
-        JOIN rounds r ON m.round_id = r.id
-        WHERE r.name = ?
-        """
-        rows = conn.execute(query, (round_name,)).fetchall()
-        return {(row[0], row[1]): (row[2], row[3]) for row in rows}
+        return _predictions_by_round_name(conn, round_name)
 
-def save_predictions_and_scores(round_name, match_results, predictions):
-    with get_connection() as conn:
-        cursor = conn.cursor()
+def _prediction_fields(score):
+    if score is None:
+        return None
+    return {"predicted_home_score": score[0], "predicted_away_score": score[1]}
+
+@invalidates("matches", "predictions", "player_round_standings", "player_standings", "cup_matches")
+def save_predictions_and_scores(round_name, match_results, predictions, admin_id=None):
+    """
+    Save the admin predictions grid, writing only the cells that changed.
 
-        # Update actual match results and set status to 'finished' if actual results exist
-        for match_id, (home, away) in match_results.items():
-            cursor.execute(
-                "UPDATE matches SET home_score = ?, away_score = ?, status = ? WHERE id = ?",
-                (home, away, "finished", match_id)
+    `match_results` maps match_id -> (home, away) and `predictions` maps
+    (player_id, match_id) -> (home, away). Both are diffed against the
+    database, the changes are written with one executemany each in a single
+    transaction, and only matches whose result or predictions changed are
+    rescored. With `admin_id`, every result and prediction written is
+    audited in the same transaction. Returns a report dict with the rows
+    written and elapsed time.
+    """
+    started = time.perf_counter()
+    with get_connection() as conn:
+        current_results = {
+            row[0]: (row[1], row[2], row[3])
+            for row in conn.execute(
+                f"""
+                SELECT m.id, m.home_score, m.away_score, m.status
+                FROM matches m
+                JOIN rounds r ON m.round_id = r.id
+                WHERE {ROUND_FILTER}
+                """,
+                (round_number_of(round_name),),
             )
+        }
+        current_predictions = _predictions_by_round_name(conn, round_name)
 
-        # Update or insert predictions
-        for (player_id, match_id), (phs, pas) in predictions.items():
-            cursor.execute(""" 
-                INSERT INTO predictions (player_id, match_id, predicted_home_score, predicted_away_score)
-                VALUES (?, ?, ?, ?)
-                ON CONFLICT(player_id, match_id) DO UPDATE SET
-                    predicted_home_score=excluded.predicted_home_score,
-                    predicted_away_score=excluded.predicted_away_score
-            """, (player_id, match_id, phs, pas))
-        conn.commit()
+        changed_results = [
+            (home, away, "finished", match_id)
+            for match_id, (home, away) in match_results.items()
+            if match_id in current_results
+            and current_results[match_id] != (home, away, "finished")
+        ]
+        changed_predictions = [
+            (player_id, match_id, phs, pas)
+            for (player_id, match_id), (phs, pas) in predictions.items()
+            if current_predictions.get((player_id, match_id)) != (phs, pas)
+        ]
 
+        conn.executemany(
+            "UPDATE matches SET home_score = ?, away_score = ?, status = ? WHERE id = ?",
+            changed_results,
+        )
+        conn.executemany(
+            """
+            INSERT INTO predictions (player_id, match_id, predicted_home_score, predicted_away_score)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(player_id, match_id) DO UPDATE SET
+                predicted_home_score=excluded.predicted_home_score,
+                predicted_away_score=excluded.predicted_away_score
+            """,
+            changed_predictions,
+        )
+        log_entries(
+            [
+                audit_entry(
+                    admin_id, "update_result", match_id=match_id,
+                    before=dict(zip(("home_score", "away_score", "status"), current_results[match_id])),
+                    after={"home_score": home, "away_score": away, "status": status},
+                )
+                for home, away, status, match_id in changed_results
+            ]
+            + [
+                audit_entry(
+                    admin_id, "edit_prediction", player_id=player_id, match_id=match_id,
+                    before=_prediction_fields(current_predictions.get((player_id, match_id))),
+                    after=_prediction_fields((phs, pas)),
+                )
+                for player_id, match_id, phs, pas in changed_predictions
+            ],
+            conn,
+        )
 
-def calculate_and_store_points(round_name):
-    with get_connection() as conn:
-        cursor = conn.cursor()
-        # Get all predictions for that round (by round name)
-        cursor.execute("""
-            SELECT p.id, p.player_id, p.match_id, p.predicted_home_score, p.predicted_away_score,
-                   m.home_score, m.away_score
-            FROM predictions p
-            JOIN matches m ON p.match_id = m.id
-            JOIN rounds r ON m.round_id = r.id
-            WHERE r.name = ?
-        """, (round_name,))
+        # Rescore (and re-aggregate) only what this save touched
+        touched = {row[3] for row in changed_results} | {row[1] for row in changed_predictions}
+        scored = score_matches(conn, sorted(touched))
+        # Scored here already: drop the jobs the result updates just queued
+        conn.executemany(
+            "DELETE FROM scoring_jobs WHERE status = 'pending' AND match_id = ?",
+            [(match_id,) for match_id in touched],
+        )
+        if touched:
+            marks = ",".join("?" * len(touched))
+            round_ids = [
+                row[0]
+                for row in conn.execute(
+                    f"SELECT DISTINCT round_id FROM matches WHERE id IN ({marks})", sorted(touched)
+                )
+            ]
+            refresh_round_standings(conn, round_ids)
+            resolve_cup_ties(conn, [round_number_of(round_name)])
 
-        updates = []
-        for row in cursor.fetchall():
-            pred_id, _, _, phs, pas, ahs, aas = row
-            if ahs is None or aas is None:
-                continue  # Match not played yet
-            if phs == ahs and pas == aas:
-                points = 3
-            elif (phs > pas and ahs > aas) or (phs < pas and ahs < aas) or (phs == pas and ahs == aas):
-                points = 1
-            else:
-                points = 0
-            updates.append((points, pred_id))
+    return {
+        "results_written": len(changed_results),
+        "predictions_written": len(changed_predictions),
+        "predictions_scored": scored,
+        "elapsed_ms": (time.perf_counter() - started) * 1000,
+    }
 
-        cursor.executemany("UPDATE predictions SET points_awarded = ? WHERE id = ?", updates)
+
+@invalidates("matches", "predictions", "player_round_standings", "player_standings", "cup_matches")
+def calculate_and_store_points(round_name, admin_id=None):
+    with get_connection() as conn:
+        # Score every prediction of that round (by round name) in one statement
+        score_round_name(conn, round_name)
+        refresh_standings_for_round_name(conn, round_name)
+        resolve_cup_ties(conn, [round_number_of(round_name)])
+        log_action(admin_id, "calculate_points", after={"round": round_name}, conn=conn)
         conn.commit()
@@ -0,0 +1,103 @@
+# controllers/rounds_controller.py
+"""
+Round resolver shared by every controller.
+
+Rounds are shown as "Round N" but looked up through the numeric
+`rounds.round_number` of the current season (migration 3), which is an index
+seek on (season_id, round_number) and orders numerically. Queries join
+`rounds r` and filter with ROUND_FILTER, passing `round_number_of(name)`.
+"""
+
+import re
+import sqlite3
+from typing import List, Optional
+
+from utils.db import get_connection
+
+ROUND_PREFIX = "Round "
+
+CURRENT_SEASON_SQL = "(SELECT id FROM seasons WHERE is_current = 1 ORDER BY id DESC LIMIT 1)"
+
+# WHERE-clause fragment selecting one round number of the current season on alias `r`
+ROUND_FILTER = f"r.round_number = ? AND r.season_id = {CURRENT_SEASON_SQL}"
+
+_ROUND_NAME_RE = re.compile(r"^Round (\d+)$")
+
+
+def round_name(round_number: int) -> str:
+    """Display name of a round number."""
+    return f"{ROUND_PREFIX}{round_number}"
+
+
+def round_number_of(name: str) -> Optional[int]:
+    """Round number of a "Round N" name (None for anything else)."""
+    match = _ROUND_NAME_RE.match(name.strip()) if name else None
+    return int(match.group(1)) if match else None
+
+
+def get_current_season_id(conn: sqlite3.Connection) -> Optional[int]:
+    row = conn.execute(f"SELECT {CURRENT_SEASON_SQL}").fetchone()
+    return row[0] if row else None
+
+
+def get_round_ids(conn: sqlite3.Connection, round_number: int) -> List[int]:
+    """Ids of the round `round_number` in every competition of the current season."""
+    return [
+        row[0]
+        for row in conn.execute(f"SELECT r.id FROM rounds r WHERE {ROUND_FILTER}", (round_number,))
+    ]
+
+
+def ensure_round(conn: sqlite3.Connection, competition_id: int, round_number: int) -> int:
+    """
+    Id of a competition's "Round N" in the current season, created if
+    missing (rounds are unique per season, competition and number,
+    migration 9).
+    """
+    conn.execute(
+        f"""
+        INSERT OR IGNORE INTO rounds (name, competition_id, round_number, season_id)
+        VALUES (?, ?, ?, {CURRENT_SEASON_SQL})
+        """,
+        (round_name(round_number), competition_id, round_number),
+    )
+    return conn.execute(
+        f"""
+        SELECT id FROM rounds
+        WHERE season_id = {CURRENT_SEASON_SQL} AND competition_id = ? AND round_number = ?
+        """,
+        (competition_id, round_number),
+    ).fetchone()[0]
+
+
+def get_round_ids_by_name(conn: sqlite3.Connection, name: str) -> List[int]:
+    return get_round_ids(conn, round_number_of(name))
+
+
+def get_round_numbers(conn: sqlite3.Connection) -> List[int]:
+    """Distinct round numbers of the current season, in numeric order."""
+    return [
+        row[0]
+        for row in conn.execute(
+            f"""
+            SELECT DISTINCT r.round_number FROM rounds r
+            WHERE r.season_id = {CURRENT_SEASON_SQL} AND r.round_number IS NOT NULL
+            ORDER BY r.round_number
+            """
+        )
+    ]
+
+
+def get_round_names() -> List[str]:
+    """Distinct "Round N" names of the current season, in numeric order."""
+    with get_connection() as conn:
+        return [round_name(n) for n in get_round_numbers(conn)]
+
+
+def get_latest_round_number() -> int:
+    """Highest round number of the current season (1 when there are none)."""
+    with get_connection() as conn:
+        row = conn.execute(
+            f"SELECT MAX(r.round_number) FROM rounds r WHERE r.season_id = {CURRENT_SEASON_SQL}"
+        ).fetchone()
+    return int(row[0]) if row and row[0] else 1
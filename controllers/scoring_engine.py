@@ -0,0 +1,150 @@
+# controllers/scoring_engine.py
+"""
+Set-based scoring of predictions.
+
+A `RuleSet` describes how many points each kind of hit is worth. Scoring a
+round (or the whole season) is a single `UPDATE ... FROM matches` whose
+CASE expression is generated from the rule set, so no prediction is ever
+scored in a Python loop. `classify_prediction` applies the same rules to a
+single prediction for the views.
+
+The active rule set is picked with the SCORING_RULES environment variable
+(see RULE_SETS); it defaults to "classic".
+"""
+
+import os
+import sqlite3
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from utils.db import get_connection
+from utils.query_cache import invalidates
+from controllers.standings_controller import rebuild_standings
+from controllers.rounds_controller import get_round_ids_by_name
+from controllers.cup_controller import resolve_cup_ties
+
+# Only these matches award points. A match moved back to 'not played' keeps
+# its score inputs (the admin form always sends them) but loses its points.
+SCORED_STATUSES = ("live", "finished")
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """Points awarded per kind of hit. Only the best matching hit counts."""
+    name: str
+    exact: int = 3              # exact score
+    goal_difference: int = 1    # right goal difference (incl. non-exact draws)
+    outcome: int = 1            # right winner / draw
+    wrong: int = 0
+
+
+RULE_SETS = {
+    # exact = 3, any correct outcome = 1
+    "classic": RuleSet("classic"),
+    # exact = 3, correct goal difference = 2, correct outcome = 1
+    "goal_difference": RuleSet("goal_difference", goal_difference=2),
+    # exact = 5, correct goal difference = 3, correct outcome = 2
+    "generous": RuleSet("generous", exact=5, goal_difference=3, outcome=2),
+}
+
+
+def get_rule_set(name: Optional[str] = None) -> RuleSet:
+    """Return the named rule set, or the one selected by SCORING_RULES."""
+    name = name or os.getenv("SCORING_RULES", "classic")
+    if name not in RULE_SETS:
+        raise ValueError(f"Unknown scoring rule set '{name}'. Choose from {', '.join(RULE_SETS)}.")
+    return RULE_SETS[name]
+
+
+def _sign(value: int) -> int:
+    return (value > 0) - (value < 0)
+
+
+def classify_prediction(actual_home: int, actual_away: int,
+                        predicted_home: int, predicted_away: int) -> str:
+    """Return 'exact', 'goal_difference', 'outcome' or 'wrong'."""
+    if actual_home == predicted_home and actual_away == predicted_away:
+        return "exact"
+    if actual_home - actual_away == predicted_home - predicted_away:
+        return "goal_difference"
+    if _sign(actual_home - actual_away) == _sign(predicted_home - predicted_away):
+        return "outcome"
+    return "wrong"
+
+
+def points_for(actual_home: int, actual_away: int, predicted_home: int, predicted_away: int,
+               rules: Optional[RuleSet] = None) -> int:
+    """Points of a single prediction under `rules`."""
+    rules = rules or get_rule_set()
+    return getattr(rules, classify_prediction(actual_home, actual_away, predicted_home, predicted_away))
+
+
+def points_case_sql(rules: RuleSet, pred: str = "predictions", match: str = "m") -> str:
+    """SQL CASE expression computing the points of `pred` against `match`."""
+    ph, pa = f"{pred}.predicted_home_score", f"{pred}.predicted_away_score"
+    ah, aa = f"{match}.home_score", f"{match}.away_score"
+    return f"""CASE
+        WHEN {ph} = {ah} AND {pa} = {aa} THEN {int(rules.exact)}
+        WHEN {ph} - {pa} = {ah} - {aa} THEN {int(rules.goal_difference)}
+        WHEN (({ph} > {pa}) - ({ph} < {pa})) = (({ah} > {aa}) - ({ah} < {aa})) THEN {int(rules.outcome)}
+        ELSE {int(rules.wrong)}
+    END"""
+
+
+def _score(conn: sqlite3.Connection, column: str, ids: Optional[Iterable[int]],
+           rules: Optional[RuleSet]) -> int:
+    rules = rules or get_rule_set()
+    statuses = ",".join(f"'{status}'" for status in SCORED_STATUSES)
+    points = f"""CASE
+        WHEN m.status IN ({statuses}) AND m.home_score IS NOT NULL AND m.away_score IS NOT NULL
+        THEN {points_case_sql(rules)}
+    END"""
+    query = f"""
+        UPDATE predictions
+        SET points_awarded = {points}
+        FROM matches m
+        WHERE m.id = predictions.match_id
+          AND predictions.points_awarded IS NOT ({points})
+    """
+    params = []
+    if ids is not None:
+        params = list(ids)
+        if not params:
+            return 0
+        query += f" AND m.{column} IN ({','.join('?' * len(params))})"
+    return conn.execute(query, params).rowcount
+
+
+def score_rounds(conn: sqlite3.Connection, round_ids: Optional[Iterable[int]] = None,
+                 rules: Optional[RuleSet] = None) -> int:
+    """
+    Score every prediction on a live or finished match with a score, in one
+    statement. Predictions on any other match lose their points.
+
+    Restricted to `round_ids` when given (None means the whole database).
+    Rows whose points would not change are not rewritten. Returns the number
+    of predictions updated.
+    """
+    return _score(conn, "round_id", round_ids, rules)
+
+
+def score_matches(conn: sqlite3.Connection, match_ids: Iterable[int],
+                  rules: Optional[RuleSet] = None) -> int:
+    """Like `score_rounds`, restricted to the predictions of `match_ids`."""
+    return _score(conn, "id", match_ids, rules)
+
+
+def score_round_name(conn: sqlite3.Connection, round_name: str,
+                     rules: Optional[RuleSet] = None) -> int:
+    """Score every round (across competitions) named `round_name`."""
+    return score_rounds(conn, get_round_ids_by_name(conn, round_name), rules)
+
+
+@invalidates("matches", "predictions", "player_round_standings", "player_standings", "cup_matches")
+def rescore_all(rules: Optional[RuleSet] = None) -> int:
+    """Rescore the whole database (e.g. after switching rule sets), rebuild standings and cup ties."""
+    with get_connection() as conn:
+        updated = score_rounds(conn, None, rules)
+        rebuild_standings(conn)
+        resolve_cup_ties(conn)
+    return updated
@@ -0,0 +1,249 @@
+# controllers/scoring_queue.py
+"""
+Background scoring of finished / re-scored matches.
+
+Triggers on `matches` (migration 4) put a job in `scoring_jobs` whenever a
+match gets or changes its score or moves to 'finished', so admin edits only
+write the match and return. A worker thread drains the queue: each batch of
+jobs is claimed, scored with the set-based engine (only the predictions of
+those matches) and reflected in the standings of their rounds and in the cup
+ties of their gameweeks in a single transaction, then removed from the
+queue. A batch that fails is rolled back and its jobs are retried up to
+MAX_ATTEMPTS times before being marked 'failed'.
+
+The worker is started once per process by the app (`start_worker()`).
+It can also run on its own:
+
+    python -m controllers.scoring_queue          # drain forever
+    python -m controllers.scoring_queue --once   # drain what is queued, then exit
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+from utils.db import get_connection
+from utils.query_cache import bump
+from controllers.scoring_engine import score_matches
+from controllers.standings_controller import refresh_round_standings
+from controllers.cup_controller import resolve_cup_ties
+from controllers.audit_log import log_action
+
+BATCH_SIZE = 200
+POLL_INTERVAL = 2.0      # seconds between queue checks when idle
+MAX_ATTEMPTS = 3
+
+logger = logging.getLogger(__name__)
+
+# Tables rewritten by a drained batch (query cache invalidation)
+SCORED_TABLES = ("predictions", "player_round_standings", "player_standings", "cup_matches")
+
+_stats = {"processed": 0, "batches": 0, "failures": 0, "last_batch_ms": 0.0}
+_stats_lock = threading.Lock()
+
+
+def enqueue_matches(conn: sqlite3.Connection, match_ids: List[int], reason: str = "manual") -> None:
+    """Queue matches for rescoring inside the caller's transaction."""
+    conn.executemany(
+        "INSERT OR IGNORE INTO scoring_jobs (match_id, reason) VALUES (?, ?)",
+        [(match_id, reason) for match_id in match_ids],
+    )
+
+
+def _process_batch(conn: sqlite3.Connection, jobs: List[tuple]) -> None:
+    match_ids = sorted({match_id for _, match_id in jobs})
+    marks = ",".join("?" * len(match_ids))
+
+    # Also clears the points of matches without a score or back to 'not played'
+    score_matches(conn, match_ids)
+    rounds = conn.execute(
+        f"""
+        SELECT DISTINCT r.id, r.round_number
+        FROM matches m JOIN rounds r ON r.id = m.round_id
+        WHERE m.id IN ({marks})
+        """,
+        match_ids,
+    ).fetchall()
+    refresh_round_standings(conn, [round_id for round_id, _ in rounds])
+    resolve_cup_ties(conn, [number for _, number in rounds if number is not None])
+
+    job_ids = [job_id for job_id, _ in jobs]
+    conn.execute(
+        f"DELETE FROM scoring_jobs WHERE id IN ({','.join('?' * len(job_ids))})", job_ids
+    )
+
+
+def score_now(conn: sqlite3.Connection, match_ids: List[int]) -> int:
+    """
+    Process the pending jobs of `match_ids` inside the caller's transaction
+    instead of leaving them to the worker (e.g. live score updates). Returns
+    the number of jobs processed.
+    """
+    if not match_ids:
+        return 0
+    jobs = conn.execute(
+        f"""
+        SELECT id, match_id FROM scoring_jobs
+        WHERE status = 'pending' AND match_id IN ({','.join('?' * len(match_ids))})
+        """,
+        list(match_ids),
+    ).fetchall()
+    if jobs:
+        _process_batch(conn, jobs)
+    return len(jobs)
+
+
+def drain_once(batch_size: int = BATCH_SIZE) -> int:
+    """Score one batch of pending jobs. Returns the number of jobs processed."""
+    started = time.perf_counter()
+    with get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        jobs = conn.execute(
+            "SELECT id, match_id FROM scoring_jobs WHERE status = 'pending' ORDER BY id LIMIT ?",
+            (batch_size,),
+        ).fetchall()
+        if not jobs:
+            return 0
+        try:
+            _process_batch(conn, jobs)
+            conn.commit()
+        except Exception as e:
+            # Any failure counts as an attempt, so a poison batch ends up 'failed'
+            conn.rollback()
+            _record_failure(conn, [job_id for job_id, _ in jobs], f"{type(e).__name__}: {e}")
+            logger.exception("Scoring batch of %d job(s) failed", len(jobs))
+            return 0
+
+    bump(*SCORED_TABLES)
+    with _stats_lock:
+        _stats["processed"] += len(jobs)
+        _stats["batches"] += 1
+        _stats["last_batch_ms"] = (time.perf_counter() - started) * 1000
+    return len(jobs)
+
+
+def _record_failure(conn: sqlite3.Connection, job_ids: List[int], error: str) -> None:
+    marks = ",".join("?" * len(job_ids))
+    conn.execute(
+        f"""
+        UPDATE OR IGNORE scoring_jobs
+        SET attempts = attempts + 1,
+            last_error = ?,
+            status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE status END
+        WHERE id IN ({marks})
+        """,
+        (error, MAX_ATTEMPTS, *job_ids),
+    )
+    conn.commit()
+    with _stats_lock:
+        _stats["failures"] += 1
+
+
+def drain(batch_size: int = BATCH_SIZE) -> int:
+    """Score every pending job. Returns the number of jobs processed."""
+    total = 0
+    while True:
+        processed = drain_once(batch_size)
+        if not processed:
+            return total
+        total += processed
+
+
+def retry_failed(admin_id: int = None) -> int:
+    """Put failed jobs back in the queue. Returns the number of jobs requeued."""
+    with get_connection() as conn:
+        requeued = conn.execute(
+            "UPDATE OR IGNORE scoring_jobs SET status = 'pending', attempts = 0 WHERE status = 'failed'"
+        ).rowcount
+        log_action(admin_id, "retry_scoring_jobs", after={"requeued": requeued}, conn=conn)
+        return requeued
+
+
+# ---------------------------------------------------------------------------- #
+# Worker
+# ---------------------------------------------------------------------------- #
+
+class ScoringWorker(threading.Thread):
+    """Daemon thread draining the queue; `notify()` wakes it up right away."""
+
+    def __init__(self, poll_interval: float = POLL_INTERVAL):
+        super().__init__(name="scoring-worker", daemon=True)
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake.set()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                drain()
+            except Exception:
+                # e.g. database locked: keep the worker alive and retry on the next tick
+                logger.exception("Scoring worker tick failed")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start_worker() -> ScoringWorker:
+    """Start the process-wide worker (no-op when it is already running)."""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = ScoringWorker()
+            _worker.start()
+        return _worker
+
+
+def notify_worker() -> None:
+    """Wake the worker after a write that queued jobs (no-op without a worker)."""
+    if _worker is not None:
+        _worker.notify()
+
+
+def get_queue_stats() -> Dict:
+    """Queue depth and worker counters, for the admin System page."""
+    with get_connection() as conn:
+        counts = dict(conn.execute(
+            "SELECT status, COUNT(*) FROM scoring_jobs GROUP BY status"
+        ).fetchall())
+        oldest = conn.execute(
+            "SELECT MIN(enqueued_at) FROM scoring_jobs WHERE status = 'pending'"
+        ).fetchone()[0]
+    with _stats_lock:
+        stats = dict(_stats)
+    return {
+        "pending": counts.get("pending", 0),
+        "failed": counts.get("failed", 0),
+        "oldest_pending": oldest,
+        "worker_alive": _worker is not None and _worker.is_alive(),
+        **stats,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    from utils.migrations import ensure_schema
+
+    ensure_schema()
+    if "--once" in sys.argv:
+        print(f"✅ Scored {drain()} queued match(es).")
+    else:
+        print("⏳ Scoring worker running (Ctrl+C to stop)...")
+        worker = start_worker()
+        try:
+            while worker.is_alive():
+                worker.join(1)
+        except KeyboardInterrupt:
+            worker.stop()
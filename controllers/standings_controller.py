@@ -0,0 +1,168 @@
+# controllers/standings_controller.py
+"""
+Materialized player standings.
+
+`player_round_standings` keeps one row per (player, round) and
+`player_standings` one row per player with the season totals (both created by
+migration 1 in utils/migrations.py). They are refreshed incrementally by the
+scoring write paths, so leaderboard reads are O(players) instead of
+re-aggregating the whole `predictions` table.
+
+Rebuild from scratch (e.g. to repair drift) with:
+
+    python -m controllers.standings_controller
+"""
+
+import sqlite3
+from typing import Iterable, List
+from utils.db import get_connection
+from controllers.rounds_controller import get_round_ids_by_name
+
+# Per-(player, round) aggregate over the predictions of the given rounds.
+_ROUND_AGGREGATE = """
+    SELECT
+        p.player_id,
+        m.round_id,
+        COALESCE(SUM(p.points_awarded), 0),
+        SUM(CASE WHEN m.home_score IS NOT NULL AND m.away_score IS NOT NULL
+                  AND p.predicted_home_score = m.home_score
+                  AND p.predicted_away_score = m.away_score
+                 THEN 1 ELSE 0 END),
+        SUM(CASE WHEN m.home_score IS NOT NULL AND m.away_score IS NOT NULL
+                  AND NOT (p.predicted_home_score = m.home_score
+                           AND p.predicted_away_score = m.away_score)
+                  AND ((p.predicted_home_score > p.predicted_away_score)
+                       - (p.predicted_home_score < p.predicted_away_score))
+                    = ((m.home_score > m.away_score) - (m.home_score < m.away_score))
+                 THEN 1 ELSE 0 END),
+        COUNT(p.points_awarded)
+    FROM predictions p
+    JOIN matches m ON p.match_id = m.id
+    {where}
+    GROUP BY p.player_id, m.round_id
+"""
+
+
+def _placeholders(values: List) -> str:
+    return ",".join("?" * len(values))
+
+
+def _refresh_totals(conn: sqlite3.Connection, player_ids: List[int]) -> None:
+    """Recompute season totals for the given players from their round rows."""
+    if not player_ids:
+        return
+    marks = _placeholders(player_ids)
+    conn.execute(f"DELETE FROM player_standings WHERE player_id IN ({marks})", player_ids)
+    conn.execute(
+        f"""
+        INSERT INTO player_standings
+            (player_id, total_points, exact_hits, outcome_hits, predictions_scored, updated_at)
+        SELECT player_id, SUM(points), SUM(exact_hits), SUM(outcome_hits),
+               SUM(predictions_scored), CURRENT_TIMESTAMP
+        FROM player_round_standings
+        WHERE player_id IN ({marks})
+        GROUP BY player_id
+        """,
+        player_ids,
+    )
+
+
+def refresh_round_standings(conn: sqlite3.Connection, round_ids: Iterable[int]) -> None:
+    """
+    Re-aggregate the standings of the given rounds inside the caller's transaction.
+
+    Only the predictions of those rounds are scanned, and only the totals of
+    players who have (or had) predictions in them are recomputed.
+    """
+    round_ids = list(round_ids)
+    if not round_ids:
+        return
+    marks = _placeholders(round_ids)
+
+    affected = {
+        row[0]
+        for row in conn.execute(
+            f"SELECT player_id FROM player_round_standings WHERE round_id IN ({marks})",
+            round_ids,
+        )
+    }
+    conn.execute(f"DELETE FROM player_round_standings WHERE round_id IN ({marks})", round_ids)
+    conn.execute(
+        "INSERT INTO player_round_standings "
+        "(player_id, round_id, points, exact_hits, outcome_hits, predictions_scored) "
+        + _ROUND_AGGREGATE.format(where=f"WHERE m.round_id IN ({marks})"),
+        round_ids,
+    )
+    affected.update(
+        row[0]
+        for row in conn.execute(
+            f"SELECT player_id FROM player_round_standings WHERE round_id IN ({marks})",
+            round_ids,
+        )
+    )
+    _refresh_totals(conn, sorted(affected))
+
+
+def refresh_standings_for_round_name(conn: sqlite3.Connection, round_name: str) -> None:
+    """Refresh every round (across competitions) that carries `round_name`."""
+    refresh_round_standings(conn, get_round_ids_by_name(conn, round_name))
+
+
+def rebuild_standings(conn: sqlite3.Connection = None) -> int:
+    """
+    Rebuild both standings tables from `predictions`. Returns the number of
+    players with standings.
+    """
+    if conn is None:
+        with get_connection() as conn:
+            return rebuild_standings(conn)
+
+    conn.execute("DELETE FROM player_round_standings")
+    conn.execute("DELETE FROM player_standings")
+    conn.execute(
+        "INSERT INTO player_round_standings "
+        "(player_id, round_id, points, exact_hits, outcome_hits, predictions_scored) "
+        + _ROUND_AGGREGATE.format(where="")
+    )
+    conn.execute(
+        """
+        INSERT INTO player_standings
+            (player_id, total_points, exact_hits, outcome_hits, predictions_scored, updated_at)
+        SELECT player_id, SUM(points), SUM(exact_hits), SUM(outcome_hits),
+               SUM(predictions_scored), CURRENT_TIMESTAMP
+        FROM player_round_standings
+        GROUP BY player_id
+        """
+    )
+    return conn.execute("SELECT COUNT(*) FROM player_standings").fetchone()[0]
+
+
+def get_standings(role: str = None) -> List[tuple]:
+    """
+    Return (player_id, player_name, total_points, exact_hits, outcome_hits)
+    ordered by points, reading only the materialized totals.
+    """
+    query = """
+        SELECT pl.id, pl.name,
+               COALESCE(ps.total_points, 0),
+               COALESCE(ps.exact_hits, 0),
+               COALESCE(ps.outcome_hits, 0)
+        FROM players pl
+        LEFT JOIN player_standings ps ON ps.player_id = pl.id
+    """
+    params = ()
+    if role:
+        query += " WHERE pl.role = ?"
+        params = (role,)
+    query += " ORDER BY 3 DESC, pl.name ASC"
+
+    with get_connection() as conn:
+        return conn.execute(query, params).fetchall()
+
+
+if __name__ == "__main__":
+    from utils.migrations import ensure_schema
+
+    ensure_schema()
+    players = rebuild_standings()
+    print(f"✅ Standings rebuilt for {players} players.")
@@ -0,0 +1,276 @@
+# controllers/team_catalogue.py
+"""
+In-memory team / league catalogue.
+
+data/TEAMS_BY_LEAGUE.json is read once per process and merged with the
+`teams` and `competitions` tables (and the fixtures already stored) into:
+
+    team name <-> id, competition name <-> id     (names compared by `name_key`)
+    league -> teams, team -> leagues
+
+Team pickers search it by name prefix, falling back to substring and fuzzy
+matches, and write paths resolve names to ids from memory. Unknown names are
+created write-through: inserted and committed in one batch on a connection
+of its own (so resolve before opening a write transaction), then added to
+the indexes and bumped in the query cache. The catalogue reloads itself when
+another write path bumps "teams" or "competitions".
+"""
+
+import bisect
+import difflib
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from utils.db import get_connection
+from utils.query_cache import bump, table_versions
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_PATH = os.path.join(PROJECT_ROOT, "data", "TEAMS_BY_LEAGUE.json")
+
+TABLES = ("teams", "competitions")
+FUZZY_CUTOFF = 0.6
+
+# Teams each competition has fixtures for (either side)
+_FIXTURE_TEAMS_QUERY = """
+    SELECT m.competition_id, m.home_team_id FROM matches m
+    UNION
+    SELECT m.competition_id, m.away_team_id FROM matches m
+"""
+
+
+def name_key(name: str) -> str:
+    """Lookup key for team / competition names (stray spaces and case ignored)."""
+    return " ".join(name.split()).casefold()
+
+
+def _clean(name: str) -> str:
+    return " ".join(name.split())
+
+
+class _NameIndex:
+    """Bidirectional name <-> id map of one table."""
+
+    def __init__(self, rows: Iterable[tuple]):
+        self.ids: Dict[str, int] = {}
+        self.names: Dict[int, str] = {}
+        for id_, name in rows:
+            self.add(id_, name)
+
+    def add(self, id_: int, name: str) -> None:
+        self.ids.setdefault(name_key(name), id_)
+        self.names[id_] = name
+
+
+class TeamCatalogue:
+    def __init__(self, teams_by_league: Dict[str, dict]):
+        self._lock = threading.RLock()
+        self._json = teams_by_league
+        self._versions = None
+
+    # ------------------------------------------------------------------ #
+    # Loading
+    # ------------------------------------------------------------------ #
+
+    def refresh(self) -> None:
+        """Rebuild every index from the JSON catalogue and the database."""
+        with self._lock, get_connection() as conn:
+            self._versions = table_versions(*TABLES)
+            self.teams = _NameIndex(conn.execute("SELECT id, name FROM teams"))
+            self.competitions = _NameIndex(conn.execute("SELECT id, name FROM competitions"))
+
+            # Display names: the JSON spelling first, then the database one
+            self._team_display: Dict[str, str] = {}
+            self._team_words = None
+            self._league_display: Dict[str, str] = {}
+            self._league_teams: Dict[str, Dict[str, None]] = {}
+            for league, entry in self._json.items():
+                self._add_league(league, entry.get("teams", []))
+            for competition_id, team_id in conn.execute(_FIXTURE_TEAMS_QUERY):
+                if competition_id in self.competitions.names and team_id in self.teams.names:
+                    self._add_league(self.competitions.names[competition_id], [self.teams.names[team_id]])
+            for name in self.competitions.names.values():
+                self._add_league(name, [])
+            for name in self.teams.names.values():
+                self._add_team(name)
+
+    def _add_league(self, league: str, teams: Iterable[str]) -> None:
+        league_key = name_key(league)
+        self._league_display.setdefault(league_key, _clean(league))
+        members = self._league_teams.setdefault(league_key, {})
+        for team in teams:
+            members[name_key(team)] = None
+            self._add_team(team)
+        self._team_leagues = None
+
+    def _add_team(self, name: str) -> None:
+        self._team_display.setdefault(name_key(name), _clean(name))
+        self._team_words = None
+
+    def _word_index(self) -> List[tuple]:
+        """Sorted (word, team key) pairs, full keys included, for bisect prefix search."""
+        if self._team_words is None:
+            self._team_words = sorted(
+                {(word, key) for key in self._team_display for word in key.split()}
+                | {(key, key) for key in self._team_display}
+            )
+        return self._team_words
+
+    def _ensure_fresh(self) -> None:
+        if self._versions != table_versions(*TABLES):
+            self.refresh()
+
+    # ------------------------------------------------------------------ #
+    # Lookups (memory only)
+    # ------------------------------------------------------------------ #
+
+    def leagues(self) -> List[str]:
+        """League names: the JSON catalogue in file order, then other competitions A-Z."""
+        with self._lock:
+            self._ensure_fresh()
+            listed = [name_key(league) for league in self._json]
+            others = sorted(set(self._league_display) - set(listed))
+            return [self._league_display[key] for key in listed + others]
+
+    def league_teams(self, league: str) -> List[str]:
+        """Teams of a league, A-Z (empty for an unknown league)."""
+        with self._lock:
+            self._ensure_fresh()
+            members = self._league_teams.get(name_key(league), {})
+            return sorted((self._team_display[key] for key in members), key=name_key)
+
+    def team_leagues(self, team: str) -> List[str]:
+        """Leagues a team belongs to."""
+        with self._lock:
+            self._ensure_fresh()
+            if self._team_leagues is None:
+                self._team_leagues = {}
+                for league_key, members in self._league_teams.items():
+                    for team_key in members:
+                        self._team_leagues.setdefault(team_key, []).append(self._league_display[league_key])
+            return list(self._team_leagues.get(name_key(team), []))
+
+    def team_id(self, name: str) -> Optional[int]:
+        with self._lock:
+            self._ensure_fresh()
+            return self.teams.ids.get(name_key(name))
+
+    def team_name(self, team_id: int) -> Optional[str]:
+        with self._lock:
+            self._ensure_fresh()
+            return self.teams.names.get(team_id)
+
+    def competition_id(self, name: str) -> Optional[int]:
+        with self._lock:
+            self._ensure_fresh()
+            return self.competitions.ids.get(name_key(name))
+
+    def competition_name(self, competition_id: int) -> Optional[str]:
+        with self._lock:
+            self._ensure_fresh()
+            return self.competitions.names.get(competition_id)
+
+    def search_teams(self, query: str, league: str = None, limit: int = 10) -> List[str]:
+        """
+        Team names matching `query`, best first: names with a word starting
+        with it, then names containing it, then close (fuzzy) matches.
+        Restricted to `league` when given.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            q = name_key(query)
+            if league is not None:
+                pool = list(self._league_teams.get(name_key(league), {}))
+            else:
+                pool = list(self._team_display)
+            if not q:
+                return sorted((self._team_display[k] for k in pool), key=name_key)[:limit]
+
+            allowed = set(pool)
+            found: Dict[str, None] = {}
+            words = self._word_index()
+            start = bisect.bisect_left(words, (q, ""))
+            for word, key in words[start:]:
+                if not word.startswith(q):
+                    break
+                if key in allowed:
+                    found[key] = None
+            for key in sorted(allowed):
+                if q in key:
+                    found.setdefault(key, None)
+            for key in difflib.get_close_matches(q, sorted(allowed), n=limit, cutoff=FUZZY_CUTOFF):
+                found.setdefault(key, None)
+            return [self._team_display[key] for key in list(found)[:limit]]
+
+    # ------------------------------------------------------------------ #
+    # Resolution (write-through)
+    # ------------------------------------------------------------------ #
+
+    def resolve_teams(self, names: Iterable[str], league: str = None) -> Dict[str, int]:
+        """
+        Map every team name (by `name_key`) to its id, creating unknown teams.
+        With `league`, the teams are also added to that league's index.
+        """
+        names = list(names)
+        ids = self._resolve("teams", names)
+        if league is not None:
+            with self._lock:
+                self._add_league(league, names)
+        return ids
+
+    def resolve_competitions(self, names: Iterable[str]) -> Dict[str, int]:
+        """Map every competition name (by `name_key`) to its id, creating unknown ones."""
+        names = list(names)
+        ids = self._resolve("competitions", names)
+        with self._lock:
+            for name in names:
+                self._add_league(name, [])
+        return ids
+
+    def _resolve(self, table: str, names: Iterable[str]) -> Dict[str, int]:
+        wanted = {name_key(n): _clean(n) for n in names}
+        with self._lock:
+            self._ensure_fresh()
+            index = getattr(self, table)
+            if any(key not in index.ids for key in wanted):
+                # Another process may have created some since the last load
+                self._write_through(table, wanted)
+                index = getattr(self, table)
+            return {key: index.ids[key] for key in wanted}
+
+    def _write_through(self, table: str, wanted: Dict[str, str]) -> None:
+        with get_connection() as conn:
+            index = _NameIndex(conn.execute(f"SELECT id, name FROM {table}"))
+            missing = [name for key, name in wanted.items() if key not in index.ids]
+            if missing:
+                conn.executemany(
+                    f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", [(name,) for name in missing]
+                )
+                marks = ",".join("?" * len(missing))
+                for id_, name in conn.execute(f"SELECT id, name FROM {table} WHERE name IN ({marks})", missing):
+                    index.add(id_, name)
+        setattr(self, table, index)
+        if table == "teams":
+            for name in wanted.values():
+                self._add_team(name)
+        if missing:
+            # Cached reads of the table are stale now, the catalogue itself is not
+            bump(table)
+            self._versions = table_versions(*TABLES)
+
+
+_catalogue = None
+_catalogue_lock = threading.Lock()
+
+
+def get_catalogue() -> TeamCatalogue:
+    """The process-wide catalogue, loaded on first use."""
+    global _catalogue
+    with _catalogue_lock:
+        if _catalogue is None:
+            with open(DATA_PATH, "r", encoding="utf-8") as f:
+                catalogue = TeamCatalogue(json.load(f))
+            catalogue.refresh()
+            _catalogue = catalogue
+        return _catalogue
@@ -1,27 +1,7 @@
 import streamlit as st
 import sqlite3
-import hashlib
-
-
-# ----------------------------- #
-# Connect to the database
-# ----------------------------- #
-@st.cache_resource
-def get_connection():
-    conn = sqlite3.connect("football_game.db", check_same_thread=False)
-    return conn
-
-conn = get_connection()
-cursor = conn.cursor()
-
-# ----------------------------- #
-# Password hashing
-# ----------------------------- #
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
-
-def verify_password(password, hashed):
-    return hash_password(password) == hashed
+from utils.db import get_connection
+from controllers.auth_controller import hash_password, verify_password
 
 # ----------------------------- #
 # Create login/signup UI
@@ -35,8 +15,8 @@ def login_page():
         username = st.text_input("Username")
         password = st.text_input("Password", type="password")
         if st.button("Login"):
-            cursor.execute("SELECT id, pw, role FROM players WHERE name = ?", (username,))
-            row = cursor.fetchone()
+            with get_connection() as conn:
+                row = conn.execute("SELECT id, pw, role FROM players WHERE name = ?", (username,)).fetchone()
             if row and verify_password(password, row[1]):
                 st.session_state["user_id"] = row[0]
                 st.session_state["username"] = username
@@ -53,9 +33,9 @@ def login_page():
         if st.button("Sign Up"):
             try:
                 hashed_pw = hash_password(new_password)
-                cursor.execute("INSERT INTO players (name, pw, role) VALUES (?, ?, ?)",
-                               (new_username, hashed_pw, role))
-                conn.commit()
+                with get_connection() as conn:
+                    conn.execute("INSERT INTO players (name, pw, role) VALUES (?, ?, ?)",
+                                 (new_username, hashed_pw, role))
                 st.success("Account created! You can now log in.")
             except sqlite3.IntegrityError:
                 st.error("Username already exists.")
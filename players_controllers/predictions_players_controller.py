@@ -1,24 +1,26 @@
 # players_controllers/predictions_players_controller.py
 
+import re
+
 from utils.db import get_connection
+from utils.query_cache import cached, invalidates
+from controllers.rounds_controller import CURRENT_SEASON_SQL, get_latest_round_number, round_name
+
+_PREDICTION_RE = re.compile(r"^(\d+)-(\d+)$")
 
 def get_rounds_for_predictions():
     """
-    Returns a list of all rounds for which matches exist, ordered by round ID descending.
+    Returns a list of all rounds for which matches exist, latest round first.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
     query = """
         SELECT r.id, r.name
         FROM rounds r
         JOIN matches m ON m.round_id = r.id
         GROUP BY r.id
-        ORDER BY r.id DESC
+        ORDER BY r.season_id DESC, r.round_number DESC, r.id DESC
     """
-    cursor.execute(query)
-    results = cursor.fetchall()
-    conn.close()
-    return results
+    with get_connection() as conn:
+        return conn.execute(query).fetchall()
 
 def get_user_predictions_by_round(player_id, round_id):
     """
@@ -31,9 +33,6 @@ def get_user_predictions_by_round(player_id, round_id):
     Returns:
         List of tuples: (home_team, away_team, user_pred, actual_score, points)
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
     query = """
         SELECT 
             t1.name AS home_team,
@@ -52,10 +51,8 @@ def get_user_predictions_by_round(player_id, round_id):
         WHERE p.player_id = ? AND m.round_id = ?
         ORDER BY m.match_datetime
     """
-    cursor.execute(query, (player_id, round_id))
-    results = cursor.fetchall()
-    conn.close()
-    return results
+    with get_connection() as conn:
+        return conn.execute(query, (player_id, round_id)).fetchall()
 
 def get_upcoming_matches():
     """
@@ -64,9 +61,6 @@ def get_upcoming_matches():
     Returns:
         List of tuples: (match_id, round_name, home_team, away_team, match_datetime)
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    
     query = """
         SELECT 
             m.id,
@@ -81,12 +75,11 @@ def get_upcoming_matches():
         WHERE m.status = 'not played'
         ORDER BY m.match_datetime ASC
     """
-    cursor.execute(query)
-    results = cursor.fetchall()
-    conn.close()
-    return results
+    with get_connection() as conn:
+        return conn.execute(query).fetchall()
 
 
+@invalidates("predictions")
 def save_prediction(player_id, match_id, prediction_str):
     """
     Save the prediction for a specific match by a player.
@@ -101,32 +94,59 @@ def save_prediction(player_id, match_id, prediction_str):
     except ValueError:
         return False, "❌ Invalid format! Please enter predictions as 'X-Y', e.g. '2-1'."
 
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    # Check if prediction already exists
-    cursor.execute("""
-        SELECT 1 FROM predictions WHERE player_id = ? AND match_id = ?
-    """, (player_id, match_id))
-    if cursor.fetchone():
-        conn.close()
-        return False, "⚠️ You have already submitted a prediction for this match."
-
-    # Insert prediction
-    cursor.execute("""
-        INSERT INTO predictions (player_id, match_id, predicted_home_score, predicted_away_score)
-        VALUES (?, ?, ?, ?)
-    """, (player_id, match_id, predicted_home_score, predicted_away_score))
-
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        # Check if prediction already exists
+        existing = conn.execute("""
+            SELECT 1 FROM predictions WHERE player_id = ? AND match_id = ?
+        """, (player_id, match_id)).fetchone()
+        if existing:
+            return False, "⚠️ You have already submitted a prediction for this match."
+
+        # Insert prediction
+        conn.execute("""
+            INSERT INTO predictions (player_id, match_id, predicted_home_score, predicted_away_score)
+            VALUES (?, ?, ?, ?)
+        """, (player_id, match_id, predicted_home_score, predicted_away_score))
+
     return True, "✅ Prediction saved successfully!"
 
-def get_upcoming_matches_grouped_by_round(player_id):
-    conn = get_connection()
-    cursor = conn.cursor()
+@cached("matches", "rounds", "seasons")
+def get_active_round_numbers():
+    """
+    Round numbers shown eagerly on the player page: the current round (the
+    first one of the season with a match still to finish) and the next one.
+    Once every match is finished, the last round alone.
+    """
+    query = f"""
+        SELECT MIN(r.round_number)
+        FROM rounds r
+        JOIN matches m ON m.round_id = r.id
+        WHERE r.season_id = {CURRENT_SEASON_SQL} AND m.status IN ('not played', 'live')
+    """
+    with get_connection() as conn:
+        current = conn.execute(query).fetchone()[0]
+        if current is None:
+            return [get_latest_round_number()]
+        following = conn.execute(
+            f"""
+            SELECT MIN(r.round_number) FROM rounds r
+            WHERE r.season_id = {CURRENT_SEASON_SQL} AND r.round_number > ?
+            """,
+            (current,),
+        ).fetchone()[0]
+    return [current] + ([following] if following is not None else [])
 
-    query = """
+@cached("matches", "rounds", "seasons", "teams", "predictions")
+def get_player_matches_by_round(player_id, round_numbers):
+    """
+    Matches of the given rounds (a tuple of round numbers, current season)
+    with the player's predictions, grouped by round name in round order.
+    """
+    round_numbers = list(round_numbers)
+    if not round_numbers:
+        return {}
+
+    query = f"""
         SELECT 
             m.id AS match_id,
             t1.name AS home_team,
@@ -139,19 +159,18 @@ def get_upcoming_matches_grouped_by_round(player_id):
             m.home_score,
             m.away_score,
             p.points_awarded
-        FROM matches m
-        JOIN rounds r ON m.round_id = r.id
+        FROM rounds r
+        JOIN matches m ON m.round_id = r.id
         JOIN teams t1 ON m.home_team_id = t1.id
         JOIN teams t2 ON m.away_team_id = t2.id
         LEFT JOIN predictions p ON m.id = p.match_id AND p.player_id = ?
-        WHERE m.status IN ('not played', 'finished', 'live')
-        ORDER BY m.match_datetime ASC
+        WHERE r.season_id = {CURRENT_SEASON_SQL}
+          AND r.round_number IN ({','.join('?' * len(round_numbers))})
+        ORDER BY r.round_number, m.match_datetime ASC
     """
 
-
-    cursor.execute(query, (player_id,))
-    rows = cursor.fetchall()
-    conn.close()
+    with get_connection() as conn:
+        rows = conn.execute(query, (player_id, *round_numbers)).fetchall()
 
     grouped = {}
     for row in rows:
@@ -165,60 +184,119 @@ def get_upcoming_matches_grouped_by_round(player_id):
             "predicted_away": row[7],
             "home_score": row[8],
             "away_score": row[9],
-            "earned_points": row[10]  # ✅ Correct column name
+            "earned_points": row[10]
         }
         round_name = row[5]
         grouped.setdefault(round_name, []).append(match)
 
     return grouped
 
+@cached("matches", "rounds", "seasons", "predictions", "player_round_standings")
+def get_past_round_summaries(player_id, before_round, limit=5):
+    """
+    One summary per round older than `before_round`, newest first, read
+    from the materialized per-round standings (keyset pagination: pass the
+    last returned round_number as `before_round` to get the next page).
 
+    Returns:
+        List of dicts: round_number, round_name, matches, predicted, points, exact_hits, outcome_hits
+    """
+    query = f"""
+        WITH page AS (
+            SELECT DISTINCT r.round_number
+            FROM rounds r
+            WHERE r.season_id = {CURRENT_SEASON_SQL} AND r.round_number < ?
+            ORDER BY r.round_number DESC
+            LIMIT ?
+        )
+        SELECT
+            pg.round_number,
+            (SELECT COUNT(*) FROM matches m JOIN rounds r2 ON m.round_id = r2.id
+             WHERE r2.round_number = pg.round_number AND r2.season_id = {CURRENT_SEASON_SQL}),
+            (SELECT COUNT(*) FROM predictions p
+             JOIN matches m ON p.match_id = m.id
+             JOIN rounds r3 ON m.round_id = r3.id
+             WHERE p.player_id = ? AND r3.round_number = pg.round_number
+               AND r3.season_id = {CURRENT_SEASON_SQL}),
+            COALESCE(SUM(prs.points), 0),
+            COALESCE(SUM(prs.exact_hits), 0),
+            COALESCE(SUM(prs.outcome_hits), 0)
+        FROM page pg
+        JOIN rounds r ON r.round_number = pg.round_number AND r.season_id = {CURRENT_SEASON_SQL}
+        LEFT JOIN player_round_standings prs ON prs.round_id = r.id AND prs.player_id = ?
+        GROUP BY pg.round_number
+        ORDER BY pg.round_number DESC
+    """
+    with get_connection() as conn:
+        rows = conn.execute(query, (before_round, limit, player_id, player_id)).fetchall()
 
-def save_predictions_batch(player_id, prediction_inputs):
-    from datetime import datetime
-    import re
-    conn = get_connection()
-    cursor = conn.cursor()
+    return [
+        {
+            "round_number": row[0],
+            "round_name": round_name(row[0]),
+            "matches": row[1],
+            "predicted": row[2],
+            "points": row[3],
+            "exact_hits": row[4],
+            "outcome_hits": row[5],
+        }
+        for row in rows
+    ]
 
-    results = []
 
-    for match_id, value in prediction_inputs.items():
-        match_id = int(match_id)
-        value = value.strip()
 
-        if not re.match(r"^\d+-\d+$", value):
-            results.append((False, f"Invalid format for match {match_id}. Use format '2-1'."))
-            continue
+@invalidates("predictions")
+def save_predictions_batch(player_id, prediction_inputs):
+    """
+    Save several predictions of a player at once.
 
-        try:
-            predicted_home, predicted_away = map(int, value.split("-"))
-        except ValueError:
-            results.append((False, f"Failed to parse prediction for match {match_id}."))
-            continue
+    The statuses of all submitted matches are read in one query, the inputs
+    are validated in memory and every valid prediction is written with a
+    single executemany upsert. The transaction takes the write lock up front
+    (BEGIN IMMEDIATE) so concurrent submissions queue on the busy timeout
+    instead of failing with SQLITE_BUSY when a read would upgrade to a write.
 
-        cursor.execute("SELECT status FROM matches WHERE id = ?", (match_id,))
-        row = cursor.fetchone()
-        if not row or row[0] != "not played":
-            results.append((False, f"Match {match_id} is already played or doesn't exist."))
+    Returns:
+        List of (success: bool, message: str), one per submitted match, in input order
+    """
+    results = []
+    parsed = []
+    for match_id, value in prediction_inputs.items():
+        match_id = int(match_id)
+        score = _PREDICTION_RE.match(value.strip())
+        if not score:
+            results.append((match_id, False, f"Invalid format for match {match_id}. Use format '2-1'."))
             continue
+        parsed.append((match_id, int(score.group(1)), int(score.group(2))))
+        results.append((match_id, None, None))
 
-        cursor.execute("SELECT id FROM predictions WHERE player_id = ? AND match_id = ?", (player_id, match_id))
-        existing = cursor.fetchone()
-
-        if existing:
-            cursor.execute("""
-                UPDATE predictions
-                SET predicted_home_score = ?, predicted_away_score = ?
-                WHERE player_id = ? AND match_id = ?
-            """, (predicted_home, predicted_away, player_id, match_id))
-        else:
-            cursor.execute("""
+    if parsed:
+        match_ids = [match_id for match_id, _, _ in parsed]
+        with get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            statuses = dict(conn.execute(
+                f"SELECT id, status FROM matches WHERE id IN ({','.join('?' * len(match_ids))})",
+                match_ids,
+            ).fetchall())
+            valid = [
+                (player_id, match_id, home, away)
+                for match_id, home, away in parsed
+                if statuses.get(match_id) == "not played"
+            ]
+            conn.executemany("""
                 INSERT INTO predictions (player_id, match_id, predicted_home_score, predicted_away_score)
                 VALUES (?, ?, ?, ?)
-            """, (player_id, match_id, predicted_home, predicted_away))
+                ON CONFLICT(player_id, match_id) DO UPDATE SET
+                    predicted_home_score = excluded.predicted_home_score,
+                    predicted_away_score = excluded.predicted_away_score
+            """, valid)
 
-        results.append((True, f"Prediction saved for match {match_id}"))
+        saved = {row[1] for row in valid}
+        results = [
+            (match_id, success, message) if success is not None
+            else (match_id, True, f"Prediction saved for match {match_id}") if match_id in saved
+            else (match_id, False, f"Match {match_id} is already played or doesn't exist.")
+            for match_id, success, message in results
+        ]
 
-    conn.commit()
-    conn.close()
-    return results
\ No newline at end of file
+    return [(success, message) for _, success, message in results]
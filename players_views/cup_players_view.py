@@ -1,12 +1,12 @@
 import streamlit as st
 from streamlit_lottie import st_lottie
-from utils.lottie_loader import load_lottie_url
+from utils.lottie_loader import load_lottie
 
 def cup_view_player():
     st.markdown("## 🏆 The Cup")
     st.markdown("A future exciting tournament is coming soon... Stay tuned!")
 
-    animation = load_lottie_url("https://assets9.lottiefiles.com/packages/lf20_puciaact.json")
+    animation = load_lottie("cup")
     if animation:
         st_lottie(animation, height=250)
     else:
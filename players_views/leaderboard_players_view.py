@@ -2,18 +2,30 @@ import streamlit as st
 import pandas as pd
 from players_controllers import leaderboard_players_controller as lpc
 from streamlit_lottie import st_lottie
-from utils.lottie_loader import load_lottie_url
+from utils.lottie_loader import load_lottie
+from controllers.live_feed import (
+    LIVE_POLL_SECONDS, count_live_matches, live_refresh_interval, poll_changes
+)
 
 def leaderboard_view_player():
     st.markdown("<h2 style='color:#FFD700;'>🏆 Global Leaderboard</h2>", unsafe_allow_html=True)
     st.markdown("See how you rank among other legends of prediction!")
 
     # 🔄 Top Lottie Animation
-    anim_url = "https://lottie.host/5e833fc5-0620-4e7d-8fd1-4dfbc7582b7b/aWy5uQ6DJu.json"
-    lottie = load_lottie_url(anim_url)
+    lottie = load_lottie("leaderboard_player")
     if lottie:
         st_lottie(lottie, height=180, speed=1.2, key="leaderboard_lottie")
 
+    # Re-rendered on its own every few seconds while matches are live
+    st.fragment(_leaderboard_table, run_every=live_refresh_interval())()
+
+
+def _leaderboard_table():
+    poll_changes()  # cached reads are refreshed only if the database changed
+    live = count_live_matches()
+    if live:
+        st.caption(f"🔴 {live} match(es) live: points are provisional and refresh every {LIVE_POLL_SECONDS}s.")
+
     scores = lpc.get_players_leaderboard()
     user = st.session_state.get("user")
     player_name = user["username"] if user else None
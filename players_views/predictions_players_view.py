@@ -1,8 +1,69 @@
 import streamlit as st
 from players_controllers.predictions_players_controller import (
-    get_upcoming_matches_grouped_by_round,
+    get_active_round_numbers,
+    get_past_round_summaries,
+    get_player_matches_by_round,
     save_predictions_batch
 )
+from controllers.scoring_engine import classify_prediction
+
+PAST_ROUNDS_PAGE_SIZE = 5
+
+# Scoring-engine hit kinds -> card style
+RESULT_STYLES = {"exact": "perfect", "goal_difference": "good", "outcome": "good", "wrong": "wrong"}
+
+STATUS_DISPLAY = {
+    "not played": '<span style="background-color:#005f73; color:white; padding:4px 10px; border-radius:6px;">⏳ Not Played</span>',
+    "finished": '<span style="background-color:#007f5f; color:white; padding:4px 10px; border-radius:6px;">✅ Finished</span>',
+    "live": '<span style="background-color:#ffb703; color:black; padding:4px 10px; border-radius:6px;">📺 Live Now</span>',
+    "cancelled": '<span style="background-color:#9e2a2b; color:white; padding:4px 10px; border-radius:6px;">🚫 Cancelled</span>',
+    "postponed": '<span style="background-color:#6a0572; color:white; padding:4px 10px; border-radius:6px;">⏸️ Postponed</span>'
+}
+
+CARD_CSS = """
+<style>
+    .match-block {
+        background-color: #1e1e1e;
+        padding: 1rem;
+        border-radius: 12px;
+        margin-bottom: 1.2rem;
+        border: 1px solid #333;
+    }
+    .match-title {
+        font-size: 1.4rem;
+        font-weight: bold;
+        color: #00ffff;
+    }
+    .match-meta {
+        font-size: 0.9rem;
+        color: #ccc;
+        margin-top: 0.3rem;
+        margin-bottom: 0.4rem;
+    }
+    .perfect {
+        background-color: #004d00;
+        color: #00ff00;
+        padding: 0.4rem 0.8rem;
+        border-radius: 8px;
+        font-weight: bold;
+    }
+    .good {
+        background-color: #4d3b00;
+        color: #ffc107;
+        padding: 0.4rem 0.8rem;
+        border-radius: 8px;
+        font-weight: bold;
+    }
+    .wrong {
+        background-color: #330000;
+        color: #ff4d4d;
+        padding: 0.4rem 0.8rem;
+        border-radius: 8px;
+        font-weight: bold;
+    }
+</style>
+"""
+
 
 def prediction_view_player():
     st.title("📝 My Predictions")
@@ -16,127 +77,20 @@ def prediction_view_player():
         return
 
     player_id = user["id"]
-    grouped_matches = get_upcoming_matches_grouped_by_round(player_id)
+    st.markdown(CARD_CSS, unsafe_allow_html=True)
+
+    # Only the current and next round are loaded eagerly
+    active_rounds = get_active_round_numbers()
+    grouped_matches = get_player_matches_by_round(player_id, tuple(active_rounds))
 
     if not grouped_matches:
         st.success("✅ No upcoming matches. You’re all caught up!")
-        return
 
     prediction_inputs = {}
-
-    # Match card styles
-    st.markdown("""
-        <style>
-            .match-block {
-                background-color: #1e1e1e;
-                padding: 1rem;
-                border-radius: 12px;
-                margin-bottom: 1.2rem;
-                border: 1px solid #333;
-            }
-            .match-title {
-                font-size: 1.4rem;
-                font-weight: bold;
-                color: #00ffff;
-            }
-            .match-meta {
-                font-size: 0.9rem;
-                color: #ccc;
-                margin-top: 0.3rem;
-                margin-bottom: 0.4rem;
-            }
-            .perfect {
-                background-color: #004d00;
-                color: #00ff00;
-                padding: 0.4rem 0.8rem;
-                border-radius: 8px;
-                font-weight: bold;
-            }
-            .good {
-                background-color: #4d3b00;
-                color: #ffc107;
-                padding: 0.4rem 0.8rem;
-                border-radius: 8px;
-                font-weight: bold;
-            }
-            .wrong {
-                background-color: #330000;
-                color: #ff4d4d;
-                padding: 0.4rem 0.8rem;
-                border-radius: 8px;
-                font-weight: bold;
-            }
-        </style>
-    """, unsafe_allow_html=True)
-
-    def evaluate_prediction(actual_home, actual_away, predicted_home, predicted_away):
-        if actual_home == predicted_home and actual_away == predicted_away:
-            return "perfect"
-        elif (actual_home - actual_away) * (predicted_home - predicted_away) > 0 or \
-             (actual_home == actual_away and predicted_home == predicted_away):
-            return "good"
-        else:
-            return "wrong"
-
-    status_display = {
-        "not played": '<span style="background-color:#005f73; color:white; padding:4px 10px; border-radius:6px;">⏳ Not Played</span>',
-        "finished": '<span style="background-color:#007f5f; color:white; padding:4px 10px; border-radius:6px;">✅ Finished</span>',
-        "live": '<span style="background-color:#ffb703; color:black; padding:4px 10px; border-radius:6px;">📺 Live Now</span>',
-        "cancelled": '<span style="background-color:#9e2a2b; color:white; padding:4px 10px; border-radius:6px;">🚫 Cancelled</span>',
-        "postponed": '<span style="background-color:#6a0572; color:white; padding:4px 10px; border-radius:6px;">⏸️ Postponed</span>'
-    }
-
-    for round_name, matches in grouped_matches.items():
-        with st.expander(f"🗓️ Round: {round_name}", expanded=False):
+    for i, (round_name, matches) in enumerate(grouped_matches.items()):
+        with st.expander(f"🗓️ Round: {round_name}", expanded=i == 0):
             for match in matches:
-                match_id = match["match_id"]
-                home_team = match["home_team"]
-                away_team = match["away_team"]
-                match_datetime = match["match_datetime"]
-                status = match["status"]
-                predicted_home = match["predicted_home"]
-                predicted_away = match["predicted_away"]
-                actual_home = match.get("home_score")
-                actual_away = match.get("away_score")
-                earned_points = match.get("earned_points")
-
-                st.markdown('<div class="match-block">', unsafe_allow_html=True)
-                st.markdown(
-                    f'<div class="match-title">⚽ {home_team} <span style="color:#999">vs</span> {away_team}</div>',
-                    unsafe_allow_html=True
-                )
-                st.markdown(f'<div class="match-meta">🕒 {match_datetime}</div>', unsafe_allow_html=True)
-
-                status_html = status_display.get(status.lower(), f'<span style="color:gray;">{status}</span>')
-                st.markdown(f'<div class="match-meta">📌 Status: {status_html}</div>', unsafe_allow_html=True)
-
-                if status == "not played":
-                    default = f"{predicted_home}-{predicted_away}" if predicted_home is not None else ""
-                    prediction = st.text_input(
-                        f"✍️ Your Prediction for {home_team} vs {away_team}",
-                        value=default,
-                        placeholder="e.g., 2-1",
-                        key=f"prediction_{match_id}"
-                    )
-                    prediction_inputs[match_id] = prediction
-                else:
-                    if predicted_home is not None:
-                        st.markdown(f"**📝 Your Prediction:** `{predicted_home}-{predicted_away}`")
-                        if actual_home is not None and actual_away is not None:
-                            st.markdown(f"**🎯 Final Score:** `{actual_home}-{actual_away}`")
-                            result_type = evaluate_prediction(actual_home, actual_away, predicted_home, predicted_away)
-                            result_msg = {
-                                "perfect": f'<div class="perfect">🎯 Perfect Prediction! +{earned_points} pts</div>',
-                                "good": f'<div class="good">👍 Good Try! +{earned_points} pts</div>',
-                                "wrong": f'<div class="wrong">❌ Missed Prediction. +{earned_points} pts</div>'
-                            }
-                            st.markdown(result_msg[result_type], unsafe_allow_html=True)
-                        else:
-                            st.warning("⚠️ This match is marked as finished, but no final score is available yet.")
-                    else:
-                        st.warning("⚠️ You didn’t submit a prediction for this match.")
-
-                st.markdown('</div>', unsafe_allow_html=True)
+                _render_match(match, prediction_inputs)
 
     if prediction_inputs:
         if st.button("✅ Submit All Predictions", use_container_width=True):
@@ -153,3 +107,99 @@ def prediction_view_player():
                     for success, msg in results:
                         if not success:
                             st.warning(msg)
+
+    _past_rounds_view(player_id, min(active_rounds))
+
+
+def _past_rounds_view(player_id, first_active_round):
+    """Older rounds as one summary table, a page at a time; match cards only on request."""
+    st.markdown("---")
+    st.markdown("### 📜 Past Rounds")
+
+    # Only the number of pages shown is kept across reruns; the pages are
+    # re-read through the cached controller, so rescores show up right away
+    state_key = f"past_rounds_pages_{player_id}_{first_active_round}"
+    pages = st.session_state.setdefault(state_key, 1)
+    summaries, before = [], first_active_round
+    for _ in range(pages):
+        page = get_past_round_summaries(player_id, before, PAST_ROUNDS_PAGE_SIZE)
+        summaries += page
+        if len(page) < PAST_ROUNDS_PAGE_SIZE:
+            break
+        before = page[-1]["round_number"]
+
+    if not summaries:
+        st.caption("No past rounds yet.")
+        return
+
+    import pandas as pd  # deferred: the prediction cards themselves don't need it
+
+    df = pd.DataFrame(summaries)
+    df = df[["round_name", "matches", "predicted", "exact_hits", "outcome_hits", "points"]]
+    df.columns = ["Round", "Matches", "Predicted", "🎯 Exact", "👍 Outcome", "Points"]
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+    oldest = summaries[-1]["round_number"]
+    if len(summaries) % PAST_ROUNDS_PAGE_SIZE == 0 and oldest > 1:
+        if st.button("⬇️ Load older rounds"):
+            st.session_state[state_key] = pages + 1
+            st.rerun()
+
+    round_options = {s["round_name"]: s["round_number"] for s in summaries}
+    selected = st.selectbox("🔍 Show my matches for", ["—"] + list(round_options))
+    if selected != "—":
+        for matches in get_player_matches_by_round(player_id, (round_options[selected],)).values():
+            for match in matches:
+                _render_match(match)
+
+
+def _render_match(match, prediction_inputs=None):
+    """One match card; open matches get a prediction input collected into `prediction_inputs`."""
+    match_id = match["match_id"]
+    home_team = match["home_team"]
+    away_team = match["away_team"]
+    match_datetime = match["match_datetime"]
+    status = match["status"]
+    predicted_home = match["predicted_home"]
+    predicted_away = match["predicted_away"]
+    actual_home = match.get("home_score")
+    actual_away = match.get("away_score")
+    earned_points = match.get("earned_points")
+
+    status_html = STATUS_DISPLAY.get(status.lower(), f'<span style="color:gray;">{status}</span>')
+    st.markdown(
+        '<div class="match-block">'
+        f'<div class="match-title">⚽ {home_team} <span style="color:#999">vs</span> {away_team}</div>'
+        f'<div class="match-meta">🕒 {match_datetime}</div>'
+        f'<div class="match-meta">📌 Status: {status_html}</div>',
+        unsafe_allow_html=True
+    )
+
+    if status == "not played":
+        default = f"{predicted_home}-{predicted_away}" if predicted_home is not None else ""
+        prediction = st.text_input(
+            f"✍️ Your Prediction for {home_team} vs {away_team}",
+            value=default,
+            placeholder="e.g., 2-1",
+            key=f"prediction_{match_id}"
+        )
+        if prediction_inputs is not None:
+            prediction_inputs[match_id] = prediction
+    else:
+        if predicted_home is not None:
+            st.markdown(f"**📝 Your Prediction:** `{predicted_home}-{predicted_away}`")
+            if actual_home is not None and actual_away is not None:
+                st.markdown(f"**🎯 Final Score:** `{actual_home}-{actual_away}`")
+                result_type = RESULT_STYLES[classify_prediction(actual_home, actual_away, predicted_home, predicted_away)]
+                result_msg = {
+                    "perfect": f'<div class="perfect">🎯 Perfect Prediction! +{earned_points} pts</div>',
+                    "good": f'<div class="good">👍 Good Try! +{earned_points} pts</div>',
+                    "wrong": f'<div class="wrong">❌ Missed Prediction. +{earned_points} pts</div>'
+                }
+                st.markdown(result_msg[result_type], unsafe_allow_html=True)
+            else:
+                st.warning("⚠️ This match is marked as finished, but no final score is available yet.")
+        else:
+            st.warning("⚠️ You didn’t submit a prediction for this match.")
+
+    st.markdown('</div>', unsafe_allow_html=True)
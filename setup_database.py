@@ -17,11 +17,16 @@ This script creates the SQLite database with the following tables:
 - achievements
 - user_achievements
 
+Tables added after the initial release (standings, indexes, ...) are created
+by the versioned migrations in utils/migrations.py, which this script applies
+after the base schema.
+
 Run this once to initialize your database.
 """
 
 import sqlite3
 import os
+from utils.migrations import apply_migrations
 
 # Database file name
 DB_NAME = "football_game.db"
@@ -30,10 +35,6 @@ DB_NAME = "football_game.db"
 # if os.path.exists(DB_NAME):
 #     os.remove(DB_NAME)
 
-# Connect to the database (it will be created if it doesn't exist)
-conn = sqlite3.connect(DB_NAME)
-cursor = conn.cursor()
-
 # Step 1: Drop tables if needed (optional cleanup)
 # cursor.executescript("""
 # DROP TABLE IF EXISTS user_achievements;
@@ -51,13 +52,13 @@ cursor = conn.cursor()
 # """)
 
 # Step 2: Create all tables
-cursor.executescript("""
+SCHEMA_SQL = """
 
 -- Players Table
 CREATE TABLE IF NOT EXISTS players (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT NOT NULL UNIQUE,
-    password_hash TEXT NOT NULL,
+    pw TEXT NOT NULL,
     role TEXT CHECK(role IN ('admin', 'user')) NOT NULL
 );
 
@@ -178,11 +179,27 @@ CREATE TABLE IF NOT EXISTS user_achievements (
     FOREIGN KEY (achievement_id) REFERENCES achievements(id),
     FOREIGN KEY (cup_round_id) REFERENCES cup_rounds(id)
 );
-""")
+"""
+
+
+def create_database(db_name=DB_NAME):
+    # Connect to the database (it will be created if it doesn't exist)
+    conn = sqlite3.connect(db_name)
+    conn.executescript(SCHEMA_SQL)
+
+    # Step 3: Bring the schema up to the latest version
+    applied = apply_migrations(conn)
+
+    # Commit and close connection
+    conn.commit()
+    conn.close()
+    return applied
+
 
-# Final Step: Confirmation
-print("✅ Database and tables created successfully!")
+if __name__ == "__main__":
+    applied = create_database()
 
-# Commit and close connection
-conn.commit()
-conn.close()
+    # Final Step: Confirmation
+    print("✅ Database and tables created successfully!")
+    if applied:
+        print(f"🔧 Applied migrations: {', '.join(str(v) for v in applied)}")
@@ -0,0 +1,57 @@
+import io
+
+import pytest
+
+import utils.db
+from controllers import team_catalogue
+from controllers.fixtures_controller import import_fixtures
+from controllers.rounds_controller import ensure_round
+from setup_database import create_database
+
+FIXTURE_CSV = (
+    "competition,round,home_team,away_team,match_datetime\n"
+    "Test League,1,Alpha FC,Beta FC,{kickoff}\n"
+)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    path = str(tmp_path / "football_game.db")
+    create_database(path)
+    monkeypatch.setattr(utils.db, "DB_NAME", path)
+    monkeypatch.setattr(team_catalogue, "_catalogue", None)
+    yield path
+    utils.db.get_pool(path).close_all()
+
+
+def _start_season(name):
+    with utils.db.get_connection() as conn:
+        conn.execute("UPDATE seasons SET is_current = 0")
+        conn.execute("INSERT INTO seasons (name, is_current) VALUES (?, 1)", (name,))
+
+
+def _rounds():
+    with utils.db.get_connection() as conn:
+        return conn.execute(
+            "SELECT r.id, s.name, r.round_number FROM rounds r JOIN seasons s ON s.id = r.season_id ORDER BY r.id"
+        ).fetchall()
+
+
+def test_same_round_number_is_a_new_round_in_a_new_season(db):
+    first = import_fixtures(io.StringIO(FIXTURE_CSV.format(kickoff="2025-08-16 15:00")), "csv")
+    assert first["inserted"] == 1 and not first["errors"]
+
+    _start_season("Next Season")
+    second = import_fixtures(io.StringIO(FIXTURE_CSV.format(kickoff="2026-08-15 15:00")), "csv")
+    assert second["inserted"] == 1 and second["updated"] == 0
+
+    rounds = _rounds()
+    assert [(season, number) for _, season, number in rounds] == [
+        ("Current Season", 1),
+        ("Next Season", 1),
+    ]
+    with utils.db.get_connection() as conn:
+        matches = conn.execute("SELECT round_id FROM matches ORDER BY id").fetchall()
+        competition_id = conn.execute("SELECT id FROM competitions").fetchone()[0]
+        assert [row[0] for row in matches] == [rounds[0][0], rounds[1][0]]
+        assert ensure_round(conn, competition_id, 1) == rounds[1][0]
@@ -1,4 +1,204 @@
+import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 
-def get_connection():
-    return sqlite3.connect("football_game.db", check_same_thread=False)
+DB_NAME = os.getenv("FOOTBALL_DB", "football_game.db")
+
+# Pool tuning (overridable through the environment)
+POOL_SIZE = int(os.getenv("FOOTBALL_DB_POOL_SIZE", "8"))
+BUSY_TIMEOUT_MS = int(os.getenv("FOOTBALL_DB_BUSY_TIMEOUT_MS", "5000"))
+STATEMENT_CACHE_SIZE = int(os.getenv("FOOTBALL_DB_STATEMENT_CACHE", "256"))
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections shared by every Streamlit session.
+
+    Connections are opened lazily (up to `max_size`), configured once with
+    WAL journaling and a busy timeout, and handed back to the pool instead of
+    being closed, so a rerun does not pay the connect/PRAGMA cost again.
+    """
+
+    def __init__(self, db_path: str, max_size: int = POOL_SIZE):
+        self.db_path = db_path
+        self.max_size = max_size
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+        # close_all() starts a new generation; older connections are closed on release
+        self._generation = 0
+        self._generations = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        with self._lock:
+            self._generations[conn] = self._generation
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Take an idle connection, open a new one, or wait for one to be
+        released. Raises sqlite3.OperationalError when none is released
+        within the busy timeout.
+        """
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self._hits += 1
+                self._in_use += 1
+            return conn
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.max_size
+            if can_create:
+                self._created += 1
+                self._misses += 1
+            else:
+                self._waits += 1
+
+        if can_create:
+            try:
+                conn = self._connect()
+            except sqlite3.Error:
+                with self._lock:
+                    self._created -= 1
+                raise
+        else:
+            try:
+                conn = self._idle.get(timeout=BUSY_TIMEOUT_MS / 1000)
+            except queue.Empty:
+                # Same error type as a busy database, which callers already handle
+                raise sqlite3.OperationalError(
+                    f"connection pool exhausted ({self.max_size} connections in use)"
+                ) from None
+
+        with self._lock:
+            self._in_use += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """
+        Return a connection to the pool, discarding any unfinished transaction.
+        A connection opened before the last close_all() is closed instead.
+        """
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._in_use -= 1
+            retired = self._generations.get(conn) != self._generation
+        if retired:
+            self._close(conn)
+        else:
+            self._idle.put(conn)
+
+    def _close(self, conn: sqlite3.Connection) -> None:
+        conn.close()
+        with self._lock:
+            self._generations.pop(conn, None)
+            self._created -= 1
+
+    def close_all(self) -> None:
+        """
+        Close every idle connection; connections in use are closed on release.
+        The pool stays usable and opens new connections on demand.
+        """
+        with self._lock:
+            self._generation += 1
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close(conn)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses + self._waits
+            return {
+                "db_path": self.db_path,
+                "max_size": self.max_size,
+                "open": self._created,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "hits": self._hits,
+                "misses": self._misses,
+                "waits": self._waits,
+                "hit_ratio": (self._hits / lookups) if lookups else 0.0,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str = None) -> ConnectionPool:
+    """Return the process-wide pool for `db_path` (defaults to DB_NAME)."""
+    db_path = db_path or DB_NAME
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = _pools[db_path] = ConnectionPool(db_path)
+        return pool
+
+
+@contextmanager
+def get_connection(db_path: str = None):
+    """
+    Borrow a pooled connection for the duration of a `with` block.
+
+    The transaction is committed when the block exits normally and rolled back
+    if it raises; the connection always goes back to the pool.
+    """
+    pool = get_pool(db_path)
+    conn = pool.acquire()
+    try:
+        yield conn
+        if conn.in_transaction:
+            conn.commit()
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        pool.release(conn)
+
+
+def get_pool_stats() -> list:
+    """Counters for every open pool, for the admin monitoring page."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
+
+
+_watchers = {}
+_watchers_lock = threading.Lock()
+
+
+def data_version(db_path: str = None) -> int:
+    """
+    `PRAGMA data_version` of a dedicated watcher connection: the value changes
+    whenever any other connection, in this process or another one, commits a
+    change to the database. Polling it costs no table reads.
+    """
+    db_path = db_path or DB_NAME
+    with _watchers_lock:
+        conn = _watchers.get(db_path)
+        if conn is None:
+            conn = _watchers[db_path] = sqlite3.connect(db_path, check_same_thread=False)
+        return conn.execute("PRAGMA data_version").fetchone()[0]
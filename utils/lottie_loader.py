@@ -1,10 +1,149 @@
-import requests
+# utils/lottie_loader.py
+"""
+Shared Lottie animation loader that never blocks a page render on the network.
 
-def load_lottie_url(url: str):
+Lookup order for `load_lottie_url(url)`:
+    1. in-process LRU
+    2. bundled file  data/lottie/<name>.json   (for the named ANIMATIONS)
+    3. on-disk cache data/lottie/cache/<sha1(url)>.json
+    4. packaged fallback data/lottie/fallback.json, while the real animation
+       is downloaded in the background for the next rerun
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+LOTTIE_DIR = os.path.join(PROJECT_ROOT, "data", "lottie")
+CACHE_DIR = os.path.join(LOTTIE_DIR, "cache")
+FALLBACK_PATH = os.path.join(LOTTIE_DIR, "fallback.json")
+
+REQUEST_TIMEOUT = (2, 3)  # (connect, read) seconds, background fetches only
+RETRY_AFTER_SECONDS = 300  # don't hammer an unreachable host on every rerun
+MEMORY_CACHE_SIZE = 32
+
+# Every animation the app shows, by name (bundled copies use the same name)
+ANIMATIONS = {
+    "leaderboard_football": "https://assets5.lottiefiles.com/packages/lf20_zrqthn6o.json",
+    "leaderboard_player": "https://lottie.host/5e833fc5-0620-4e7d-8fd1-4dfbc7582b7b/aWy5uQ6DJu.json",
+    "trophy": "https://assets10.lottiefiles.com/packages/lf20_touohxv0.json",
+    "under_update": "https://assets7.lottiefiles.com/packages/lf20_touohxv0.json",
+    "cup": "https://assets9.lottiefiles.com/packages/lf20_puciaact.json",
+}
+_NAMES_BY_URL = {url: name for name, url in ANIMATIONS.items()}
+
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+_in_flight = set()
+_failed_at = {}
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="lottie-fetch")
+
+
+def _remember(url: str, animation: dict) -> dict:
+    with _memory_lock:
+        _memory[url] = animation
+        _memory.move_to_end(url)
+        while len(_memory) > MEMORY_CACHE_SIZE:
+            _memory.popitem(last=False)
+    return animation
+
+
+def _cache_path(url: str) -> str:
+    return os.path.join(CACHE_DIR, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _read_from_disk(url: str) -> Optional[dict]:
+    name = _NAMES_BY_URL.get(url)
+    if name:
+        bundled = _read_json(os.path.join(LOTTIE_DIR, f"{name}.json"))
+        if bundled:
+            return bundled
+    return _read_json(_cache_path(url))
+
+
+def _fetch(url: str) -> None:
+    """Download `url` into the disk cache and the LRU (runs on the executor)."""
+    import requests  # deferred: only background downloads need it, not app startup
+
+    animation = None
     try:
-        r = requests.get(url)
+        r = requests.get(url, timeout=REQUEST_TIMEOUT)
         if r.status_code == 200:
-            return r.json()
-    except:
+            animation = r.json()
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_path = _cache_path(url) + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(animation, f)
+            os.replace(tmp_path, _cache_path(url))
+    except (requests.RequestException, ValueError, OSError):
         pass
-    return None
+    finally:
+        if animation:
+            _remember(url, animation)
+        with _memory_lock:
+            _in_flight.discard(url)
+            if not animation:
+                _failed_at[url] = time.monotonic()
+
+
+def prefetch(urls: Iterable[str] = None) -> None:
+    """Start background downloads for animations that are not cached yet."""
+    for url in urls if urls is not None else ANIMATIONS.values():
+        with _memory_lock:
+            if url in _memory or url in _in_flight:
+                continue
+            if time.monotonic() - _failed_at.get(url, -RETRY_AFTER_SECONDS) < RETRY_AFTER_SECONDS:
+                continue
+        if os.path.exists(_cache_path(url)):
+            continue
+        with _memory_lock:
+            _in_flight.add(url)
+        _executor.submit(_fetch, url)
+
+
+def load_fallback() -> Optional[dict]:
+    """The packaged offline animation."""
+    with _memory_lock:
+        if FALLBACK_PATH in _memory:
+            return _memory[FALLBACK_PATH]
+    animation = _read_json(FALLBACK_PATH)
+    return _remember(FALLBACK_PATH, animation) if animation else None
+
+
+def load_lottie_url(url: str, fallback: bool = True) -> Optional[dict]:
+    """
+    Return the animation for `url` without waiting on the network.
+
+    On a cache miss the download is started in the background and the
+    packaged fallback (or None when `fallback` is False) is returned.
+    """
+    with _memory_lock:
+        if url in _memory:
+            _memory.move_to_end(url)
+            return _memory[url]
+
+    animation = _read_from_disk(url)
+    if animation:
+        return _remember(url, animation)
+
+    prefetch([url])
+    return load_fallback() if fallback else None
+
+
+def load_lottie(name: str, fallback: bool = True) -> Optional[dict]:
+    """Load one of the named ANIMATIONS."""
+    return load_lottie_url(ANIMATIONS[name], fallback=fallback)
@@ -0,0 +1,470 @@
+# utils/migrations.py
+"""
+Versioned, forward-only schema migrations.
+
+Each migration is a (version, description, apply) entry. `apply_migrations`
+runs the ones whose version is not yet recorded in `schema_version`, each in
+its own transaction, so a database can be brought up to date from any
+earlier state. Migrations must be idempotent (IF NOT EXISTS, ...) so they are
+also safe on databases that already had the objects created by hand.
+"""
+
+import sqlite3
+import threading
+from typing import Callable, List, Tuple
+
+from utils.db import get_connection
+
+
+def _execute_all(conn: sqlite3.Connection, sql: str) -> None:
+    # Statement by statement: executescript() would commit the open transaction.
+    for statement in sql.split(";"):
+        if statement.strip():
+            conn.execute(statement)
+
+
+def _add_column(conn: sqlite3.Connection, table: str, column: str, definition: str) -> None:
+    """ALTER TABLE ... ADD COLUMN, skipped when the column already exists."""
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+# ---------------------------------------------------------------------------- #
+# Migrations
+# ---------------------------------------------------------------------------- #
+
+def _m001_player_standings(conn: sqlite3.Connection) -> None:
+    """Materialized standings tables (see controllers/standings_controller.py)."""
+    _execute_all(conn, """
+    CREATE TABLE IF NOT EXISTS player_round_standings (
+        player_id INTEGER NOT NULL,
+        round_id INTEGER NOT NULL,
+        points INTEGER NOT NULL DEFAULT 0,
+        exact_hits INTEGER NOT NULL DEFAULT 0,      -- exact score predicted
+        outcome_hits INTEGER NOT NULL DEFAULT 0,    -- right result, wrong score
+        predictions_scored INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (player_id, round_id),
+        FOREIGN KEY (player_id) REFERENCES players(id),
+        FOREIGN KEY (round_id) REFERENCES rounds(id)
+    );
+
+    CREATE TABLE IF NOT EXISTS player_standings (
+        player_id INTEGER PRIMARY KEY,
+        total_points INTEGER NOT NULL DEFAULT 0,
+        exact_hits INTEGER NOT NULL DEFAULT 0,
+        outcome_hits INTEGER NOT NULL DEFAULT 0,
+        predictions_scored INTEGER NOT NULL DEFAULT 0,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (player_id) REFERENCES players(id)
+    );
+    """)
+
+    from controllers.standings_controller import rebuild_standings
+    rebuild_standings(conn)
+
+
+def _m002_hot_path_indexes(conn: sqlite3.Connection) -> None:
+    """
+    Secondary indexes for the predicates every page filters on.
+
+    rounds gets none here: it is looked up by round number (indexes of
+    migration 3) and, since migration 9 replaced UNIQUE(name, competition_id),
+    by UNIQUE(season_id, competition_id, round_number). Name lookups scan
+    the table, which stays small.
+    """
+    _execute_all(conn, """
+    -- Matches of a round, in kickoff order
+    CREATE INDEX IF NOT EXISTS idx_matches_round_datetime
+        ON matches (round_id, match_datetime);
+
+    -- Upcoming / live / finished lists, in kickoff order
+    CREATE INDEX IF NOT EXISTS idx_matches_status_datetime
+        ON matches (status, match_datetime);
+
+    -- Season-wide listings ordered by kickoff
+    CREATE INDEX IF NOT EXISTS idx_matches_datetime
+        ON matches (match_datetime);
+
+    -- Predictions of a match (covering: grids and scoring never touch the table)
+    CREATE INDEX IF NOT EXISTS idx_predictions_match_covering
+        ON predictions (match_id, player_id, predicted_home_score,
+                        predicted_away_score, points_awarded);
+
+    -- Titles of a player
+    CREATE INDEX IF NOT EXISTS idx_user_achievements_user
+        ON user_achievements (user_id, achievement_id, year);
+
+    -- Ties of a cup round
+    CREATE INDEX IF NOT EXISTS idx_cup_matches_cup_round
+        ON cup_matches (cup_round_id);
+    """)
+    conn.execute("ANALYZE")
+
+
+def _m003_round_numbers_and_seasons(conn: sqlite3.Connection) -> None:
+    """
+    Numeric round ordinal and season for every round.
+
+    Rounds were identified only by their "Round N" text, which sorts
+    "Round 10" before "Round 2" and cannot be range-scanned. Existing rounds
+    are backfilled from their names and attached to a default current season.
+    """
+    _execute_all(conn, """
+    CREATE TABLE IF NOT EXISTS seasons (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        start_year INTEGER,
+        is_current INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+    _add_column(conn, "rounds", "round_number", "INTEGER")
+    _add_column(conn, "rounds", "season_id", "INTEGER REFERENCES seasons(id)")
+
+    conn.execute("""
+        UPDATE rounds SET round_number = CAST(SUBSTR(name, 7) AS INTEGER)
+        WHERE round_number IS NULL AND name LIKE 'Round %'
+    """)
+    if not conn.execute("SELECT 1 FROM seasons WHERE is_current = 1").fetchone():
+        conn.execute(
+            "INSERT OR IGNORE INTO seasons (name, start_year, is_current) "
+            "VALUES ('Current Season', CAST(strftime('%Y', 'now') AS INTEGER), 1)"
+        )
+        conn.execute("UPDATE seasons SET is_current = 1 WHERE name = 'Current Season'")
+    conn.execute("""
+        UPDATE rounds
+        SET season_id = (SELECT id FROM seasons WHERE is_current = 1 ORDER BY id DESC LIMIT 1)
+        WHERE season_id IS NULL
+    """)
+
+    _execute_all(conn, """
+    CREATE INDEX IF NOT EXISTS idx_rounds_season_number
+        ON rounds (season_id, round_number);
+    CREATE INDEX IF NOT EXISTS idx_rounds_number
+        ON rounds (round_number)
+    """)
+
+
+def _m004_scoring_jobs(conn: sqlite3.Connection) -> None:
+    """
+    Scoring job queue (see controllers/scoring_queue.py).
+
+    Triggers on `matches` enqueue a job whenever a match gets or changes its
+    score, or moves to 'finished', whichever code path wrote it. At most one
+    job per match is pending at a time. Migration 11 limits them to live and
+    finished matches.
+    """
+    _execute_all(conn, """
+    CREATE TABLE IF NOT EXISTS scoring_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        match_id INTEGER NOT NULL,
+        reason TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',     -- 'pending' or 'failed'
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        enqueued_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_scoring_jobs_pending_match
+        ON scoring_jobs (match_id) WHERE status = 'pending';
+
+    CREATE INDEX IF NOT EXISTS idx_scoring_jobs_status
+        ON scoring_jobs (status, id)
+    """)
+
+    # Trigger bodies contain ';' so they are executed one by one
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_matches_enqueue_scoring_update
+        AFTER UPDATE OF status, home_score, away_score ON matches
+        WHEN NEW.home_score IS NOT OLD.home_score
+          OR NEW.away_score IS NOT OLD.away_score
+          OR (NEW.status = 'finished' AND OLD.status IS NOT 'finished')
+        BEGIN
+            INSERT OR IGNORE INTO scoring_jobs (match_id, reason)
+            VALUES (NEW.id, CASE WHEN NEW.status = 'finished' AND OLD.status IS NOT 'finished'
+                                 THEN 'finished' ELSE 'score_changed' END);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_matches_enqueue_scoring_insert
+        AFTER INSERT ON matches
+        WHEN NEW.home_score IS NOT NULL AND NEW.away_score IS NOT NULL
+        BEGIN
+            INSERT OR IGNORE INTO scoring_jobs (match_id, reason) VALUES (NEW.id, 'inserted');
+        END
+    """)
+
+
+def _m005_unique_round_fixture(conn: sqlite3.Connection) -> None:
+    """
+    One fixture per (round, unordered team pair), so match writes can be a
+    single INSERT ... ON CONFLICT DO UPDATE (see FIXTURE_CONFLICT_TARGET in
+    controllers/fixtures_controller.py).
+
+    Duplicates left by the old SELECT-then-INSERT race are merged into the
+    oldest match first: their predictions move over unless the player
+    already predicted the kept match.
+    """
+    conn.execute("""
+        CREATE TEMP TABLE fixture_duplicates AS
+        SELECT id AS duplicate_id, keep_id
+        FROM (
+            SELECT id, MIN(id) OVER (
+                PARTITION BY round_id, MIN(home_team_id, away_team_id), MAX(home_team_id, away_team_id)
+            ) AS keep_id
+            FROM matches
+        )
+        WHERE id <> keep_id
+    """)
+    merged = conn.execute("SELECT COUNT(*) FROM fixture_duplicates").fetchone()[0]
+    _execute_all(conn, """
+    UPDATE OR IGNORE predictions
+    SET match_id = (SELECT keep_id FROM fixture_duplicates WHERE duplicate_id = predictions.match_id)
+    WHERE match_id IN (SELECT duplicate_id FROM fixture_duplicates);
+
+    DELETE FROM predictions WHERE match_id IN (SELECT duplicate_id FROM fixture_duplicates);
+    DELETE FROM matches WHERE id IN (SELECT duplicate_id FROM fixture_duplicates);
+    DROP TABLE fixture_duplicates;
+
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_matches_round_pair
+        ON matches (round_id, MIN(home_team_id, away_team_id), MAX(home_team_id, away_team_id))
+    """)
+
+    if merged:
+        from controllers.standings_controller import rebuild_standings
+        rebuild_standings(conn)
+
+
+def _m006_cup_bracket_slots(conn: sqlite3.Connection) -> None:
+    """
+    Bracket position of every cup tie (see controllers/cup_controller.py).
+
+    The winner of the tie in `slot` s meets the winner of its neighbour in
+    slot s // 2 of the next cup round, so the bracket can be advanced with
+    set-based statements. Existing ties are numbered in id order.
+    """
+    _add_column(conn, "cup_matches", "slot", "INTEGER")
+    conn.execute("""
+        UPDATE cup_matches SET slot = numbered.slot
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY cup_round_id ORDER BY id) - 1 AS slot
+            FROM cup_matches
+        ) AS numbered
+        WHERE numbered.id = cup_matches.id AND cup_matches.slot IS NULL
+    """)
+    _execute_all(conn, """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_cup_matches_round_slot
+        ON cup_matches (cup_round_id, slot);
+    CREATE INDEX IF NOT EXISTS idx_cup_matches_gameweek
+        ON cup_matches (round_number)
+    """)
+
+
+def _m007_audit_log_details(conn: sqlite3.Connection) -> None:
+    """
+    Match target and before/after details of audit entries (see
+    controllers/audit_log.py). setup_database.py declares both columns, but
+    databases created from an older copy of it lack them.
+    """
+    _add_column(conn, "audit_log", "target_match_id", "INTEGER REFERENCES matches(id)")
+    _add_column(conn, "audit_log", "details", "TEXT")
+
+
+def _m008_audit_log_browsing(conn: sqlite3.Connection) -> None:
+    """
+    Keyset pagination and retention of the audit log (see
+    controllers/audit_log.py).
+
+    Pages are read newest first from (timestamp, id), each filter has an
+    index leading with its column, and entries past the retention period
+    are rolled up into one row per day, admin and action (admin 0: unknown).
+    """
+    _execute_all(conn, """
+    CREATE INDEX IF NOT EXISTS idx_audit_log_timestamp
+        ON audit_log (timestamp, id);
+    CREATE INDEX IF NOT EXISTS idx_audit_log_admin
+        ON audit_log (admin_id, timestamp, id);
+    CREATE INDEX IF NOT EXISTS idx_audit_log_action
+        ON audit_log (action, timestamp, id);
+    CREATE INDEX IF NOT EXISTS idx_audit_log_player
+        ON audit_log (target_player_id, timestamp, id) WHERE target_player_id IS NOT NULL;
+    CREATE INDEX IF NOT EXISTS idx_audit_log_match
+        ON audit_log (target_match_id, timestamp, id) WHERE target_match_id IS NOT NULL;
+
+    CREATE TABLE IF NOT EXISTS audit_log_daily (
+        day TEXT NOT NULL,                          -- YYYY-MM-DD (UTC)
+        admin_id INTEGER NOT NULL,
+        action TEXT NOT NULL,
+        entries INTEGER NOT NULL,
+        first_at DATETIME NOT NULL,
+        last_at DATETIME NOT NULL,
+        PRIMARY KEY (day, admin_id, action)
+    )
+    """)
+
+
+def _m009_rounds_unique_per_season(conn: sqlite3.Connection) -> None:
+    """
+    A round is unique per (season, competition, round number) instead of per
+    (name, competition).
+
+    With UNIQUE(name, competition_id), "Round N" of a new season collided
+    with the previous season's row and every write path resolved to the old
+    round. SQLite cannot drop a table constraint, so the table is rebuilt
+    (ids are kept, nothing else references the constraint).
+    """
+    table_sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'rounds'"
+    ).fetchone()[0]
+    if "UNIQUE (season_id, competition_id, round_number)" in table_sql:
+        return
+    _execute_all(conn, """
+    CREATE TABLE rounds_rebuilt (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        competition_id INTEGER NOT NULL,
+        round_number INTEGER,
+        season_id INTEGER REFERENCES seasons(id),
+        FOREIGN KEY (competition_id) REFERENCES competitions(id),
+        UNIQUE (season_id, competition_id, round_number)
+    );
+
+    INSERT INTO rounds_rebuilt (id, name, competition_id, round_number, season_id)
+    SELECT id, name, competition_id, round_number, season_id FROM rounds;
+
+    DROP TABLE rounds;
+    ALTER TABLE rounds_rebuilt RENAME TO rounds;
+
+    CREATE INDEX IF NOT EXISTS idx_rounds_season_number
+        ON rounds (season_id, round_number);
+    CREATE INDEX IF NOT EXISTS idx_rounds_number
+        ON rounds (round_number)
+    """)
+
+
+def _m010_player_token_version(conn: sqlite3.Connection) -> None:
+    """
+    Session token version of every player (see controllers/auth_controller.py).
+    It is bumped whenever an admin changes the player, which invalidates the
+    tokens issued before.
+    """
+    _add_column(conn, "players", "token_version", "INTEGER NOT NULL DEFAULT 0")
+
+
+def _m011_scoring_triggers_by_status(conn: sqlite3.Connection) -> None:
+    """
+    Enqueue triggers of migration 4, restricted to live and finished matches.
+
+    The admin form always sends scores (0-0 for a match not played yet), so
+    a score change alone no longer queues a job. A match moved back to
+    'not played' is queued once to clear its points, and so is every such
+    match that was already scored.
+    """
+    conn.execute("DROP TRIGGER IF EXISTS trg_matches_enqueue_scoring_update")
+    conn.execute("DROP TRIGGER IF EXISTS trg_matches_enqueue_scoring_insert")
+    conn.execute("""
+        CREATE TRIGGER trg_matches_enqueue_scoring_update
+        AFTER UPDATE OF status, home_score, away_score ON matches
+        WHEN (NEW.status IN ('live', 'finished')
+              AND (NEW.home_score IS NOT OLD.home_score
+                   OR NEW.away_score IS NOT OLD.away_score
+                   OR NEW.status IS NOT OLD.status))
+          OR (OLD.status IN ('live', 'finished') AND NEW.status NOT IN ('live', 'finished'))
+        BEGIN
+            INSERT OR IGNORE INTO scoring_jobs (match_id, reason)
+            VALUES (NEW.id, CASE WHEN NEW.status = 'finished' AND OLD.status IS NOT 'finished' THEN 'finished'
+                                 WHEN NEW.status NOT IN ('live', 'finished') THEN 'reset'
+                                 ELSE 'score_changed' END);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER trg_matches_enqueue_scoring_insert
+        AFTER INSERT ON matches
+        WHEN NEW.status IN ('live', 'finished')
+          AND NEW.home_score IS NOT NULL AND NEW.away_score IS NOT NULL
+        BEGIN
+            INSERT OR IGNORE INTO scoring_jobs (match_id, reason) VALUES (NEW.id, 'inserted');
+        END
+    """)
+    conn.execute("""
+        INSERT OR IGNORE INTO scoring_jobs (match_id, reason)
+        SELECT DISTINCT p.match_id, 'reset'
+        FROM predictions p JOIN matches m ON m.id = p.match_id
+        WHERE m.status NOT IN ('live', 'finished') AND p.points_awarded IS NOT NULL
+    """)
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "player standings tables", _m001_player_standings),
+    (2, "indexes for hot query predicates", _m002_hot_path_indexes),
+    (3, "round_number and season_id on rounds", _m003_round_numbers_and_seasons),
+    (4, "scoring job queue and enqueue triggers", _m004_scoring_jobs),
+    (5, "unique fixture per round and team pair", _m005_unique_round_fixture),
+    (6, "bracket slot of cup ties", _m006_cup_bracket_slots),
+    (7, "target match and details of audit entries", _m007_audit_log_details),
+    (8, "audit log indexes and daily rollups", _m008_audit_log_browsing),
+    (9, "rounds unique per season, competition and number", _m009_rounds_unique_per_season),
+    (10, "session token version of players", _m010_player_token_version),
+    (11, "scoring triggers limited to live and finished matches", _m011_scoring_triggers_by_status),
+]
+
+
+# ---------------------------------------------------------------------------- #
+# Runner
+# ---------------------------------------------------------------------------- #
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Highest applied migration version (0 for an unmigrated database)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def apply_migrations(conn: sqlite3.Connection) -> List[int]:
+    """
+    Apply every pending migration in order. Returns the versions applied.
+
+    Each migration commits together with its schema_version row, so a failure
+    leaves the database at the last fully applied version.
+    """
+    current = get_schema_version(conn)
+    conn.commit()
+
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            conn.execute("BEGIN")
+            migrate(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description),
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise RuntimeError(f"Migration {version} ({description}) failed: {e}")
+        applied.append(version)
+    return applied
+
+
+_migrated = set()
+_migrate_lock = threading.Lock()
+
+
+def ensure_schema(db_path: str = None) -> List[int]:
+    """Run pending migrations once per process (called at app startup)."""
+    with _migrate_lock:
+        if db_path in _migrated:
+            return []
+        with get_connection(db_path) as conn:
+            applied = apply_migrations(conn)
+        _migrated.add(db_path)
+        return applied
@@ -0,0 +1,152 @@
+# utils/query_cache.py
+"""
+Process-wide result cache for controller reads.
+
+Streamlit reruns the whole script on every widget click, so the same read
+queries run over and over. A read decorated with `@cached("matches", ...)`
+stores its result keyed by (function, arguments) together with the current
+version of every table it reads. Write paths decorated with
+`@invalidates("matches", ...)` bump those versions once they have committed,
+so the next read of a stale entry misses and goes to the database.
+
+Entries also expire after a TTL (bounding staleness from writers outside this
+process, e.g. control_db.py) and the least recently used entry is evicted
+once the cache is full.
+
+Tuning (environment): QUERY_CACHE_SIZE (default 512 entries),
+QUERY_CACHE_TTL (default 300 seconds, 0 disables caching).
+"""
+
+import copy
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, List
+
+MAX_ENTRIES = int(os.getenv("QUERY_CACHE_SIZE", "512"))
+DEFAULT_TTL = float(os.getenv("QUERY_CACHE_TTL", "300"))
+
+_lock = threading.Lock()
+_entries = OrderedDict()            # key -> (expires_at, versions, value)
+_versions = defaultdict(int)        # table -> version counter
+_stats = defaultdict(lambda: {"hits": 0, "misses": 0, "stale": 0, "expired": 0})
+_evictions = 0
+
+
+def _key(fn: Callable, args: tuple, kwargs: dict) -> tuple:
+    return (fn.__module__, fn.__qualname__, args, tuple(sorted(kwargs.items())))
+
+
+def bump(*tables: str) -> None:
+    """Invalidate every cached read of `tables`."""
+    with _lock:
+        for table in tables:
+            _versions[table] += 1
+
+
+def table_versions(*tables: str) -> tuple:
+    """Current version counters of `tables` (they change on every bump)."""
+    with _lock:
+        return tuple(_versions[t] for t in tables)
+
+
+def cached(*tables: str, ttl: float = None, copy_result: bool = True):
+    """
+    Cache a read function whose result depends only on its arguments and
+    on `tables`. Results are copied on the way out, so callers may mutate
+    them; pass copy_result=False for results that are treated as read-only
+    (e.g. DataFrames that are only read to build a page).
+    """
+    share = (lambda value: value) if not copy_result else copy.deepcopy
+
+    def decorator(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            lifetime = DEFAULT_TTL if ttl is None else ttl
+            if lifetime <= 0:
+                return fn(*args, **kwargs)
+
+            key = _key(fn, args, kwargs)
+            now = time.monotonic()
+            with _lock:
+                versions = tuple(_versions[t] for t in tables)
+                entry = _entries.get(key)
+                if entry is not None:
+                    expires_at, entry_versions, value = entry
+                    if entry_versions == versions and now < expires_at:
+                        _entries.move_to_end(key)
+                        _stats[name]["hits"] += 1
+                        return share(value)
+                    _stats[name]["stale" if entry_versions != versions else "expired"] += 1
+                _stats[name]["misses"] += 1
+
+            value = fn(*args, **kwargs)
+            _store(key, (now + lifetime, versions, share(value)))
+            return value
+
+        wrapper.cache_tables = tables
+        return wrapper
+    return decorator
+
+
+def _store(key: tuple, entry: tuple) -> None:
+    global _evictions
+    with _lock:
+        _entries[key] = entry
+        _entries.move_to_end(key)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+            _evictions += 1
+
+
+def invalidates(*tables: str):
+    """
+    Mark a write function: `tables` are bumped after it returns (i.e. after
+    its transaction committed), or raises, since a failed write may still
+    have committed part of its work.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                bump(*tables)
+        return wrapper
+    return decorator
+
+
+def clear() -> None:
+    """Drop every entry (statistics are kept)."""
+    with _lock:
+        _entries.clear()
+
+
+def get_cache_stats() -> Dict:
+    """Totals plus one row per cached function, for the admin System page."""
+    with _lock:
+        functions: List[Dict] = []
+        for name, counts in sorted(_stats.items()):
+            lookups = counts["hits"] + counts["misses"]
+            functions.append({
+                "function": name,
+                **counts,
+                "hit_ratio": counts["hits"] / lookups if lookups else 0.0,
+            })
+        hits = sum(f["hits"] for f in functions)
+        misses = sum(f["misses"] for f in functions)
+        return {
+            "entries": len(_entries),
+            "max_entries": MAX_ENTRIES,
+            "ttl": DEFAULT_TTL,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "evictions": _evictions,
+            "table_versions": dict(_versions),
+            "functions": functions,
+        }
@@ -0,0 +1,19 @@
+# utils/views.py
+"""
+Lazy view lookup for app.py.
+
+Views are named by "module:function" specs and imported on first use.
+The lookup lives here rather than in app.py because Streamlit re-executes
+the app script on every rerun, which would start every cache defined there
+afresh; an imported module keeps it for the life of the process.
+"""
+
+import functools
+import importlib
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_view(spec):
+    """Import the view function named by a "module:function" spec (once per process)."""
+    module_name, function_name = spec.split(":")
+    return getattr(importlib.import_module(module_name), function_name)
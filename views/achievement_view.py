@@ -2,16 +2,7 @@ import streamlit as st
 import pandas as pd
 from controllers.achievement_controller import get_player_title_summary, get_league_winners
 from streamlit_lottie import st_lottie
-import requests
-
-def load_lottie_url(url: str):
-    try:
-        res = requests.get(url)
-        if res.status_code != 200:
-            return None
-        return res.json()
-    except:
-        return None
+from utils.lottie_loader import load_lottie
 
 def achievement_view():
     st.title("🏆 Football Prediction Game Achievements")
@@ -73,8 +64,7 @@ def achievement_view():
 
             # Achievement / Trophy animation
             # 🏆 Trophy animation for champions
-            animation_url = "https://assets10.lottiefiles.com/packages/lf20_touohxv0.json"
-            animation = load_lottie_url(animation_url)
+            animation = load_lottie("trophy")
 
             if animation:
                 st_lottie(animation, height=300, speed=1, loop=False)
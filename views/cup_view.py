@@ -1,6 +1,14 @@
 # views/cup_view.py
 import streamlit as st
-from controllers.cup_controller import get_cup_matchups_with_points
+from controllers.cup_controller import (
+    create_cup,
+    get_cup_matchups_with_points,
+    get_cup_rounds,
+    get_cups,
+    get_current_cup_round_id,
+)
+from controllers.rounds_controller import get_latest_round_number
+from controllers.team_catalogue import get_catalogue
 
 def display_matchup(player1, player2):
     col1, col2, col3 = st.columns([4, 1, 4])
@@ -36,15 +44,59 @@ def display_matchup(player1, player2):
 def cup_view():
     st.title("🔥 Current Cup Matchups & Player Points 🔥")
 
-    # TODO: get current cup round ID dynamically, for example:
-    current_cup_round_id = 1  # replace with real logic to get current round
+    with st.expander("➕ Create a cup", expanded=not get_cups()):
+        create_cup_form()
 
-    matchups = get_cup_matchups_with_points(current_cup_round_id)
+    cups = get_cups()
+    if not cups:
+        st.info("No cup has been created yet.")
+        return
+
+    cup_names = {name: cup_id for cup_id, name in cups}
+    cup_id = cup_names[st.selectbox("🏆 Cup", list(cup_names))]
+
+    rounds = get_cup_rounds(cup_id)
+    current_round_id = get_current_cup_round_id(cup_id)
+    labels = {
+        f"{name} (gameweek {gameweek})" if gameweek else f"{name} (not drawn yet)": round_id
+        for round_id, name, _, gameweek, _ in rounds
+    }
+    round_ids = list(labels.values())
+    index = round_ids.index(current_round_id) if current_round_id in round_ids else 0
+    cup_round_id = labels[st.selectbox("🔁 Cup round", list(labels), index=index)]
+
+    matchups = get_cup_matchups_with_points(cup_round_id)
 
     if not matchups:
-        st.info("No matchups found for the current cup round.")
+        st.info("The ties of this cup round are drawn once the previous round is decided.")
         return
 
     for matchup in matchups:
         display_matchup(matchup['player1'], matchup['player2'])
         st.markdown("---")
+
+
+def create_cup_form():
+    with st.form("create_cup"):
+        name = st.text_input("Cup name")
+        competition = st.selectbox("Competition", get_catalogue().leagues())
+        start_round = st.number_input(
+            "First gameweek", min_value=1, max_value=100, value=get_latest_round_number()
+        )
+        entrants = st.number_input(
+            "Entrants (top seeds, 0 = every player)", min_value=0, max_value=4096, value=0
+        )
+        submitted = st.form_submit_button("🎲 Seed & draw")
+
+    if not submitted:
+        return
+    try:
+        report = create_cup(name, competition, int(start_round), int(entrants) or None,
+                            admin_id=st.session_state["user"]["id"])
+    except ValueError as e:
+        st.error(str(e))
+        return
+    st.success(
+        f"✅ {report['entrants']} players seeded into a {report['bracket_size']}-player bracket "
+        f"({report['byes']} byes, {report['rounds']} rounds) in {report['elapsed_ms']:.1f} ms."
+    )
@@ -1,5 +1,5 @@
 import streamlit as st
-from controllers.auth_controller import login, signup
+from controllers.auth_controller import login, signup, issue_session_token
 
 def login_view():
     st.title("🔐 Login to Football Game")
@@ -14,6 +14,7 @@ def login_view():
         if st.button("Login"):
             user = login(username, password)
             if user:
+                st.session_state["session_token"] = issue_session_token(user)
                 st.session_state["user"] = user
                 st.success(f"Welcome, {user['username']}!")
                 st.rerun()
@@ -1,27 +1,50 @@
 import streamlit as st
+import io
 import os
-import json
 from controllers.matches_controller import (
     handle_add_match,
     handle_view_matches
 )
-
-# Get project root directory (parent of views)
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-
-# Path to the JSON file (correct filename)
-DATA_PATH = os.path.join(PROJECT_ROOT, "data", "TEAMS_BY_LEAGUE.json")
-
-with open(DATA_PATH, "r", encoding="utf-8") as f:
-    TEAMS_BY_LEAGUE = json.load(f)
+from controllers.fixtures_controller import import_fixtures, REQUIRED_FIELDS
 
 def matches_view():
     st.title("🏟️ Add & View Matches")
 
-    tab1, tab2 = st.tabs(["➕ Add Match", "📋 View Matches"])
+    tab1, tab2, tab3 = st.tabs(["➕ Add Match", "📋 View Matches", "📥 Import Fixtures"])
 
     with tab1:
-        handle_add_match(TEAMS_BY_LEAGUE)
+        handle_add_match()
 
     with tab2:
         handle_view_matches()
+
+    with tab3:
+        import_fixtures_tab()
+
+
+def import_fixtures_tab():
+    st.subheader("Import Fixtures from CSV / JSON")
+    st.caption(
+        f"Required columns: {', '.join(REQUIRED_FIELDS)}. "
+        "Optional: status, home_score, away_score. Existing fixtures of a round are updated."
+    )
+
+    uploaded = st.file_uploader("Fixture file", type=["csv", "json"])
+    if uploaded is None or not st.button("📥 Import"):
+        return
+
+    fmt = os.path.splitext(uploaded.name)[1].lower().lstrip(".")
+    stream = io.TextIOWrapper(uploaded, encoding="utf-8-sig", newline="")
+    try:
+        report = import_fixtures(stream, fmt, admin_id=st.session_state["user"]["id"])
+    except Exception as e:
+        st.error(f"Error importing fixtures: {e}")
+        return
+
+    st.success(
+        f"✅ {report['inserted']} inserted, {report['updated']} updated, "
+        f"{report['skipped']} skipped out of {report['rows']} rows "
+        f"in {report['elapsed_s']:.2f}s ({report['rows_per_s']:.0f} rows/s)."
+    )
+    for error in report["errors"]:
+        st.warning(error)
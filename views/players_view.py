@@ -2,8 +2,9 @@ import streamlit as st
 import pandas as pd
 from controllers.players_controller import (
     get_all_players, add_player, update_player,
-    delete_player, get_audit_logs
+    delete_player, get_admins, get_audit_logs
 )
+from controllers.audit_log import get_audit_actions, get_audit_summaries
 
 def players_view():
     admin_id = st.session_state["user"]["id"]
@@ -27,10 +28,17 @@ def players_view():
     # 📋 Load Players Data
     players = get_all_players(search_term)
 
-    if not players:
+    if players:
+        player_list(players, admin_id)
+    else:
         st.info("No players found.")
-        return
 
+    # 📝 Audit Log
+    with st.expander("🧾 Admin Action Log"):
+        audit_log_section()
+
+
+def player_list(players, admin_id):
     st.subheader("📄 Player List")
 
     # Keep track of which player is being edited
@@ -69,11 +77,46 @@ def players_view():
                         st.session_state.editing_player_id = None
                         st.rerun()
 
-    # 📝 Audit Log
-    with st.expander("🧾 Admin Action Log"):
-        logs = get_audit_logs()
-        if logs:
-            df = pd.DataFrame(logs, columns=["Timestamp", "Admin", "Action", "Target ID"])
-            st.dataframe(df, use_container_width=True)
-        else:
-            st.info("No actions yet.")
+
+def audit_log_section():
+    # Independent of the player search above
+    admins = {name: player_id for player_id, name in get_admins()}
+    cols = st.columns(4)
+    admin = cols[0].selectbox("Admin", ["All"] + sorted(admins), key="audit_admin")
+    action = cols[1].selectbox("Action", ["All"] + get_audit_actions(), key="audit_action")
+    player_id = cols[2].number_input("Player ID (0 = any)", min_value=0, step=1, key="audit_player")
+    match_id = cols[3].number_input("Match ID (0 = any)", min_value=0, step=1, key="audit_match")
+    filters = {
+        "admin_id": admins.get(admin),
+        "action": None if action == "All" else action,
+        "player_id": int(player_id) or None,
+        "match_id": int(match_id) or None,
+    }
+
+    # Keyset pages: the cursors of the pages before this one (newest first)
+    if st.session_state.get("audit_filters") != filters:
+        st.session_state.audit_filters = filters
+        st.session_state.audit_cursors = [None]
+    cursors = st.session_state.audit_cursors
+    logs, next_cursor = get_audit_logs(before=cursors[-1], **filters)
+
+    if logs:
+        df = pd.DataFrame(logs, columns=["Timestamp", "Admin", "Action", "Player ID", "Match ID", "Details"])
+        st.dataframe(df, use_container_width=True)
+    else:
+        st.info("No actions yet.")
+
+    nav = st.columns([1, 1, 4])
+    if nav[0].button("⬅️ Newer", disabled=len(cursors) == 1, key="audit_newer"):
+        cursors.pop()
+        st.rerun()
+    if nav[1].button("Older ➡️", disabled=next_cursor is None, key="audit_older"):
+        cursors.append(next_cursor)
+        st.rerun()
+    nav[2].caption(f"Page {len(cursors)}")
+
+    summaries = get_audit_summaries(admin_id=filters["admin_id"], action=filters["action"])
+    if summaries:
+        st.markdown("**📅 Older entries (daily totals)**")
+        df = pd.DataFrame(summaries, columns=["Day", "Admin", "Action", "Entries", "First", "Last"])
+        st.dataframe(df, use_container_width=True, hide_index=True)
@@ -58,23 +58,36 @@ def predictions_view():
             match_id = match[0]
 
             # Parse actual result
-            try:
-                actual_str = edited_df.at[i, "Actual Result"]
-                actual_home, actual_away = map(int, actual_str.strip().split("-"))
-                match_results[match_id] = (actual_home, actual_away)
-            except:
-                continue  # invalid or empty
+            result = _parse_score(edited_df.at[i, "Actual Result"])
+            if result:
+                match_results[match_id] = result
 
             # Parse predictions per player
             for player_id, player_name in zip(player_ids, player_names):
-                try:
-                    pred_str = edited_df.at[i, player_name]
-                    phs, pas = map(int, pred_str.strip().split("-"))
-                    prediction_inputs[(player_id, match_id)] = (phs, pas)
-                except:
-                    continue  # invalid or empty
-
-        # Save to DB and calculate points
-        pc.save_predictions_and_scores(selected_round_name, match_results, prediction_inputs)
-        pc.calculate_and_store_points(selected_round_name)
-        st.success("✅ Predictions and scores saved. Points calculated!")
+                pred = _parse_score(edited_df.at[i, player_name])
+                if pred:
+                    prediction_inputs[(player_id, match_id)] = pred
+
+        # Save only the changed cells; rescoring covers the matches they touch
+        report = pc.save_predictions_and_scores(
+            selected_round_name, match_results, prediction_inputs, admin_id=st.session_state["user"]["id"]
+        )
+        written = report["results_written"] + report["predictions_written"]
+        if written:
+            st.success(
+                f"✅ Saved {report['results_written']} result(s) and "
+                f"{report['predictions_written']} prediction(s), "
+                f"rescored {report['predictions_scored']} in {report['elapsed_ms']:.0f} ms."
+            )
+        else:
+            st.info(f"ℹ️ Nothing changed ({report['elapsed_ms']:.0f} ms).")
+
+
+def _parse_score(value):
+    """'2-1' -> (2, 1); None for empty or malformed cells."""
+    if not isinstance(value, str) or "-" not in value:
+        return None
+    home, _, away = value.strip().partition("-")
+    if not (home.strip().isdigit() and away.strip().isdigit()):
+        return None
+    return int(home), int(away)
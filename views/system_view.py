@@ -0,0 +1,62 @@
+import streamlit as st
+import pandas as pd
+from utils.db import get_pool_stats
+from utils.query_cache import get_cache_stats, clear
+from controllers.scoring_queue import get_queue_stats, retry_failed, notify_worker
+
+
+def system_view():
+    st.title("🛠️ Admin: System Monitor")
+
+    # 🗃️ Query result cache
+    st.subheader("🗃️ Query Cache")
+    stats = get_cache_stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Hit ratio", f"{stats['hit_ratio']:.0%}")
+    col2.metric("Hits / Misses", f"{stats['hits']} / {stats['misses']}")
+    col3.metric("Entries", f"{stats['entries']} / {stats['max_entries']}")
+    col4.metric("Evictions", stats["evictions"])
+    st.caption(f"Entries expire after {stats['ttl']:.0f} s or as soon as a write touches their tables.")
+
+    if stats["functions"]:
+        df = pd.DataFrame(stats["functions"])
+        df["hit_ratio"] = df["hit_ratio"].map(lambda r: f"{r:.0%}")
+        df.columns = ["Function", "Hits", "Misses", "Stale", "Expired", "Hit Ratio"]
+        st.dataframe(df, use_container_width=True, hide_index=True)
+    else:
+        st.info("No cached reads yet.")
+
+    if stats["table_versions"]:
+        with st.expander("🔢 Table versions"):
+            st.json(stats["table_versions"])
+
+    if st.button("🧹 Clear Cache"):
+        clear()
+        st.success("✅ Query cache cleared.")
+        st.rerun()
+
+    # ⚙️ Scoring queue
+    st.subheader("⚙️ Scoring Queue")
+    queue = get_queue_stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Pending", queue["pending"])
+    col2.metric("Failed", queue["failed"])
+    col3.metric("Scored", queue["processed"])
+    col4.metric("Last batch", f"{queue['last_batch_ms']:.0f} ms")
+    if not queue["worker_alive"]:
+        st.warning("⚠️ The scoring worker is not running in this process.")
+    elif queue["pending"]:
+        st.caption(f"Oldest pending job queued at {queue['oldest_pending']}.")
+    if queue["failed"] and st.button("🔁 Retry Failed Jobs"):
+        requeued = retry_failed(admin_id=st.session_state["user"]["id"])
+        notify_worker()
+        st.success(f"✅ {requeued} job(s) queued again.")
+        st.rerun()
+
+    # 🔌 Connection pool
+    st.subheader("🔌 Connection Pool")
+    pools = get_pool_stats()
+    if pools:
+        st.dataframe(pd.DataFrame(pools), use_container_width=True, hide_index=True)
+    else:
+        st.info("No database connections opened yet.")